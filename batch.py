@@ -0,0 +1,238 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+from game import SnakeGame
+from replay import GameRecorder
+from main import AGENTS, HEURISTICS, INFORMED_AGENTS, find_plan, make_agent
+from search_nodes import TIE_BREAKS
+from closed_set import CLOSED_SETS
+from profiling import SearchProbe, PROFILE_FIELDS, write_profile, print_profile
+
+# colonne dei file di output
+GAME_FIELDS = ["agent", "heuristic", "grid", "seed", "score", "moves",
+               "nodes_expanded", "wall_time_s", "status"]
+APPLE_FIELDS = ["agent", "heuristic", "grid", "seed", "apple", "eaten", "moves",
+                "nodes_expanded", "cost", "depth", "plan_time_s", "memory_peak", "saturated", "evictions"]
+
+
+# gioca una partita completa senza renderer e raccoglie le statistiche
+def play_game(agent_name, heuristic_name="manhattan", grid_size=10, seed=42,
+              n=50, max_expansions=1000000, tie_break="fifo", record_dir=None,
+              distance_field=False, closed_set="exact", memory_budget_mb=None, zobrist=False,
+              max_nodes=100000, profile=False, iterations=50, move_time_ms=None, rollout_workers=1,
+              time_budget_ms=None):
+    if agent_name not in INFORMED_AGENTS:
+        heuristic_name = "none"
+
+    game = SnakeGame(grid_size, seed)
+    agent = make_agent(agent_name, tie_break=tie_break, distance_field=distance_field,
+                       closed_set=closed_set, memory_budget_mb=memory_budget_mb, zobrist=zobrist,
+                       max_nodes=max_nodes, iterations=iterations, move_time_ms=move_time_ms,
+                       rollout_workers=rollout_workers)
+    key = {"agent": agent_name, "heuristic": heuristic_name,
+           "grid": grid_size, "seed": seed}
+
+    recorder = None
+    if record_dir:
+        recorder = GameRecorder(os.path.join(record_dir, log_name(agent_name, heuristic_name, grid_size, seed)),
+                                agent_name, heuristic_name, grid_size, seed)
+
+    # con profile ogni riga per mela riceve anche le metriche della ricerca (PROFILE_FIELDS)
+    probe = SearchProbe() if profile else None
+    apples = []
+    status = "complete"
+    start_time = time.perf_counter()
+    # mosse dall'ultima mela: i piani parziali (time_budget_ms, mcts) non garantiscono di arrivarci
+    last_apple_moves = 0
+
+    # try/finally: anche una partita interrotta (timeout del torneo, JobTimeout) chiude i processi
+    # dell'agente e scrive il log fino al punto raggiunto
+    try:
+        while not game.game_over and game.score < n:
+            # griglia piena: la partita è completa
+            if game.food is None:
+                break
+            score_before, moves_before = game.score, game.moves
+
+            plan_start = time.perf_counter()
+            result = find_plan(agent, agent_name, game, heuristic_name,
+                               max_expansions=max_expansions, probe=probe, time_budget_ms=time_budget_ms)
+            plan_time = time.perf_counter() - plan_start
+            if recorder:
+                recorder.plan(result, plan_time)
+
+            if not result.found:
+                status = "no_path"
+                break
+
+            # esecuzione del piano
+            for next_pos in result.path:
+                if game.game_over:
+                    break
+                head = game.snake[0]
+                action = (next_pos[0] - head[0], next_pos[1] - head[1])
+                game.step(action)
+                if recorder:
+                    recorder.action(action)
+
+            apples.append(dict(key,
+                               apple=len(apples) + 1,
+                               eaten=game.score > score_before,
+                               moves=game.moves - moves_before,
+                               nodes_expanded=result.nodes_expanded,
+                               cost=result.cost,
+                               depth=result.depth,
+                               plan_time_s=plan_time,
+                               memory_peak=getattr(result, "memory_peak", None),
+                               saturated=getattr(result, "saturated", None),
+                               evictions=getattr(result, "evictions", None),
+                               **(probe.record if probe else {})))
+
+            if game.score > score_before:
+                last_apple_moves = game.moves
+            elif game.moves - last_apple_moves >= grid_size * grid_size:
+                status = "no_progress"
+                break
+    finally:
+        if hasattr(agent, "close"):
+            agent.close()
+        if recorder:
+            recorder.close(game)
+
+    if game.game_over:
+        status = "collision"
+
+    summary = dict(key,
+                   score=game.score,
+                   moves=game.moves,
+                   nodes_expanded=sum(a["nodes_expanded"] for a in apples),
+                   wall_time_s=time.perf_counter() - start_time,
+                   status=status)
+    return summary, apples
+
+
+def log_name(agent_name, heuristic_name, grid_size, seed):
+    return f"{agent_name}_{heuristic_name}_g{grid_size}_s{seed}.ndjson"
+
+
+# genera le combinazioni (agente, euristica, griglia, seed) senza duplicare gli agenti non informati
+def iter_jobs(agents, heuristics, grids, seeds):
+    for agent_name, grid_size, seed in itertools.product(agents, grids, seeds):
+        agent_heuristics = heuristics if agent_name in INFORMED_AGENTS else ["none"]
+        for heuristic_name in agent_heuristics:
+            yield agent_name, heuristic_name, grid_size, seed
+
+
+# options: parametri di play_game comuni a tutte le partite (n, max_expansions, tie_break, ...)
+def run_batch(agents, heuristics, grids, seeds, verbose=False, **options):
+    if options.get("record_dir"):
+        os.makedirs(options["record_dir"], exist_ok=True)
+    games, apples = [], []
+    for agent_name, heuristic_name, grid_size, seed in iter_jobs(agents, heuristics, grids, seeds):
+        summary, apple_rows = play_game(agent_name, heuristic_name, grid_size, seed, **options)
+        games.append(summary)
+        apples.extend(apple_rows)
+        if verbose:
+            print(f"{agent_name:<16} {heuristic_name:<10} grid {grid_size:<3} seed {seed:<6} "
+                  f"score {summary['score']:<4} expanded {summary['nodes_expanded']:<9} "
+                  f"{summary['wall_time_s']:.3f}s {summary['status']}")
+    return games, apples
+
+
+def write_csv(path, rows, fields):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_results(prefix, games, apples, fmt="csv"):
+    if fmt == "json":
+        paths = [f"{prefix}.json"]
+        with open(paths[0], "w") as f:
+            json.dump({"games": games, "apples": apples}, f, indent=1)
+    else:
+        paths = [f"{prefix}_games.csv", f"{prefix}_apples.csv"]
+        write_csv(paths[0], games, GAME_FIELDS)
+        profiled = bool(apples) and PROFILE_FIELDS[0] in apples[0]
+        write_csv(paths[1], apples, APPLE_FIELDS + (PROFILE_FIELDS if profiled else []))
+    return paths
+
+
+# riepilogo per (agente, euristica, griglia)
+def print_summary(games):
+    groups = {}
+    for g in games:
+        groups.setdefault((g["agent"], g["heuristic"], g["grid"]), []).append(g)
+
+    print(f"{'agent':<16} {'heuristic':<10} {'grid':<5} {'games':<6} "
+          f"{'avg score':<10} {'avg expanded':<13} {'exp/apple':<10} {'avg time':<9}")
+    for (agent_name, heuristic_name, grid_size), rows in groups.items():
+        k = len(rows)
+        print(f"{agent_name:<16} {heuristic_name:<10} {grid_size:<5} {k:<6} "
+              f"{sum(r['score'] for r in rows) / k:<10.2f} "
+              f"{sum(r['nodes_expanded'] for r in rows) / k:<13.1f} "
+              f"{sum(r['nodes_expanded'] for r in rows) / max(1, sum(r['score'] for r in rows)):<10.1f} "
+              f"{sum(r['wall_time_s'] for r in rows) / k:<9.3f}")
+
+
+def build_parser():
+    search_agents = [name for name in AGENTS if name != "human"]
+    parser = argparse.ArgumentParser(description="Valutazione headless di più agenti su molti seed")
+    parser.add_argument("--agents", nargs="+", default=["astar", "relaxed_astar"],
+                        choices=search_agents)
+    parser.add_argument("--heuristics", nargs="+", default=["manhattan"],
+                        choices=HEURISTICS.keys())
+    parser.add_argument("--grids", nargs="+", type=int, default=[10])
+    parser.add_argument("--seeds", type=int, default=10, help="Numero di seed per combinazione")
+    parser.add_argument("--seed-start", type=int, default=0)
+    parser.add_argument("--n", type=int, default=50)
+    parser.add_argument("--max_expansions", type=int, default=1000000)
+    parser.add_argument("--tie-break", type=str, default="fifo", choices=TIE_BREAKS)
+    parser.add_argument("--distance-field", action="store_true")
+    parser.add_argument("--closed-set", type=str, default="exact", choices=CLOSED_SETS)
+    parser.add_argument("--memory-budget-mb", type=float, default=None)
+    parser.add_argument("--zobrist", action="store_true")
+    parser.add_argument("--max-nodes", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--move-time-ms", type=float, default=None)
+    parser.add_argument("--rollout-workers", type=int, default=1)
+    parser.add_argument("--time-budget-ms", type=float, default=None,
+                        help="Tempo massimo per ricerca in ms (piani parziali a tempo scaduto)")
+    parser.add_argument("--out", type=str, default="results",
+                        help="Prefisso dei file di output")
+    parser.add_argument("--format", choices=["csv", "json"], default="csv")
+    parser.add_argument("--record-dir", type=str, default=None,
+                        help="Salva un log rivedibile (replay.py) per ogni partita")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Misura ogni ricerca e salva le metriche (.json, oppure .prom per Prometheus)")
+    parser.add_argument("--verbose", action="store_true")
+    return parser
+
+
+# parametri di play_game letti dalla riga di comando (condivisi con tournament.py)
+def game_options(args):
+    return {"n": args.n, "max_expansions": args.max_expansions, "tie_break": args.tie_break,
+            "record_dir": args.record_dir, "distance_field": args.distance_field,
+            "closed_set": args.closed_set, "memory_budget_mb": args.memory_budget_mb,
+            "zobrist": args.zobrist, "max_nodes": args.max_nodes, "profile": bool(args.profile),
+            "iterations": args.iterations, "move_time_ms": args.move_time_ms,
+            "rollout_workers": args.rollout_workers, "time_budget_ms": args.time_budget_ms}
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+
+    games, apples = run_batch(args.agents, args.heuristics, args.grids, seeds,
+                              verbose=args.verbose, **game_options(args))
+
+    for path in write_results(args.out, games, apples, args.format):
+        print(f"Risultati salvati in {path}")
+    print_summary(games)
+    if args.profile:
+        print(f"Profilo salvato in {write_profile(args.profile, apples)}")
+        print_profile(apples)
@@ -0,0 +1,170 @@
+from collections import deque
+import numpy as np
+from game import SnakeGame, FoodSchedule, _FreeCells
+from grid import DIRECTIONS
+
+# B partite di Snake avanzate insieme con array numpy, per valutazioni su larga scala.
+# Ogni partita è identica a SnakeGame(grid_size, seed) con le stesse azioni:
+#  - corpo in un buffer circolare di grid_size² celle (id = x * grid_size + y): la testa avanza
+#    di una posizione a ogni passo, la coda è length - 1 posizioni indietro
+#  - occupazione della griglia per partita, come SnakeGame.occupied (la coda conta come ostacolo)
+#  - una game.FoodSchedule(grid_size, seed) per partita, come SnakeGame: la k-esima cella libera
+#    in ordine per righe è la stessa scelta da _FreeCells.select
+# Le azioni sono indici in DIRECTIONS (UP, DOWN, LEFT, RIGHT) oppure coppie (dx, dy).
+# Le partite finite restano ferme finché non si chiama reset o restart.
+
+DELTAS = np.array(DIRECTIONS, dtype=np.int64)
+
+
+class BatchSnakeGame:
+    def __init__(self, seeds, grid_size=10):
+        self.grid_size = grid_size
+        self.cells = grid_size * grid_size
+        self.reset(seeds)
+
+    def reset(self, seeds):
+        seeds = list(seeds)
+        size, cells = len(seeds), self.cells
+        self.batch_size = size
+        self.seeds = [None] * size
+        self.schedules = [None] * size
+        self.rows = np.arange(size)
+        self.offsets = self.rows * cells
+        self.body = np.zeros((size, cells), dtype=np.int64)
+        self.head = np.zeros(size, dtype=np.int64)
+        self.head_index = np.zeros(size, dtype=np.int64)
+        self.length = np.ones(size, dtype=np.int64)
+        self.occupied = np.zeros((size, cells), dtype=bool)
+        self.food = np.full(size, -1, dtype=np.int64)
+        self.score = np.zeros(size, dtype=np.int64)
+        self.moves = np.zeros(size, dtype=np.int64)
+        self.game_over = np.zeros(size, dtype=bool)
+        self.restart(self.rows, seeds)
+
+    # riporta allo stato iniziale solo le partite indicate, con nuovi seed
+    # (per esempio quelle finite, per tenere il batch sempre pieno)
+    def restart(self, games, seeds):
+        games = np.asarray(games, dtype=np.int64)
+        for game, seed in zip(games.tolist(), seeds):
+            self.seeds[game] = seed
+            self.schedules[game] = FoodSchedule(self.grid_size, seed)
+        n = self.grid_size
+        start = (n // 2) * n + n // 2
+        self.body[games, 0] = start
+        self.head[games] = start
+        self.head_index[games] = 0
+        self.length[games] = 1
+        self.occupied[games] = False
+        self.occupied[games, start] = True
+        self.score[games] = 0
+        self.moves[games] = 0
+        self.game_over[games] = False
+        self._spawn_food(games)
+
+    # cibo per le partite indicate: l'estrazione della FoodSchedule di ogni partita (come
+    # SnakeGame._spawn_food, il j-esimo cibo con j = lunghezza - 1), poi la k-esima cella libera
+    # di tutte le partite insieme con una somma cumulativa
+    def _spawn_food(self, games):
+        if len(games) == 0:
+            return
+        lengths = self.length[games]
+        schedules = self.schedules
+        picks = np.array([schedules[game].pick(length - 1) if length < self.cells else -1
+                          for game, length in zip(games.tolist(), lengths.tolist())], dtype=np.int64)
+        free = np.cumsum(~self.occupied[games], axis=1)
+        food = np.argmax(free > picks[:, None], axis=1)
+        self.food[games] = np.where(picks >= 0, food, -1)
+
+    def heads(self):
+        return self.head
+
+    def tails(self):
+        return self.body[self.rows, (self.head_index - self.length + 1) % self.cells]
+
+    # un passo per tutte le partite ancora in corso; gli array 2D sono indicizzati come
+    # vettori piatti (partita * celle + cella), più veloce dell'indicizzazione per coppie
+    def step(self, actions):
+        actions = np.asarray(actions)
+        deltas = DELTAS[actions] if actions.ndim == 1 else actions
+        n, cells = self.grid_size, self.cells
+        occupied, body = self.occupied.reshape(-1), self.body.reshape(-1)
+
+        x = self.head // n + deltas[:, 0]
+        y = self.head % n + deltas[:, 1]
+        inside = (x >= 0) & (x < n) & (y >= 0) & (y < n)
+        new_heads = np.where(inside, x * n + y, 0)
+
+        # controlla collisioni (con la griglia e contro se stesso) prima di liberare la coda
+        crashed = ~inside | occupied[self.offsets + new_heads]
+        crashed &= ~self.game_over
+        self.game_over |= crashed
+        alive = np.flatnonzero(~self.game_over)
+        if len(alive) == 0:
+            return
+
+        new_heads = new_heads[alive]
+        offsets = self.offsets[alive]
+        head_index = self.head_index[alive] + 1
+        head_index[head_index == cells] = 0
+        self.head_index[alive] = head_index
+        self.head[alive] = new_heads
+        body[offsets + head_index] = new_heads
+        occupied[offsets + new_heads] = True
+
+        ate = new_heads == self.food[alive]
+        grown = alive[ate]
+        if len(grown):
+            self.score[grown] += 1
+            self.length[grown] += 1
+            # chi non ha mangiato libera la vecchia coda
+            moved, offsets, head_index = alive[~ate], offsets[~ate], head_index[~ate]
+        else:
+            moved = alive
+        tails = body[offsets + (head_index - self.length[moved]) % cells]
+        occupied[offsets + tails] = False
+        self._spawn_food(grown)
+        self.moves[alive] += 1
+
+    # maschera (B, 4) delle mosse che non fanno perdere la partita al passo successivo
+    def safe_moves(self):
+        n = self.grid_size
+        heads = self.heads()
+        x = heads[:, None] // n + DELTAS[:, 0]
+        y = heads[:, None] % n + DELTAS[:, 1]
+        inside = (x >= 0) & (x < n) & (y >= 0) & (y < n)
+        cells = np.where(inside, x * n + y, 0)
+        return inside & ~self.occupied[self.rows[:, None], cells]
+
+    # corpo della partita i dalla testa alla coda, come lista di coordinate (x, y)
+    def snake(self, i):
+        index = (self.head_index[i] - np.arange(self.length[i])) % self.cells
+        return [divmod(int(cell), self.grid_size) for cell in self.body[i, index]]
+
+    # la partita i come SnakeGame, per passarla agli agenti di ricerca; condivide la FoodSchedule
+    # della partita, quindi dà lo stesso cibo successivo
+    def to_game(self, i):
+        game = SnakeGame(self.grid_size, self.seeds[i], self.schedules[i])
+        game.snake = deque(self.snake(i))
+        game.occupied = set(game.snake)
+        game.free_cells = _FreeCells(self.grid_size)
+        for cell in game.snake:
+            game.free_cells.occupy(cell)
+        food = int(self.food[i])
+        game.food = divmod(food, self.grid_size) if food >= 0 else None
+        game.score = int(self.score[i])
+        game.moves = int(self.moves[i])
+        game.game_over = bool(self.game_over[i])
+        return game
+
+
+# agente reattivo vettoriale: tra le mosse sicure sceglie quella che avvicina di più al cibo
+# (distanza di Manhattan), a parità di distanza nell'ordine di DIRECTIONS
+def greedy_actions(batch):
+    n = batch.grid_size
+    heads = batch.heads()
+    food = np.maximum(batch.food, 0)
+    x = heads[:, None] // n + DELTAS[:, 0]
+    y = heads[:, None] % n + DELTAS[:, 1]
+    distance = np.abs(x - (food // n)[:, None]) + np.abs(y - (food % n)[:, None])
+    distance = np.where(batch.safe_moves(), distance, 4 * n)
+    return np.argmin(distance, axis=1)
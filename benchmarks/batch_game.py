@@ -0,0 +1,66 @@
+import argparse
+import time
+import numpy as np
+from batch_game import BatchSnakeGame, greedy_actions
+from game import SnakeGame
+from grid import DIRECTIONS
+
+# Passi al secondo di SnakeGame (una partita alla volta) e di BatchSnakeGame (B partite per
+# chiamata) con lo stesso agente reattivo: la mossa sicura che più avvicina al cibo.
+# Le partite finite ripartono subito con un nuovo seed, così il batch resta pieno.
+# Uso: python -m benchmarks.batch_game --grid 10 --batch 64 1024 4096 --steps 200
+
+
+# greedy_actions per una singola SnakeGame, in Python puro
+def greedy_action(game):
+    n = game.grid_size
+    head_x, head_y = game.snake[0]
+    food_x, food_y = game.food
+    best, best_distance = 0, 4 * n
+    for move, (dx, dy) in enumerate(DIRECTIONS):
+        x, y = head_x + dx, head_y + dy
+        if 0 <= x < n and 0 <= y < n and (x, y) not in game.occupied:
+            distance = abs(x - food_x) + abs(y - food_y)
+            if distance < best_distance:
+                best, best_distance = move, distance
+    return DIRECTIONS[best]
+
+
+def run_single(grid_size, steps):
+    seed = 0
+    game = SnakeGame(grid_size, seed)
+    start_time = time.perf_counter()
+    for _ in range(steps):
+        game.step(greedy_action(game))
+        if game.game_over or game.food is None:
+            seed += 1
+            game = SnakeGame(grid_size, seed)
+    return steps / (time.perf_counter() - start_time)
+
+
+def run_batch(grid_size, batch_size, steps):
+    batch = BatchSnakeGame(range(batch_size), grid_size)
+    next_seed = batch_size
+    start_time = time.perf_counter()
+    for _ in range(steps):
+        batch.step(greedy_actions(batch))
+        finished = np.flatnonzero(batch.game_over | (batch.food < 0))
+        if len(finished):
+            batch.restart(finished, range(next_seed, next_seed + len(finished)))
+            next_seed += len(finished)
+    return batch_size * steps / (time.perf_counter() - start_time)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SnakeGame contro BatchSnakeGame: passi al secondo")
+    parser.add_argument("--grid", type=int, default=10)
+    parser.add_argument("--batch", nargs="+", type=int, default=[64, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=200, help="Passi per partita del batch")
+    args = parser.parse_args()
+
+    single = run_single(args.grid, 20000)
+    print(f"{'engine':<20} {'steps/s':>12} {'speedup':>8}")
+    print(f"{'SnakeGame':<20} {single:>12.0f} {1:>8.1f}")
+    for batch_size in args.batch:
+        rate = run_batch(args.grid, batch_size, args.steps)
+        print(f"{f'batch B={batch_size}':<20} {rate:>12.0f} {rate / single:>8.1f}")
@@ -0,0 +1,64 @@
+import argparse
+import random
+import time
+from collections import deque
+from game import SnakeGame
+from heuristics import manhattan
+from search_agents_relaxed import (Relaxed_BFSAgent, Relaxed_AStarAgent,
+                                   Relaxed_BidirectionalBFSAgent, Relaxed_BidirectionalAStarAgent)
+
+# Confronto tra ricerca in avanti e bidirezionale sulle griglie aperte:
+# per ogni dimensione si pianifica tra coppie casuali testa/cibo (serpente di lunghezza 1,
+# eventualmente con una frazione di celle bloccate come ostacoli) e si mediano nodi espansi e tempo.
+# Uso: python -m benchmarks.bidirectional --grids 20 50 100 --pairs 50
+PAIRS = [
+    ("relaxed_bfs", Relaxed_BFSAgent, "relaxed_bibfs", Relaxed_BidirectionalBFSAgent),
+    ("relaxed_astar", Relaxed_AStarAgent, "relaxed_biastar", Relaxed_BidirectionalAStarAgent),
+]
+
+
+def make_position(grid_size, rng, obstacles=0.0):
+    game = SnakeGame(grid_size, 0)
+    cells = [(x, y) for x in range(grid_size) for y in range(grid_size)]
+    head, food = rng.sample(cells, 2)
+    game.snake = deque([head])
+    blocked = {cell for cell in cells if rng.random() < obstacles} - {head, food}
+    game.occupied = blocked | {head}
+    game.food = food
+    return game
+
+
+def measure(agent, positions):
+    expanded, found = 0, 0
+    start_time = time.perf_counter()
+    for game in positions:
+        result = agent.find_path_with_exploration(game, heuristic=manhattan) \
+            if isinstance(agent, (Relaxed_AStarAgent, Relaxed_BidirectionalAStarAgent)) \
+            else agent.find_path_with_exploration(game)
+        expanded += result.nodes_expanded
+        found += result.found
+    return expanded / len(positions), (time.perf_counter() - start_time) / len(positions), found
+
+
+def run(grids, pairs, obstacles, seed):
+    print(f"{'grid':<6} {'agent':<16} {'expanded':<10} {'time ms':<9} {'found':<6} {'ratio':<6}")
+    for grid_size in grids:
+        rng = random.Random(seed)
+        positions = [make_position(grid_size, rng, obstacles) for _ in range(pairs)]
+        for forward_name, forward, bidir_name, bidir in PAIRS:
+            base, base_time, base_found = measure(forward(), positions)
+            both, both_time, both_found = measure(bidir(), positions)
+            print(f"{grid_size:<6} {forward_name:<16} {base:<10.1f} {base_time * 1000:<9.3f} {base_found:<6}")
+            print(f"{grid_size:<6} {bidir_name:<16} {both:<10.1f} {both_time * 1000:<9.3f} {both_found:<6} "
+                  f"{base / max(both, 1):<6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ricerca in avanti e bidirezionale a confronto")
+    parser.add_argument("--grids", nargs="+", type=int, default=[20, 50, 100])
+    parser.add_argument("--pairs", type=int, default=50, help="Coppie testa/cibo per griglia")
+    parser.add_argument("--obstacles", type=float, default=0.0,
+                        help="Frazione di celle bloccate (0 = griglia aperta)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.grids, args.pairs, args.obstacles, args.seed)
@@ -0,0 +1,84 @@
+import argparse
+import json
+import sys
+
+# Confronto tra due esecuzioni della suite (file scritti da pytest --benchmark-json):
+# segnala i benchmark la cui statistica scelta è peggiorata oltre la soglia relativa
+# ed esce con codice 1 se ce n'è almeno uno (utilizzabile come controllo in CI).
+# Con --update l'esecuzione corrente diventa la nuova baseline, salvata in forma compatta
+# (solo le statistiche riassuntive, senza i tempi dei singoli round).
+# Uso: python -m benchmarks.compare benchmarks/baseline.json current.json --threshold 0.25
+BASELINE_STATS = ["min", "max", "mean", "median", "stddev", "rounds", "iterations"]
+
+
+def load(path):
+    with open(path) as f:
+        data = json.load(f)
+    return {bench["fullname"]: bench["stats"] for bench in data["benchmarks"]}
+
+
+def write_baseline(current_path, baseline_path):
+    with open(current_path) as f:
+        data = json.load(f)
+    compact = {
+        "machine_info": {key: data["machine_info"].get(key)
+                         for key in ("node", "processor", "python_version", "cpu")},
+        "datetime": data.get("datetime"),
+        "benchmarks": [{"fullname": bench["fullname"],
+                        "stats": {key: bench["stats"][key] for key in BASELINE_STATS}}
+                       for bench in data["benchmarks"]],
+    }
+    with open(baseline_path, "w") as f:
+        json.dump(compact, f, indent=1)
+
+
+def compare(baseline, current, stat="min", threshold=0.25):
+    rows, regressions = [], []
+    for name in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[name][stat], current[name][stat]
+        ratio = after / before if before else float("inf")
+        rows.append((name, before, after, ratio))
+        if ratio > 1 + threshold:
+            regressions.append(name)
+    missing = sorted(baseline.keys() - current.keys())
+    added = sorted(current.keys() - baseline.keys())
+    return rows, regressions, missing, added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Confronto dei benchmark con la baseline")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    # il minimo è la statistica meno sensibile al rumore della macchina
+    parser.add_argument("--stat", default="min", choices=["min", "median", "mean"])
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Peggioramento relativo tollerato (0.25 = +25%%)")
+    parser.add_argument("--all", action="store_true", help="Mostra anche i benchmark invariati")
+    parser.add_argument("--update", action="store_true",
+                        help="Salva l'esecuzione corrente come nuova baseline")
+    args = parser.parse_args(argv)
+
+    if args.update:
+        write_baseline(args.current, args.baseline)
+        print(f"Baseline aggiornata in {args.baseline}")
+        return 0
+
+    rows, regressions, missing, added = compare(load(args.baseline), load(args.current),
+                                                args.stat, args.threshold)
+    print(f"{'benchmark':<64} {'baseline µs':>12} {'current µs':>12} {'ratio':>7}")
+    for name, before, after, ratio in rows:
+        flagged = name in regressions
+        if args.all or flagged or ratio < 1 / (1 + args.threshold):
+            mark = "  REGRESSION" if flagged else ""
+            print(f"{name[-64:]:<64} {before * 1e6:>12.1f} {after * 1e6:>12.1f} {ratio:>7.2f}{mark}")
+    for name in missing:
+        print(f"assente nell'esecuzione corrente: {name}")
+    for name in added:
+        print(f"nuovo (senza baseline): {name}")
+
+    print(f"{len(rows)} confrontati, {len(regressions)} oltre la soglia del {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
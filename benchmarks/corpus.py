@@ -0,0 +1,58 @@
+import copy
+from functools import lru_cache
+from game import SnakeGame
+from hamiltonian_agent import HamiltonianAgent
+
+# Corpus fisso di posizioni per i benchmark: per ogni dimensione di griglia e lunghezza del serpente
+# si gioca con l'agente hamiltoniano (deterministico e senza collisioni) dal seed indicato finché il
+# serpente raggiunge la lunghezza voluta. Con la posizione si salvano le LOOKAHEAD mosse successive:
+# ripartendo da lì la partita si ripete identica (il cibo segue la FoodSchedule della partita).
+GRID_SIZES = (10, 16, 20)
+SNAKE_LENGTHS = (1, 8, 24)
+SEED = 7
+LOOKAHEAD = 100
+
+
+class Position:
+    def __init__(self, game, actions):
+        self.game = game
+        self.actions = actions
+
+    @property
+    def label(self):
+        return f"g{self.game.grid_size}-len{len(self.game.snake)}"
+
+    # copia indipendente della partita
+    def fresh(self):
+        return copy.deepcopy(self.game)
+
+
+def _play(game, agent, until):
+    actions = []
+    while not until(game, actions):
+        result = agent.find_path_with_exploration(game)
+        if not result.found:
+            raise RuntimeError("l'agente hamiltoniano non trova il cibo")
+        for next_pos in result.path:
+            head = game.snake[0]
+            action = (next_pos[0] - head[0], next_pos[1] - head[1])
+            game.step(action)
+            actions.append(action)
+            if until(game, actions):
+                break
+    return actions
+
+
+@lru_cache(maxsize=None)
+def position(grid_size, length, seed=SEED):
+    game = SnakeGame(grid_size, seed)
+    agent = HamiltonianAgent()
+    _play(game, agent, lambda g, _: len(g.snake) >= length)
+
+    snapshot = copy.deepcopy(game)
+    actions = _play(game, agent, lambda _, a: len(a) >= LOOKAHEAD)
+    return Position(snapshot, tuple(actions))
+
+
+def all_positions():
+    return [position(grid_size, length) for grid_size in GRID_SIZES for length in SNAKE_LENGTHS]
@@ -0,0 +1,75 @@
+import argparse
+import copy
+import time
+from game import SnakeGame
+from main import HEURISTICS
+from search_agents import AStarAgent, IDAStarAgent
+
+# Confronto delle euristiche sugli agenti A* dello stato completo.
+# Le posizioni sono quelle incontrate giocando partite vere con A* + Manhattan (una per mela);
+# quelle "difficili" sono le pianificazioni in cui A* + Manhattan espande più di HARD_RATIO nodi
+# per passo del piano, tipicamente col cibo dietro un muro di corpo.
+# Uso: python -m benchmarks.heuristics --grids 8 10 12 --seeds 10
+AGENTS = [("astar", AStarAgent), ("idastar", IDAStarAgent)]
+COMPARED = ["manhattan", "tail_time", "body_field"]
+HARD_RATIO = 5
+MAX_EXPANSIONS = 200000
+
+
+def collect_positions(grid_size, seeds, apples):
+    positions = []
+    agent = AStarAgent()
+    for seed in seeds:
+        game = SnakeGame(grid_size, seed)
+        while not game.game_over and game.food is not None and game.score < apples:
+            result = agent.find_path_with_exploration(game, max_expansions=MAX_EXPANSIONS)
+            if not result.found:
+                break
+            positions.append((copy.deepcopy(game), result.nodes_expanded / len(result.path)))
+            for next_pos in result.path:
+                head = game.snake[0]
+                game.step((next_pos[0] - head[0], next_pos[1] - head[1]))
+    return positions
+
+
+def measure(agent, heuristic, positions):
+    expanded, moves, found = 0, 0, 0
+    start_time = time.perf_counter()
+    for game in positions:
+        result = agent.find_path_with_exploration(game, heuristic=heuristic,
+                                                  max_expansions=MAX_EXPANSIONS)
+        expanded += result.nodes_expanded
+        moves += len(result.path)
+        found += result.found
+    return expanded / len(positions), (time.perf_counter() - start_time) / len(positions), moves, found
+
+
+def run(grids, seeds, apples, agents):
+    print(f"{'grid':<6} {'set':<6} {'plans':<6} {'agent':<9} {'heuristic':<11} "
+          f"{'expanded':<10} {'time ms':<9} {'moves':<7} {'ratio':<6}")
+    for grid_size in grids:
+        positions = collect_positions(grid_size, seeds, apples)
+        hard = [game for game, ratio in positions if ratio > HARD_RATIO]
+        for set_name, games in (("all", [game for game, _ in positions]), ("hard", hard)):
+            if not games:
+                continue
+            for agent_name, agent_class in AGENTS:
+                if agent_name not in agents:
+                    continue
+                base = None
+                for heuristic_name in COMPARED:
+                    expanded, plan_time, moves, found = measure(agent_class(), HEURISTICS[heuristic_name], games)
+                    base = base or expanded
+                    print(f"{grid_size:<6} {set_name:<6} {len(games):<6} {agent_name:<9} {heuristic_name:<11} "
+                          f"{expanded:<10.1f} {plan_time * 1000:<9.3f} {moves:<7} {base / max(expanded, 1):<6.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Euristiche geometriche e consapevoli del corpo a confronto")
+    parser.add_argument("--grids", nargs="+", type=int, default=[8, 10, 12])
+    parser.add_argument("--seeds", type=int, default=10, help="Partite per griglia")
+    parser.add_argument("--apples", type=int, default=40, help="Mele massime per partita")
+    parser.add_argument("--agents", nargs="+", default=[name for name, _ in AGENTS],
+                        choices=[name for name, _ in AGENTS])
+    args = parser.parse_args()
+    run(args.grids, range(args.seeds), args.apples, args.agents)
@@ -0,0 +1,38 @@
+import argparse
+import time
+from batch import play_game
+
+# Punteggio dell'agente MCTS al crescere del budget per mossa (iterazioni o millisecondi),
+# con le iterazioni al secondo effettive: quanto punteggio si compra con più CPU.
+# Uso: python -m benchmarks.mcts --grid 8 --iterations 25 50 100 200 --seeds 3
+def run(grid_size, budgets, seeds, apples, rollout_workers, timed):
+    print(f"{'budget':<10} {'workers':<8} {'avg score':<10} {'avg moves':<10} {'iter/s':<9} {'time s':<8}")
+    for budget in budgets:
+        options = {"move_time_ms": budget} if timed else {"iterations": budget}
+        scores, moves, iterations, elapsed = 0, 0, 0, 0.0
+        for seed in seeds:
+            start_time = time.perf_counter()
+            summary, _ = play_game("mcts", grid_size=grid_size, seed=seed, n=apples,
+                                   rollout_workers=rollout_workers, **options)
+            elapsed += time.perf_counter() - start_time
+            scores += summary["score"]
+            moves += summary["moves"]
+            iterations += summary["nodes_expanded"]
+        label = f"{budget}ms" if timed else str(budget)
+        print(f"{label:<10} {rollout_workers:<8} {scores / len(seeds):<10.1f} {moves / len(seeds):<10.1f} "
+              f"{iterations / elapsed:<9.0f} {elapsed:<8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="MCTS: punteggio in funzione del budget per mossa")
+    parser.add_argument("--grid", type=int, default=8)
+    parser.add_argument("--iterations", nargs="+", type=int, default=[25, 50, 100, 200])
+    parser.add_argument("--move-time-ms", nargs="+", type=float, default=None,
+                        help="Budget in ms per mossa al posto delle iterazioni")
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--apples", type=int, default=1000, help="Mele massime per partita")
+    parser.add_argument("--rollout-workers", type=int, default=1)
+    args = parser.parse_args()
+    timed = args.move_time_ms is not None
+    run(args.grid, args.move_time_ms if timed else args.iterations, range(args.seeds), args.apples,
+        args.rollout_workers, timed)
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.corpus import all_positions
+from main import AGENTS, find_plan, make_agent
+
+# find_path di ogni agente sul corpus fisso: a ogni round un agente nuovo (niente alberi riusati
+# tra un round e l'altro) e una copia della posizione. Le espansioni sono limitate perché gli
+# agenti completi non informati sulle griglie grandi non dominino la durata della suite.
+POSITIONS = all_positions()
+IDS = [p.label for p in POSITIONS]
+AGENT_NAMES = [name for name in AGENTS if name != "human"]
+MAX_EXPANSIONS = 20000
+ROUNDS = 5
+
+
+@pytest.mark.parametrize("position", POSITIONS, ids=IDS)
+@pytest.mark.parametrize("agent_name", AGENT_NAMES)
+def test_find_path(benchmark, agent_name, position):
+    def setup():
+        return (make_agent(agent_name), position.fresh()), {}
+
+    def plan(agent, game):
+        return find_plan(agent, agent_name, game, "manhattan", max_expansions=MAX_EXPANSIONS)
+
+    result = benchmark.pedantic(plan, setup=setup, rounds=ROUNDS)
+    assert result.nodes_expanded <= MAX_EXPANSIONS + 1
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.corpus import all_positions
+from search_agents import is_state_safe
+
+# Benchmark del motore di gioco sul corpus fisso (vedi corpus.py).
+# Uso: pytest benchmarks --benchmark-json=current.json
+#      python -m benchmarks.compare benchmarks/baseline.json current.json
+POSITIONS = all_positions()
+IDS = [p.label for p in POSITIONS]
+ROUNDS = 50
+
+
+# LOOKAHEAD passi di gioco a partire dalla posizione (cibo compreso, come nella partita registrata)
+@pytest.mark.parametrize("position", POSITIONS, ids=IDS)
+def test_step(benchmark, position):
+    def setup():
+        return (position.fresh(),), {}
+
+    def play(game):
+        for action in position.actions:
+            game.step(action)
+        return game
+
+    game = benchmark.pedantic(play, setup=setup, rounds=ROUNDS)
+    assert not game.game_over
+
+
+@pytest.mark.parametrize("position", POSITIONS, ids=IDS)
+def test_spawn_food(benchmark, position):
+    game = position.fresh()
+    assert benchmark(game._spawn_food) is not None
+
+
+@pytest.mark.parametrize("position", POSITIONS, ids=IDS)
+def test_clone(benchmark, position):
+    game = position.fresh()
+    clone = benchmark(game.clone)
+    assert list(clone.snake) == list(game.snake)
+
+
+# la stessa sequenza giocata con apply e poi annullata: la partita torna alla posizione iniziale
+@pytest.mark.parametrize("position", POSITIONS, ids=IDS)
+def test_apply_undo(benchmark, position):
+    game = position.fresh()
+    snake = list(game.snake)
+
+    def rollout():
+        snapshot = game.snapshot()
+        for action in position.actions:
+            game.apply(action)
+        game.restore(snapshot)
+
+    benchmark(rollout)
+    assert list(game.snake) == snake
+
+
+@pytest.mark.parametrize("position", POSITIONS, ids=IDS)
+def test_is_state_safe(benchmark, position):
+    game = position.fresh()
+    snake = list(game.snake)
+    assert benchmark(is_state_safe, snake, game.grid_size) in (True, False)
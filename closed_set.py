@@ -0,0 +1,142 @@
+import sys
+from collections import OrderedDict
+
+# Insiemi dei visitati (closed set) intercambiabili per la ricerca completa, con budget di memoria.
+# Il budget vale per l'intera ricerca (closed set, frontiera e archivio dei nodi) e lo fa rispettare
+# l'agente (search_agents._BaseAgent._over_budget): quando viene superato chiede al closed set di
+# liberare memoria con trim, e se non basta si ferma con un piano parziale.
+#  - exact: set Python; trim non libera nulla, quindi col budget pieno la ricerca si ferma
+#  - lru: tabella che scarta gli stati usati meno di recente (evictions), anche tramite trim:
+#    la ricerca continua, ma può rivisitare gli stati scartati
+#  - bloom: filtro di Bloom a dimensione fissa, pensato per DFS: pochi bit per stato,
+#    ma un falso positivo scarta uno stato mai visto (la ricerca resta corretta, non completa).
+#    Occupa metà del budget, l'altra metà resta a frontiera e nodi
+# saturated dice se il budget è stato raggiunto. Il consumo è stimato per voce (dimensione di una
+# chiave campione + costo della tabella): peak_bytes è il massimo raggiunto durante la ricerca.
+CLOSED_SETS = ("exact", "lru", "bloom")
+
+# costo stimato di una voce oltre alla chiave: slot della tabella hash
+# (set) o nodo della lista collegata (OrderedDict)
+SET_ENTRY_BYTES = 40
+LRU_ENTRY_BYTES = 100
+# dimensione del filtro di Bloom senza budget esplicito e numero di funzioni hash
+DEFAULT_BLOOM_BYTES = 1 << 22
+BLOOM_HASHES = 4
+
+
+def _entry_bytes(sample_key, overhead):
+    return sys.getsizeof(sample_key) + overhead
+
+
+# set senza limiti (comportamento predefinito): nessun costo aggiuntivo su add / in
+class ExactClosedSet(set):
+    def __init__(self, sample_key=0):
+        super().__init__()
+        self.entry_bytes = _entry_bytes(sample_key, SET_ENTRY_BYTES)
+        self.saturated = False
+        self.evictions = 0
+
+    @property
+    def peak_bytes(self):
+        return len(self) * self.entry_bytes
+
+    # nessuno stato può essere dimenticato senza perdere la garanzia di non rivisitarlo
+    def trim(self, excess_bytes):
+        return 0
+
+
+class LRUClosedSet:
+    def __init__(self, budget_bytes, sample_key=0):
+        self.entries = OrderedDict()
+        self.entry_bytes = _entry_bytes(sample_key, LRU_ENTRY_BYTES)
+        self.capacity = max(1, budget_bytes // self.entry_bytes)
+        self.evictions = 0
+        self.saturated = False
+        self.peak = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key):
+        entries = self.entries
+        entries[key] = None
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+            self.saturated = True
+
+    # scarta gli stati meno recenti fino a liberare excess_bytes; restituisce i byte liberati
+    def trim(self, excess_bytes):
+        entries = self.entries
+        self.peak = max(self.peak, len(entries))
+        count = min(len(entries), -(-excess_bytes // self.entry_bytes))
+        for _ in range(count):
+            entries.popitem(last=False)
+        self.evictions += count
+        if count:
+            self.saturated = True
+        return count * self.entry_bytes
+
+    # la tabella si accorcia solo in trim, che prima ne registra la dimensione
+    @property
+    def peak_bytes(self):
+        return max(self.peak, len(self.entries)) * self.entry_bytes
+
+
+class BloomClosedSet:
+    def __init__(self, budget_bytes=None, hashes=BLOOM_HASHES):
+        self.bits = bytearray(budget_bytes or DEFAULT_BLOOM_BYTES)
+        self.size = len(self.bits) * 8
+        self.hashes = hashes
+        self.count = 0
+        self.saturated = False
+        self.evictions = 0
+
+    def __len__(self):
+        return self.count
+
+    # doppio hashing: k posizioni ricavate dalle due metà dell'hash della chiave
+    def _positions(self, key):
+        h = hash(key)
+        h1, h2 = h & 0xFFFFFFFF, ((h >> 32) & 0xFFFFFFFF) | 1
+        size = self.size
+        return [(h1 + i * h2) % size for i in range(self.hashes)]
+
+    def __contains__(self, key):
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def add(self, key):
+        bits = self.bits
+        for p in self._positions(key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+        # oltre circa 1/10 di voci per bit i falsi positivi superano l'1%
+        if self.count * 10 > self.size:
+            self.saturated = True
+
+    @property
+    def peak_bytes(self):
+        return len(self.bits)
+
+    # dimensione fissa: non c'è nulla da liberare
+    def trim(self, excess_bytes):
+        return 0
+
+
+def make_closed_set(kind="exact", budget_bytes=None, sample_key=0):
+    if kind == "exact":
+        return ExactClosedSet(sample_key)
+    if kind == "lru":
+        if budget_bytes is None:
+            raise ValueError("Il closed set lru richiede un budget di memoria")
+        return LRUClosedSet(budget_bytes, sample_key)
+    if kind == "bloom":
+        return BloomClosedSet(budget_bytes // 2 if budget_bytes else None)
+    raise ValueError(f"Closed set sconosciuto: {kind}")
@@ -0,0 +1,112 @@
+from collections import deque
+from grid import pos_neighbors
+
+# numpy è opzionale: senza numpy il campo si calcola con una BFS in Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UNREACHABLE = -1
+
+
+# Campo di distanze BFS su tutta la griglia, calcolato a partire da una cella sorgente (il cibo)
+# con gli ostacoli statici del problema rilassato (il corpo del serpente).
+# dist[x][y] = numero di mosse dalla cella (x, y) alla sorgente, UNREACHABLE se non raggiungibile.
+class DistanceField:
+    def __init__(self, grid_size, blocked, source, use_numpy=True):
+        self.grid_size = grid_size
+        self.source = source
+        self.use_numpy = use_numpy and np is not None
+        if self.use_numpy:
+            self.dist, self.reached = self._compute_numpy(grid_size, blocked, source)
+        else:
+            self.dist, self.reached = self._compute_python(grid_size, blocked, source)
+
+    # espansione a fronte d'onda: a ogni iterazione tutte le celle a distanza d+1 in un colpo solo
+    @staticmethod
+    def _compute_numpy(grid_size, blocked, source):
+        free = np.ones((grid_size, grid_size), dtype=bool)
+        if blocked:
+            xs, ys = zip(*blocked)
+            free[list(xs), list(ys)] = False
+
+        dist = np.full((grid_size, grid_size), UNREACHABLE, dtype=np.int32)
+        frontier = np.zeros((grid_size, grid_size), dtype=bool)
+        frontier[source] = True
+        dist[source] = 0
+        unvisited = free.copy()
+        unvisited[source] = False
+
+        reached = 1
+        d = 0
+        grown = np.empty_like(frontier)
+        while True:
+            grown[:] = False
+            grown[1:, :] |= frontier[:-1, :]
+            grown[:-1, :] |= frontier[1:, :]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            grown &= unvisited
+            count = int(grown.sum())
+            if count == 0:
+                break
+            d += 1
+            dist[grown] = d
+            unvisited &= ~grown
+            frontier, grown = grown, frontier
+            reached += count
+        return dist, reached
+
+    @staticmethod
+    def _compute_python(grid_size, blocked, source):
+        adjacency = pos_neighbors(grid_size)
+        dist = [[UNREACHABLE] * grid_size for _ in range(grid_size)]
+        dist[source[0]][source[1]] = 0
+        queue = deque([source])
+        reached = 1
+        while queue:
+            pos = queue.popleft()
+            d = dist[pos[0]][pos[1]] + 1
+            for nb in adjacency[pos]:
+                if nb not in blocked and dist[nb[0]][nb[1]] == UNREACHABLE:
+                    dist[nb[0]][nb[1]] = d
+                    queue.append(nb)
+                    reached += 1
+        return dist, reached
+
+    def distance(self, pos):
+        if self.use_numpy:
+            return int(self.dist[pos])
+        return self.dist[pos[0]][pos[1]]
+
+    def reaches(self, pos):
+        return self.distance(pos) != UNREACHABLE
+
+    # celle raggiunte dal campo (per la visualizzazione)
+    def reached_cells(self):
+        n = self.grid_size
+        return {(x, y) for x in range(n) for y in range(n) if self.distance((x, y)) != UNREACHABLE}
+
+    # discesa del gradiente: da start si passa sempre a un vicino con distanza d-1.
+    # start può essere una cella bloccata (la testa); restituisce None se la sorgente non è raggiungibile
+    def path_from(self, start):
+        adjacency = pos_neighbors(self.grid_size)
+        best = None
+        for nb in adjacency[start]:
+            d = self.distance(nb)
+            if d != UNREACHABLE and (best is None or d < best[0]):
+                best = (d, nb)
+        if best is None:
+            return None
+
+        d, pos = best
+        path = [pos]
+        while d > 0:
+            for nb in adjacency[pos]:
+                if self.distance(nb) == d - 1:
+                    pos = nb
+                    break
+            d -= 1
+            path.append(pos)
+        return path
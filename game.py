@@ -1,29 +1,123 @@
+import copy
 import random
+import threading
+from collections import deque
+
+
+# indice delle celle libere (Fenwick tree): aggiornamenti e selezione della k-esima cella libera in O(log N)
+# mantiene l'ordine per righe, così la scelta del cibo coincide con random.choice sulla lista delle celle vuote
+class _FreeCells:
+    def __init__(self, grid_size):
+        self.grid_size = grid_size
+        self.size = grid_size * grid_size
+        self.count = self.size
+        # tutte le celle libere: il nodo i copre lowbit(i) celle
+        self.tree = [0] + [i & -i for i in range(1, self.size + 1)]
+        self.top = 1 << (self.size.bit_length() - 1)
+
+    def _update(self, cell, delta):
+        i = cell[0] * self.grid_size + cell[1] + 1
+        tree, size = self.tree, self.size
+        while i <= size:
+            tree[i] += delta
+            i += i & -i
+        self.count += delta
+
+    def occupy(self, cell):
+        self._update(cell, -1)
+
+    def release(self, cell):
+        self._update(cell, 1)
+
+    # k-esima cella libera (0-based) in ordine per righe
+    def select(self, k):
+        tree, size = self.tree, self.size
+        pos = 0
+        step = self.top
+        while step:
+            nxt = pos + step
+            if nxt <= size and tree[nxt] <= k:
+                pos = nxt
+                k -= tree[nxt]
+            step >>= 1
+        return divmod(pos, self.grid_size)
+
+
+# Sequenza delle estrazioni per il cibo di una partita, con un generatore proprio (random.Random(seed)).
+# Il j-esimo cibo compare quando il serpente è lungo j + 1, cioè con grid_size² - 1 - j celle libere:
+# l'estrazione j è sempre randrange(grid_size² - 1 - j), qualunque sia la partita giocata.
+# La sequenza è quindi la stessa del vecchio random.seed(seed) globale, non dipende da altri
+# generatori né da altre partite, e può essere condivisa tra le copie della partita (clone, apply/undo)
+# o calcolata tutta in anticipo (precompute) o fornita già pronta (picks).
+class FoodSchedule:
+    def __init__(self, grid_size, seed=42, picks=None):
+        self.cells = grid_size * grid_size
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.picks = list(picks) if picks is not None else []
+        self._lock = threading.Lock()
+
+    # indice, tra le celle libere in ordine per righe, del j-esimo cibo
+    def pick(self, j):
+        picks = self.picks
+        if j >= len(picks):
+            # le estrazioni mancanti si generano in ordine, una volta sola anche se la sequenza
+            # è condivisa tra thread
+            with self._lock:
+                rng, cells = self.rng, self.cells
+                while j >= len(picks):
+                    picks.append(rng.randrange(cells - 1 - len(picks)))
+        return picks[j]
+
+    def precompute(self):
+        if self.cells > 1:
+            self.pick(self.cells - 2)
+        return self
+
+    # il lock non si può copiare: deepcopy e pickle ricreano la sequenza dallo stato del generatore
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
 
 class SnakeGame:
-    def __init__(self, grid_size=10, seed=42):
+    def __init__(self, grid_size=10, seed=42, food_schedule=None):
         self.grid_size = grid_size
-        self.reset(seed)
+        self.reset(seed, food_schedule)
 
     # inizializzazione dell'envinroment
-    def reset(self, seed=42):
-        random.seed(seed)
-        self.snake = [(self.grid_size // 2, self.grid_size // 2)]
+    # food_schedule: sequenza del cibo già pronta (FoodSchedule), altrimenti se ne crea una dal seed
+    def reset(self, seed=42, food_schedule=None):
+        if food_schedule is None:
+            food_schedule = FoodSchedule(self.grid_size, seed)
+        self.food_schedule = food_schedule
+        self.snake = deque([(self.grid_size // 2, self.grid_size // 2)])
+        # celle occupate dal corpo e indice delle celle libere, aggiornati a ogni passo
+        self.occupied = set(self.snake)
+        self.free_cells = _FreeCells(self.grid_size)
+        for cell in self.snake:
+            self.free_cells.occupy(cell)
         self.direction = (0, 1)  # in che verso inizia a guardare, default: verso destra
         self.food = self._spawn_food()
         self.score = 0
         self.game_over = False
         self.moves = 0
         self.seed = seed
+        # registro delle mosse fatte con apply, per annullarle con undo
+        self.history = []
 
     # funzione per far spawnare il cibo 
+    # l'estrazione dipende solo da quanti cibi sono già comparsi (celle totali - libere - 1)
     def _spawn_food(self):
-        empty_cells = [(x, y) for x in range(self.grid_size)
-                       for y in range(self.grid_size)
-                       if (x, y) not in self.snake]
-        if not empty_cells:
+        free = self.free_cells
+        if free.count == 0:
             return None
-        return random.choice(empty_cells)
+        return free.select(self.food_schedule.pick(free.size - 1 - free.count))
 
     # funzione per effettuare un passo nel gioco
     def step(self, action):
@@ -38,12 +132,14 @@ class SnakeGame:
         new_head = (head_x + dx, head_y + dy)
 
         # controlla collisioni (con la griglia e contro se stesso)
-        if (new_head in self.snake) or not (0 <= new_head[0] < self.grid_size) or not (0 <= new_head[1] < self.grid_size):
+        if (new_head in self.occupied) or not (0 <= new_head[0] < self.grid_size) or not (0 <= new_head[1] < self.grid_size):
             self.game_over = True
             return
 
         # muove il serpente
-        self.snake.insert(0, new_head)
+        self.snake.appendleft(new_head)
+        self.occupied.add(new_head)
+        self.free_cells.occupy(new_head)
 
         # controlla se ha mangiato
         if new_head == self.food:
@@ -52,7 +148,9 @@ class SnakeGame:
         else:
             # rimuovo la coda del serpente, dunque il penultimo elemento del corpo diventa la nuova coda
             # le posizioni intermedie del corpo non vengono modificate, si aggiunge un nuovo elemento in testa e si rimuove in coda (FIFO)
-            self.snake.pop()
+            tail = self.snake.pop()
+            self.occupied.discard(tail)
+            self.free_cells.release(tail)
         
         # numero di azioni intraprese dal serpente  
         self.moves += 1
@@ -68,13 +166,78 @@ class SnakeGame:
             "grid_size": self.grid_size,
         }
 
+    # come step, ma registra quanto serve per annullare la mossa in O(1) con undo:
+    # la vecchia coda (None se ha mangiato), il cibo, lo stato di fine partita e le mosse
+    # (il generatore non va riavvolto: il cibo dipende solo da quante mele sono state mangiate)
+    def apply(self, action):
+        food, game_over, moves = self.food, self.game_over, self.moves
+        if game_over:
+            self.history.append((None, food, game_over, moves))
+            return
+
+        head_x, head_y = self.snake[0]
+        new_head = (head_x + action[0], head_y + action[1])
+        grid_size = self.grid_size
+        if (new_head in self.occupied) or not (0 <= new_head[0] < grid_size) or not (0 <= new_head[1] < grid_size):
+            self.history.append((None, food, game_over, moves))
+            self.game_over = True
+            return
+
+        self.snake.appendleft(new_head)
+        self.occupied.add(new_head)
+        self.free_cells.occupy(new_head)
+        if new_head == food:
+            self.history.append((None, food, game_over, moves))
+            self.score += 1
+            self.food = self._spawn_food()
+        else:
+            tail = self.snake.pop()
+            self.occupied.discard(tail)
+            self.free_cells.release(tail)
+            self.history.append((tail, food, game_over, moves))
+        self.moves = moves + 1
+
+    # annulla l'ultima mossa fatta con apply
+    def undo(self):
+        tail, food, game_over, moves = self.history.pop()
+        if self.moves != moves:
+            head = self.snake.popleft()
+            self.occupied.discard(head)
+            self.free_cells.release(head)
+            if tail is None:
+                self.score -= 1
+            else:
+                self.snake.append(tail)
+                self.occupied.add(tail)
+                self.free_cells.occupy(tail)
+        self.food = food
+        self.game_over = game_over
+        self.moves = moves
+
+    # punto di ripristino per una sequenza di apply: restore annulla tutte le mosse successive
+    def snapshot(self):
+        return len(self.history)
+
+    def restore(self, snapshot):
+        while len(self.history) > snapshot:
+            self.undo()
+
     def clone(self):
         """Ritorna una copia dello stato attuale (per la ricerca)."""
-        clone = SnakeGame(self.grid_size)
-        clone.snake = list(self.snake)
+        # senza passare da __init__: reset ricreerebbe il generatore e il cibo;
+        # la sequenza del cibo è condivisa, perché è la stessa per ogni copia della partita
+        clone = SnakeGame.__new__(SnakeGame)
+        clone.grid_size = self.grid_size
+        clone.snake = deque(self.snake)
+        clone.occupied = set(self.occupied)
+        clone.free_cells = copy.copy(self.free_cells)
+        clone.free_cells.tree = self.free_cells.tree[:]
         clone.direction = self.direction
         clone.food = self.food
         clone.score = self.score
         clone.game_over = self.game_over
         clone.moves = self.moves
+        clone.seed = self.seed
+        clone.food_schedule = self.food_schedule
+        clone.history = []
         return clone
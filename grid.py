@@ -0,0 +1,69 @@
+import random
+from array import array
+from functools import lru_cache
+
+# direzioni nello stesso ordine di MOVES (UP, DOWN, LEFT, RIGHT): l'ordine di espansione non cambia
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# Tabelle precalcolate una sola volta per dimensione di griglia.
+# Le celle sono identificate da id = x * grid_size + y.
+
+
+# coordinate (x, y) di ogni cella: evita divmod e nuove tuple nei cicli di ricerca
+@lru_cache(maxsize=None)
+def cell_coords(grid_size):
+    return tuple(divmod(cell, grid_size) for cell in range(grid_size * grid_size))
+
+
+# adiacenza piatta: 4 voci per cella (una per direzione), -1 se la mossa esce dalla griglia
+@lru_cache(maxsize=None)
+def neighbor_array(grid_size):
+    table = array("i")
+    for x, y in cell_coords(grid_size):
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < grid_size and 0 <= ny < grid_size:
+                table.append(nx * grid_size + ny)
+            else:
+                table.append(-1)
+    return table
+
+
+# per ogni cella le sole mosse valide come coppie (indice direzione, cella vicina)
+@lru_cache(maxsize=None)
+def cell_neighbors(grid_size):
+    table = neighbor_array(grid_size)
+    return tuple(
+        tuple((move, table[4 * cell + move]) for move in range(4) if table[4 * cell + move] >= 0)
+        for cell in range(grid_size * grid_size)
+    )
+
+
+# stessa adiacenza indicizzata per coordinate, per gli agenti che lavorano su tuple (x, y)
+@lru_cache(maxsize=None)
+def pos_neighbors(grid_size):
+    coords = cell_coords(grid_size)
+    return {coords[cell]: tuple(coords[nb] for _, nb in moves)
+            for cell, moves in enumerate(cell_neighbors(grid_size))}
+
+
+# maschere per il flood fill a bit paralleli sul bitboard delle celle:
+# tutte le celle, celle senza la prima colonna (y = 0) e celle senza l'ultima colonna
+@lru_cache(maxsize=None)
+def board_masks(grid_size):
+    full = (1 << (grid_size * grid_size)) - 1
+    first_col = sum(1 << (x * grid_size) for x in range(grid_size))
+    last_col = first_col << (grid_size - 1)
+    return full, full & ~first_col, full & ~last_col
+
+
+# chiavi casuali a 64 bit per l'hashing di Zobrist dello stato completo: una per testa in ogni cella
+# e una per ogni coppia (cella, direzione verso il segmento successivo). Generatore dedicato con seed
+# fisso: le chiavi sono riproducibili e il generatore globale (usato per il cibo) non viene toccato
+@lru_cache(maxsize=None)
+def zobrist_table(grid_size):
+    rng = random.Random(grid_size)
+    cells = grid_size * grid_size
+    heads = tuple(rng.getrandbits(64) for _ in range(cells))
+    links = tuple(rng.getrandbits(64) for _ in range(4 * cells))
+    return heads, links
@@ -0,0 +1,97 @@
+from functools import lru_cache
+from grid import cell_coords, cell_neighbors
+from search_agents_relaxed import SearchResult
+
+# oltre questa frazione della griglia occupata il serpente segue solo il ciclo:
+# le celle saltate dalle scorciatoie hanno il tempo di liberarsi prima della fase finale
+SHORTCUT_LIMIT = 0.5
+# celle libere da lasciare comunque davanti alla testa dopo una scorciatoia
+SHORTCUT_MARGIN = 3
+
+
+# Ciclo hamiltoniano della griglia (solo lato pari: con lato dispari non esiste).
+# Riga 0 da sinistra a destra, poi le colonne 1..n-1 a serpentina verso il basso
+# e ritorno in alto lungo la colonna 0. Calcolato una sola volta per dimensione.
+# Restituisce (ordine delle celle, posizione di ogni cella nel ciclo)
+@lru_cache(maxsize=None)
+def hamiltonian_cycle(grid_size):
+    if grid_size < 2 or grid_size % 2:
+        return None
+    n = grid_size
+    order = [y for y in range(n)]
+    for x in range(1, n):
+        columns = range(n - 1, 0, -1) if x % 2 else range(1, n)
+        order.extend(x * n + y for y in columns)
+    order.extend(x * n for x in range(n - 1, 0, -1))
+
+    index = [0] * (n * n)
+    for i, cell in enumerate(order):
+        index[cell] = i
+    return tuple(order), tuple(index)
+
+
+# Agente che segue un ciclo hamiltoniano prendendo scorciatoie sicure verso il cibo.
+# Invariante: percorrendo il ciclo dalla coda alla testa si incontrano tutte le celle del corpo,
+# quindi ogni cella fra la testa e la coda (in avanti lungo il ciclo) è libera.
+# Una scorciatoia è ammessa se non supera né il cibo né la coda: l'invariante resta vera
+# e ogni decisione costa O(1) (al più quattro vicini e qualche differenza di indici).
+class HamiltonianAgent:
+
+    def find_path_with_exploration(self, game, on_expand=None, max_expansions=1000000):
+        start, goal = game.snake[0], game.food
+        cycle = hamiltonian_cycle(game.grid_size)
+        if goal is None or cycle is None:
+            return SearchResult([], 0, 0, 0, False)
+
+        order, index = cycle
+        size = len(order)
+        n = game.grid_size
+        coords = cell_coords(n)
+        adjacency = cell_neighbors(n)
+
+        # corpo dalla coda alla testa: la coda futura dopo k passi senza cibo è body[k]
+        body = [x * n + y for x, y in reversed(game.snake)]
+        head, food = body[-1], goal[0] * n + goal[1]
+        tail_at = 0
+
+        # l'invariante vale solo se la partita è stata giocata dall'inizio con questo agente
+        span = (index[head] - index[body[0]]) % size
+        if any((index[cell] - index[body[0]]) % size > span for cell in body):
+            return SearchResult([], 0, 0, 0, False)
+
+        path = []
+        while head != food and len(path) < max_expansions:
+            tail = body[tail_at]
+            length = len(body) - tail_at
+            to_tail = (index[tail] - index[head]) % size or size
+            to_food = (index[food] - index[head]) % size
+
+            # mossa di base: la cella successiva lungo il ciclo
+            best, best_jump = order[(index[head] + 1) % size], 1
+            if length < SHORTCUT_LIMIT * size:
+                limit = to_tail - SHORTCUT_MARGIN
+                if to_food < to_tail:
+                    limit = min(limit, to_food + 1)
+                for _, nb in adjacency[head]:
+                    jump = (index[nb] - index[head]) % size
+                    if best_jump < jump < limit:
+                        best, best_jump = nb, jump
+
+            # la cella successiva è la coda: il serpente riempie già tutto il ciclo
+            if best == tail:
+                return SearchResult([], len(path), 0, 0, False)
+
+            head = best
+            body.append(head)
+            path.append(coords[head])
+            if head != food:
+                tail_at += 1
+
+        if head != food:
+            return SearchResult([], len(path), 0, 0, False)
+        if on_expand:
+            on_expand([start] + path, set(path), len(path), 0)
+        return SearchResult(path, len(path), len(path), len(path), True)
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
@@ -1,15 +1,198 @@
 from math import sqrt
+from grid import board_masks, cell_neighbors
+
+# numpy è opzionale: senza numpy le tabelle si calcolano in Python puro
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+INF = float("inf")
+
+# Tutte le euristiche accettano g, il numero di passi già fatti dal piano: quelle geometriche
+# lo ignorano, quelle consapevoli del corpo (più sotto) ne hanno bisogno per restare ammissibili.
 
 # distanza Manhattan
-def manhattan(a, b):
+def manhattan(a, b, g=0):
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 # distanza euclidea "in linea d'aria"
-def euclidean_distance(a, b):
+def euclidean_distance(a, b, g=0):
     return sqrt((a[0]-b[0])**2 + (a[1]-b[1])**2)
 
 # distanza diagonale o di Chebyshev
-def diagonal_distance(a, b):
+def diagonal_distance(a, b, g=0):
     dx = abs(a[0] - b[0])
     dy = abs(a[1] - b[1])
     return max(dx, dy)
+
+
+# --- Euristiche consapevoli del corpo ---
+# Il corpo non è un muro fisso: il segmento i (0 = testa) di un serpente lungo L si libera dopo
+# L - i mosse e, come in _next_states, la coda conta ancora come ostacolo nella mossa in cui si sposta,
+# quindi la testa può entrarci dal passo L - i + 1. Ignorando l'allungamento (il cibo è il goal)
+# e il corpo nuovo lasciato dalla testa si ottiene un rilassamento: le stime sono ammissibili.
+# Le tabelle dipendono dal corpo e dal cibo: gli agenti A* le preparano una volta per pianificazione
+# con prepare_heuristic. Usate senza preparazione (greedy, LPA*, A* bidirezionale) valgono quanto Manhattan.
+
+
+# passo dal quale la testa può occupare ogni cella (0 per le celle libere), celle come id x * n + y
+def release_times(snake, grid_size):
+    release = [0] * (grid_size * grid_size)
+    length = len(snake)
+    for i, (x, y) in enumerate(snake):
+        release[x * grid_size + y] = length - i + 1
+    return release
+
+
+# euristica pronta per la pianificazione corrente (le funzioni geometriche restano come sono)
+def prepare_heuristic(heuristic, game):
+    prepare = getattr(heuristic, "prepare", None)
+    return prepare(game) if prepare is not None else heuristic
+
+
+class _BodyAwareHeuristic:
+    # senza preparazione: solo la parte geometrica
+    def __call__(self, a, b, g=0):
+        return manhattan(a, b)
+
+    # le tabelle dipendono solo da corpo e cibo: l'ultima preparazione viene riusata se la stessa
+    # posizione viene pianificata di nuovo (es. più agenti sulla stessa partita)
+    def prepare(self, game):
+        key = (tuple(game.snake), game.food, game.grid_size)
+        if getattr(self, "_cached_key", None) != key:
+            self._cached_key = key
+            self._cached = self._build(list(game.snake), game.food, game.grid_size)
+        return self._cached
+
+
+# max(Manhattan, T - g): T è il primo passo in cui la testa può arrivare sul cibo aspettando che il
+# corpo si liberi, calcolato una volta per piano con un'espansione a bit paralleli sul bitboard
+# (a ogni passo la frontiera avanza e si aggiungono le celle appena liberate).
+# Ogni piano arriva al cibo non prima di T, quindi da un nodo a profondità g mancano almeno T - g passi.
+class TailTimeHeuristic(_BodyAwareHeuristic):
+
+    @staticmethod
+    def arrival_time(snake, food, grid_size):
+        full, not_first_col, not_last_col = board_masks(grid_size)
+        n = grid_size
+        length = len(snake)
+        free = full
+        for x, y in snake:
+            free &= ~(1 << (x * n + y))
+        target = 1 << (food[0] * n + food[1])
+        reach = 1 << (snake[0][0] * n + snake[0][1])
+        # dopo l'ultima liberazione la griglia è vuota: il cibo arriva entro altre 2n mosse o mai
+        for step in range(1, length + 2 * n + 2):
+            i = length + 1 - step
+            if 0 <= i < length:
+                x, y = snake[i]
+                free |= 1 << (x * n + y)
+            reach = (((reach << 1) & not_first_col) | ((reach >> 1) & not_last_col)
+                     | (reach << n) | (reach >> n)) & free
+            if reach & target:
+                return step
+            if not reach:
+                break
+        return INF
+
+    def _build(self, snake, food, grid_size):
+        arrival = self.arrival_time(snake, food, grid_size)
+        fx, fy = food
+
+        def estimate(pos, goal, g):
+            d = abs(pos[0] - fx) + abs(pos[1] - fy)
+            return max(d, arrival - g)
+        return estimate
+
+
+# Campo di distanze dal cibo che tiene conto di quando ogni cella del corpo si libera
+# (la BFS rilassata del piano, ma con i tempi di liberazione al posto dei muri).
+# need_m[c] = minimo g dal quale esiste un cammino di m passi da c al cibo che entra in ogni cella
+# solo quando è libera: need_m[c] = min sui vicini v di max(release[v], need_{m-1}[v]) - 1.
+# h(c, g) = minimo m con need_m[c] <= g; per ogni cella si tengono solo i punti in cui need migliora.
+# Ci si ferma quando uno strato coincide con quello di due passi prima: da lì gli strati si ripetono.
+class BodyFieldHeuristic(_BodyAwareHeuristic):
+    def __init__(self, use_numpy=True):
+        self.use_numpy = use_numpy and np is not None
+
+    def _build(self, snake, food, grid_size):
+        release = release_times(snake, grid_size)
+        source = food[0] * grid_size + food[1]
+        if self.use_numpy:
+            table = self._table_numpy(release, source, grid_size)
+        else:
+            table = self._table_python(release, source, grid_size)
+        n = grid_size
+
+        def estimate(pos, goal, g):
+            for need, m in table[pos[0] * n + pos[1]]:
+                if need <= g:
+                    return m
+            return INF
+        return estimate
+
+    # un limite di strati comunque sicuro: dopo l'ultima liberazione bastano altri n * n passi
+    @staticmethod
+    def _max_layers(release, grid_size):
+        return max(release) + grid_size * grid_size + 2
+
+    @staticmethod
+    def _table_python(release, source, grid_size):
+        cells = grid_size * grid_size
+        adjacency = cell_neighbors(grid_size)
+        big = cells + max(release) + 1
+        need = [big] * cells
+        need[source] = 0
+        table = [[] for _ in range(cells)]
+        table[source].append((0, 0))
+        best = list(need)
+        previous = None
+
+        for m in range(1, BodyFieldHeuristic._max_layers(release, grid_size)):
+            # valore di ogni cella come prossimo passo (g >= 0: need negativi equivalgono a 0)
+            through = [max(r, v) for r, v in zip(release, need)]
+            layer = [big] * cells
+            for cell in range(cells):
+                low = min(through[nb] for _, nb in adjacency[cell])
+                if low < big:
+                    layer[cell] = max(low - 1, 0)
+                    if layer[cell] < best[cell]:
+                        best[cell] = layer[cell]
+                        table[cell].append((layer[cell], m))
+            if layer == previous:
+                break
+            previous, need = need, layer
+        return table
+
+    @staticmethod
+    def _table_numpy(release, source, grid_size):
+        n = grid_size
+        cells = n * n
+        big = cells + max(release) + 1
+        layers = BodyFieldHeuristic._max_layers(release, n)
+        release = np.array(release, dtype=np.int32).reshape(n, n)
+        need = np.full((n, n), big, dtype=np.int32)
+        need.flat[source] = 0
+        best = need.copy()
+        table = [[] for _ in range(cells)]
+        table[source].append((0, 0))
+        previous = None
+        low = np.empty_like(need)
+
+        for m in range(1, layers):
+            through = np.maximum(release, need)
+            low[:] = big
+            np.minimum(low[1:, :], through[:-1, :], out=low[1:, :])
+            np.minimum(low[:-1, :], through[1:, :], out=low[:-1, :])
+            np.minimum(low[:, 1:], through[:, :-1], out=low[:, 1:])
+            np.minimum(low[:, :-1], through[:, 1:], out=low[:, :-1])
+            layer = np.where(low < big, np.maximum(low - 1, 0), big)
+            for cell in np.flatnonzero(layer < best).tolist():
+                value = int(layer.flat[cell])
+                best.flat[cell] = value
+                table[cell].append((value, m))
+            if previous is not None and np.array_equal(layer, previous):
+                break
+            previous, need = need, layer
+        return table
@@ -1,7 +1,7 @@
-import pygame
-
 class HumanAgent:
     def get_action(self):
+        # import locale: il modulo resta importabile anche senza pygame (modalità headless)
+        import pygame
         keys = pygame.key.get_pressed()
         if keys[pygame.K_UP]:
             return (-1, 0)
@@ -0,0 +1,120 @@
+import heapq
+from grid import cell_coords, cell_neighbors
+
+INF = float("inf")
+
+
+# Lifelong Planning A* (Koenig, Likhachev) sulla griglia rilassata, con celle identificate da id.
+# I valori g/rhs sono distanze dalla radice e non dipendono dal goal: l'albero sopravvive tra una
+# pianificazione e l'altra e quando cambiano le celle bloccate o il goal si ripara solo ciò che serve.
+# L'euristica deve essere consistente (manhattan, euclidea e diagonale lo sono sulla griglia).
+class LPAStar:
+    def __init__(self, grid_size, root, blocked, goal, heuristic):
+        self.grid_size = grid_size
+        self.coords = cell_coords(grid_size)
+        self.adjacency = cell_neighbors(grid_size)
+        self.heuristic = heuristic
+        self.root = root
+        self.blocked = set(blocked)
+        self.goal = goal
+        self._goal_pos = self.coords[goal]
+
+        self.g = [INF] * (grid_size * grid_size)
+        self.rhs = [INF] * (grid_size * grid_size)
+        self.rhs[root] = 0
+        # heap con cancellazione pigra: una voce è valida solo se la cella è inconsistente
+        # e la chiave coincide con quella attuale
+        self.open = [self._key(root) + (root,)]
+
+    def _key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self.heuristic(self.coords[cell], self._goal_pos), best)
+
+    def _update_vertex(self, cell):
+        g, rhs = self.g, self.rhs
+        if cell != self.root:
+            if cell in self.blocked:
+                rhs[cell] = INF
+            else:
+                blocked = self.blocked
+                best = INF
+                for _, nb in self.adjacency[cell]:
+                    if nb not in blocked and g[nb] < best:
+                        best = g[nb]
+                rhs[cell] = best + 1
+        if g[cell] != rhs[cell]:
+            heapq.heappush(self.open, self._key(cell) + (cell,))
+
+    # nuove celle bloccate e nuovo goal: si aggiornano solo le celle cambiate e i loro vicini
+    def update(self, blocked, goal):
+        changed = self.blocked ^ blocked
+        self.blocked = set(blocked)
+        for cell in changed:
+            self._update_vertex(cell)
+            for _, nb in self.adjacency[cell]:
+                self._update_vertex(nb)
+
+        if goal != self.goal:
+            # cambia l'euristica: le chiavi in coda vanno ricalcolate
+            self.goal = goal
+            self._goal_pos = self.coords[goal]
+            pending = {cell for _, _, cell in self.open if self.g[cell] != self.rhs[cell]}
+            self.open = [self._key(cell) + (cell,) for cell in pending]
+            heapq.heapify(self.open)
+
+    # espande finché il goal è consistente e nessuna chiave in coda è minore della sua.
+    # on_cell(cell, nodes_expanded, frontier_size) viene chiamata a ogni espansione;
+    # con una search_nodes.Deadline si ferma a tempo scaduto, ricordando la cella raggiunta più vicina al goal
+    def compute(self, max_expansions=1000000, on_cell=None, deadline=None):
+        g, rhs, open_list = self.g, self.rhs, self.open
+        adjacency, goal = self.adjacency, self.goal
+        coords, heuristic, goal_pos = self.coords, self.heuristic, self._goal_pos
+        nodes_expanded = 0
+
+        while open_list:
+            k1, k2, cell = open_list[0]
+            key = self._key(cell)
+            if g[cell] == rhs[cell] or (k1, k2) != key:
+                heapq.heappop(open_list)
+                continue
+            if g[goal] == rhs[goal] and key >= self._key(goal):
+                break
+            if max_expansions <= 0:
+                return nodes_expanded, False
+            heapq.heappop(open_list)
+            nodes_expanded += 1
+            max_expansions -= 1
+
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self._update_vertex(cell)
+            for _, nb in adjacency[cell]:
+                self._update_vertex(nb)
+
+            if on_cell:
+                on_cell(cell, nodes_expanded, len(open_list))
+            if deadline:
+                reached = g[cell] < INF and cell != self.root
+                if deadline.visit(cell if reached else None,
+                                  heuristic(coords[cell], goal_pos) if reached else INF):
+                    return nodes_expanded, False
+
+        return nodes_expanded, g[goal] < INF
+
+    # celle dalla cella data alla radice (entrambe incluse) seguendo il vicino con g minore;
+    # None se la catena si interrompe (cella non ancora consistente)
+    def path_to_root(self, cell):
+        g, blocked = self.g, self.blocked
+        path = [cell]
+        while cell != self.root:
+            best, best_g = None, g[cell]
+            for _, nb in self.adjacency[cell]:
+                if nb not in blocked and g[nb] < best_g:
+                    best, best_g = nb, g[nb]
+            if best is None:
+                return None
+            cell = best
+            path.append(cell)
+        return path
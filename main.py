@@ -1,11 +1,17 @@
 import argparse
 from game import SnakeGame
-from renderer import Renderer
 from human_agent import HumanAgent
-from search_agents import BFSAgent, DFSAgent, GreedyAgent, AStarAgent
-from search_agents_relaxed import Relaxed_BFSAgent, Relaxed_DFSAgent, Relaxed_AStarAgent, Relaxed_GreedyAgent
-from heuristics import manhattan, euclidean_distance, diagonal_distance
-import pygame
+from hamiltonian_agent import HamiltonianAgent
+from mcts_agent import MCTSAgent
+from search_agents import BFSAgent, DFSAgent, GreedyAgent, AStarAgent, SafeAStarAgent, IDAStarAgent, \
+    SMAStarAgent
+from search_agents_relaxed import Relaxed_BFSAgent, Relaxed_DFSAgent, Relaxed_AStarAgent, Relaxed_GreedyAgent, \
+    Relaxed_LPAStarAgent, Relaxed_BidirectionalBFSAgent, Relaxed_BidirectionalAStarAgent
+from heuristics import manhattan, euclidean_distance, diagonal_distance, TailTimeHeuristic, BodyFieldHeuristic
+from search_nodes import TIE_BREAKS, ExpandNotifier
+from closed_set import CLOSED_SETS
+from replay import GameRecorder
+from profiling import SearchProbe, write_profile, print_profile
 import time
 
 AGENTS = {
@@ -14,95 +20,234 @@ AGENTS = {
     "dfs": DFSAgent,
     "greedy": GreedyAgent,
     "astar": AStarAgent,
+    "safe_astar": SafeAStarAgent,
+    "idastar": IDAStarAgent,
+    "smastar": SMAStarAgent,
     "relaxed_bfs": Relaxed_BFSAgent,
     "relaxed_dfs": Relaxed_DFSAgent,
     "relaxed_astar": Relaxed_AStarAgent,
     "relaxed_greedy": Relaxed_GreedyAgent,
+    "relaxed_lpastar": Relaxed_LPAStarAgent,
+    "relaxed_bibfs": Relaxed_BidirectionalBFSAgent,
+    "relaxed_biastar": Relaxed_BidirectionalAStarAgent,
+    "hamiltonian": HamiltonianAgent,
+    "mcts": MCTSAgent,
 }
 
 HEURISTICS = {
     "manhattan": manhattan,
     "euclidean": euclidean_distance,
     "diagonal": diagonal_distance,
+    # consapevoli del corpo (agenti A* sullo stato completo; altrove valgono quanto manhattan)
+    "tail_time": TailTimeHeuristic(),
+    "body_field": BodyFieldHeuristic(),
 }
 
+# agenti che ricevono una funzione euristica
+INFORMED_AGENTS = ["relaxed_astar", "relaxed_greedy", "relaxed_lpastar", "relaxed_biastar",
+                   "greedy", "astar",
+                   "safe_astar", "idastar", "smastar"]
+
+# agenti che accettano un limite di tempo per ricerca e a tempo scaduto restituiscono un piano parziale
+ANYTIME_AGENTS = ["bfs", "dfs", "greedy", "astar", "safe_astar", "idastar", "smastar",
+                  "relaxed_bfs", "relaxed_dfs", "relaxed_astar", "relaxed_greedy", "relaxed_lpastar",
+                  "relaxed_bibfs", "relaxed_biastar"]
+
+
+# opzioni di costruzione accettate da ciascun agente
+CLOSED_SET_OPTIONS = ["closed_set", "memory_budget_mb", "zobrist"]
+AGENT_OPTIONS = {
+    "bfs": CLOSED_SET_OPTIONS,
+    "dfs": CLOSED_SET_OPTIONS,
+    "greedy": ["tie_break"] + CLOSED_SET_OPTIONS,
+    "astar": CLOSED_SET_OPTIONS,
+    "safe_astar": CLOSED_SET_OPTIONS,
+    # senza closed set: accettano zobrist e rifiutano lru / bloom e il budget di memoria
+    "idastar": CLOSED_SET_OPTIONS,
+    "smastar": ["max_nodes"] + CLOSED_SET_OPTIONS,
+    "relaxed_greedy": ["tie_break"],
+    "relaxed_bfs": ["distance_field"],
+    "relaxed_astar": ["distance_field"],
+    "mcts": ["iterations", "move_time_ms", "rollout_workers"],
+}
+
+
+# crea l'agente passando solo le opzioni che supporta
+def make_agent(agent_name, **options):
+    supported = AGENT_OPTIONS.get(agent_name, [])
+    return AGENTS[agent_name](**{k: v for k, v in options.items() if k in supported})
+
+
+# pianifica il percorso verso il cibo corrente (usato sia dal gioco che dal batch runner).
+# Con un probe (profiling.SearchProbe) la ricerca viene misurata e probe.record ne contiene le metriche.
+# time_budget_ms vale solo per ANYTIME_AGENTS: il risultato può essere un piano parziale (result.partial)
+def find_plan(agent, agent_name, game, heuristic_name="manhattan",
+              max_expansions=1000000, on_expand=None, probe=None, time_budget_ms=None):
+    options = {}
+    if agent_name in INFORMED_AGENTS:
+        options["heuristic"] = HEURISTICS[heuristic_name]
+    if time_budget_ms and agent_name in ANYTIME_AGENTS:
+        options["time_budget_ms"] = time_budget_ms
+    if probe is None:
+        return agent.find_path_with_exploration(
+            game,
+            on_expand=on_expand,
+            max_expansions=max_expansions,
+            **options
+        )
+
+    probe.attach(agent)
+    probe.reset()
+    if "heuristic" in options:
+        options["heuristic"] = probe.heuristic(options["heuristic"])
+    start_time = time.perf_counter()
+    try:
+        result = agent.find_path_with_exploration(
+            game,
+            on_expand=on_expand,
+            max_expansions=max_expansions,
+            **options
+        )
+    finally:
+        probe.detach(agent)
+    probe.finish(result, time.perf_counter() - start_time)
+    return result
+
 
 def run_game(agent_name="bfs", heuristic_name="manhattan", n=101, grid_size=10,
              seed=42, fps=1, think_speed=0.001, max_expansions=1000000,
-             windowed=True):
+             windowed=True, render=True, tie_break="fifo",
+             think_every=1, think_interval_ms=0, record=None, distance_field=False,
+             closed_set="exact", memory_budget_mb=None, zobrist=False, max_nodes=100000,
+             profile=None, iterations=50, move_time_ms=None, rollout_workers=1, time_budget_ms=None):
+
+    if agent_name == "human" and not render:
+        raise ValueError("L'agente umano richiede il rendering")
+
+    # pygame viene importato solo se serve la visualizzazione
+    if render:
+        import pygame
+        from renderer import Renderer
 
     game = SnakeGame(grid_size, seed)
-    agent = AGENTS[agent_name]()
-    renderer = Renderer(grid_size, agent_name=agent_name, fps=fps,
-                        think_delay_s=think_speed, windowed=windowed) 
+    agent = make_agent(agent_name, tie_break=tie_break, distance_field=distance_field,
+                       closed_set=closed_set, memory_budget_mb=memory_budget_mb, zobrist=zobrist,
+                       max_nodes=max_nodes, iterations=iterations, move_time_ms=move_time_ms,
+                       rollout_workers=rollout_workers)
+    renderer = None
+    if render:
+        renderer = Renderer(grid_size, agent_name=agent_name, fps=fps,
+                            think_delay_s=think_speed, windowed=windowed)
     human = HumanAgent() if agent_name == "human" else None
 
-    stage = 1
+    # strumentazione opzionale delle ricerche, esportata in profile (vedi profiling.py)
+    probe = SearchProbe() if profile else None
+    profile_rows = []
 
-    while not game.game_over and game.score < n:
+    # registrazione opzionale della partita (vedi replay.py)
+    recorder = None
+    if record:
+        recorder = GameRecorder(record, agent_name, heuristic_name, grid_size, seed)
 
-        # --- Input umano ---
-        if agent_name == "human":
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return
-            action = human.get_action()
-            if action:
-                game.step(action)
-                renderer.draw(game)
-                renderer.tick_execution()
-            continue
-
-        # --- Callback per la visualizzazione della ricerca ---
-        def on_expand(path, visited, nodes_expanded, frontier_size):
-            renderer.show_thought_step(
-                game, path, visited, nodes_expanded, frontier_size
-            )
-
-        # --- Se l’agente usa una euristica ---
-        if agent_name in ["relaxed_astar", "relaxed_greedy", "greedy", "astar"]:
-            heuristic = HEURISTICS[heuristic_name]
-            result = agent.find_path_with_exploration(
-                game,
-                on_expand=on_expand,
-                heuristic=heuristic,
-                max_expansions=max_expansions
-            )
-        else:
-            result = agent.find_path_with_exploration(
-                game,
-                on_expand=on_expand,
-                max_expansions=max_expansions
-            )
-
-        if not result.found:
-            print(f" Nessun percorso trovato (sottoproblema {stage})")
-            break
-
-        renderer.draw(
-            game,
-            path=result.path,
-            visited=None,
-            overlay_info=f"Plan found — cost {result.cost} | expanded {result.nodes_expanded}"
-        )
-        pygame.event.pump()
-        time.sleep(0.5)
-
-        # --- Esecuzione del piano ---
-        for next_pos in result.path:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    return
-            if game.game_over:
+    try:
+        stage = 1
+        # mosse dall'ultima mela: i piani parziali non garantiscono di arrivarci
+        last_apple_moves = 0
+
+        while not game.game_over and game.score < n:
+
+            # --- Input umano ---
+            if agent_name == "human":
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+                action = human.get_action()
+                if action:
+                    game.step(action)
+                    if recorder:
+                        recorder.action(action)
+                    renderer.draw(game)
+                    renderer.tick_execution()
+                continue
+
+            # griglia piena: non c'è più cibo da cercare
+            if game.food is None:
+                print(" Griglia completata!")
                 break
-            head = game.snake[0]
-            action = (next_pos[0] - head[0], next_pos[1] - head[1])
-            game.step(action)
-            renderer.draw(game)
-            renderer.tick_execution()
 
-        print(f" Mela {stage} mangiata! (expanded: {result.nodes_expanded}, cost: {result.cost})")
-        stage += 1
+            # --- Callback per la visualizzazione della ricerca (limitata in frequenza) ---
+            def show_thought(path, visited, nodes_expanded, frontier_size):
+                renderer.show_thought_step(
+                    game, path, visited, nodes_expanded, frontier_size
+                )
+            on_expand = ExpandNotifier(show_thought, every=think_every,
+                                       interval_ms=think_interval_ms)
+
+            plan_start = time.perf_counter()
+            result = find_plan(agent, agent_name, game, heuristic_name,
+                               max_expansions=max_expansions,
+                               on_expand=on_expand if render else None, probe=probe,
+                               time_budget_ms=time_budget_ms)
+            if recorder:
+                recorder.plan(result, time.perf_counter() - plan_start)
+            if probe:
+                profile_rows.append(dict(probe.record, agent=agent_name, heuristic=heuristic_name,
+                                         grid=grid_size, seed=seed, apple=stage,
+                                         nodes_expanded=result.nodes_expanded))
+
+            if not result.found:
+                print(f" Nessun percorso trovato (sottoproblema {stage})")
+                break
+
+            if render:
+                renderer.draw(
+                    game,
+                    path=result.path,
+                    visited=None,
+                    overlay_info=f"Plan found — cost {result.cost} | expanded {result.nodes_expanded}"
+                )
+                pygame.event.pump()
+                time.sleep(0.5)
+
+            # --- Esecuzione del piano ---
+            for next_pos in result.path:
+                if render:
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
+                            return
+                if game.game_over:
+                    break
+                head = game.snake[0]
+                action = (next_pos[0] - head[0], next_pos[1] - head[1])
+                game.step(action)
+                if recorder:
+                    recorder.action(action)
+                if render:
+                    renderer.draw(game)
+                    renderer.tick_execution()
+
+            # piano parziale: si ripianifica dalla nuova posizione verso la stessa mela,
+            # ma dopo grid² mosse senza mangiare la partita si ferma
+            if getattr(result, "partial", False):
+                print(f" Piano parziale di {len(result.path)} passi (expanded: {result.nodes_expanded})")
+                if game.moves - last_apple_moves >= grid_size * grid_size:
+                    print(f" Nessun progresso verso la mela {stage} in {grid_size * grid_size} mosse")
+                    break
+                continue
+            last_apple_moves = game.moves
+            print(f" Mela {stage} mangiata! (expanded: {result.nodes_expanded}, cost: {result.cost})")
+            if hasattr(result, "iterations_per_s"):
+                print(f"   MCTS: {result.iterations_per_s:.0f} iterazioni/s")
+            stage += 1
+    finally:
+        # processi di rollout dell'agente MCTS
+        if hasattr(agent, "close"):
+            agent.close()
+        if recorder:
+            recorder.close(game)
+        if profile_rows:
+            print(f"Profilo salvato in {write_profile(profile, profile_rows)}")
+            print_profile(profile_rows)
 
     print(f"Gioco terminato. Score: {game.score}")
 
@@ -111,17 +256,47 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--agent", type=str, default="bfs", choices=AGENTS.keys())
     parser.add_argument("--heuristic", type=str, default="manhattan",
-                        choices=["manhattan", "euclidean", "diagonal"])
+                        choices=HEURISTICS.keys())
     parser.add_argument("--n", type=int, default=50)
     parser.add_argument("--grid", type=int, default=10)
     parser.add_argument("--seed", type=int, default=42)
     parser.add_argument("--fps", type=int, default=10)
     parser.add_argument("--think-speed", type=float, default=0.08)
+    parser.add_argument("--think-every", type=int, default=1,
+                        help="Mostra un passo del ragionamento ogni k espansioni")
+    parser.add_argument("--think-interval-ms", type=float, default=0,
+                        help="Intervallo minimo in ms tra due passi del ragionamento mostrati")
     parser.add_argument("--max_expansions", type=int, default=1000000)
+    parser.add_argument("--tie-break", type=str, default="fifo", choices=TIE_BREAKS,
+                        help="Spareggio a parità di euristica per gli agenti greedy")
 
     # --- Flag per finestra o borderless fullscreen ---
     parser.add_argument("--windowed", action="store_true",
                         help="Apri la finestra normale invece che borderless fullscreen")
+    parser.add_argument("--distance-field", action="store_true",
+                        help="relaxed_bfs/relaxed_astar: usa il campo di distanze vettoriale (numpy)")
+    parser.add_argument("--closed-set", type=str, default="exact", choices=CLOSED_SETS,
+                        help="Insieme dei visitati degli agenti completi (bloom solo per dfs)")
+    parser.add_argument("--memory-budget-mb", type=float, default=None,
+                        help="Budget di memoria del closed set in MB")
+    parser.add_argument("--zobrist", action="store_true",
+                        help="Chiavi di Zobrist a 64 bit al posto dello stato completo")
+    parser.add_argument("--max-nodes", type=int, default=100000,
+                        help="smastar: numero massimo di nodi in memoria")
+    parser.add_argument("--no-render", action="store_true",
+                        help="Esegui la partita senza finestra (pygame non viene importato)")
+    parser.add_argument("--record", type=str, default=None,
+                        help="Salva la partita in un log NDJSON rivedibile con replay.py")
+    parser.add_argument("--profile", type=str, default=None,
+                        help="Misura ogni ricerca e salva le metriche (.json, oppure .prom per Prometheus)")
+    parser.add_argument("--iterations", type=int, default=50,
+                        help="mcts: iterazioni per mossa")
+    parser.add_argument("--move-time-ms", type=float, default=None,
+                        help="mcts: tempo per mossa in ms (al posto delle iterazioni)")
+    parser.add_argument("--rollout-workers", type=int, default=1,
+                        help="mcts: processi che cercano in parallelo dalla radice")
+    parser.add_argument("--time-budget-ms", type=float, default=None,
+                        help="Tempo massimo per ricerca in ms: scaduto, si segue il miglior piano parziale")
 
     args = parser.parse_args()
 
@@ -134,5 +309,20 @@ if __name__ == "__main__":
         fps=args.fps,
         think_speed=args.think_speed,
         max_expansions=args.max_expansions,
-        windowed=args.windowed
+        windowed=args.windowed,
+        render=not args.no_render,
+        tie_break=args.tie_break,
+        think_every=args.think_every,
+        think_interval_ms=args.think_interval_ms,
+        record=args.record,
+        distance_field=args.distance_field,
+        closed_set=args.closed_set,
+        memory_budget_mb=args.memory_budget_mb,
+        zobrist=args.zobrist,
+        max_nodes=args.max_nodes,
+        profile=args.profile,
+        iterations=args.iterations,
+        move_time_ms=args.move_time_ms,
+        rollout_workers=args.rollout_workers,
+        time_budget_ms=args.time_budget_ms
     )
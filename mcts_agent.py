@@ -0,0 +1,289 @@
+import math
+import random
+import time
+from multiprocessing import Pipe, Process
+from grid import DIRECTIONS
+from search_agents import is_state_safe
+from search_agents_relaxed import SearchResult
+
+# Monte Carlo Tree Search sullo stato completo. A differenza degli agenti di ricerca non pianifica un
+# percorso fino al cibo: sceglie una mossa alla volta, e ogni scelta guarda anche a cosa succede dopo
+# aver mangiato. Per ogni mossa:
+#  - selezione con UCT fino a un nodo con mosse non ancora provate, espansione di una di queste
+#  - rollout con una politica veloce (mossa sicura verso il cibo o a caso) per al più rollout_depth passi
+#  - ritorno scontato: +1 per mela, -10 per la sconfitta (anche quando a fine rollout la testa non
+#    raggiunge più la coda), propagato su tutti i nodi attraversati
+# Una sola partita di lavoro per ricerca: le mosse si fanno con apply e si annullano con restore,
+# e dato che il cibo segue la FoodSchedule della partita ogni nodo corrisponde a un solo stato.
+# Dopo la mossa scelta il sottoalbero del figlio diventa la nuova radice (riuso dell'albero).
+# Con workers > 1 la ricerca è parallela alla radice: ogni processo ha il suo albero (riusato tra
+# le mosse), cerca dallo stesso stato e le visite dei figli della radice vengono sommate.
+APPLE_REWARD = 1.0
+# con -1 una sconfitta lontana pesa meno di una mela vicina e l'agente si chiude da solo:
+# su 8x8 (5 seed, 25 iterazioni) il punteggio medio passa da 40 a 62 su 63
+DEATH_REWARD = -10.0
+
+
+class _MCTSNode:
+    __slots__ = ("children", "untried", "visits", "value", "reward", "doomed")
+
+    def __init__(self, moves, reward=0.0):
+        self.children = {}  # indice in DIRECTIONS -> nodo
+        self.untried = moves
+        self.visits = 0
+        self.value = 0.0
+        self.reward = reward  # ricompensa della mossa che porta al nodo
+        self.doomed = not moves  # nessuna mossa sicura: la partita è persa al passo successivo
+
+
+# mosse che non fanno perdere la partita al passo successivo (la coda conta come ostacolo, come in step)
+def _safe_moves(game):
+    head_x, head_y = game.snake[0]
+    n, occupied = game.grid_size, game.occupied
+    moves = []
+    for move, (dx, dy) in enumerate(DIRECTIONS):
+        x, y = head_x + dx, head_y + dy
+        if 0 <= x < n and 0 <= y < n and (x, y) not in occupied:
+            moves.append(move)
+    return moves
+
+
+def _state_key(game):
+    return tuple(game.snake), game.food
+
+
+class MCTSAgent:
+    # strumentazione opzionale (profiling.SearchProbe): "visitati" sono i nodi dell'albero
+    probe = None
+
+    def __init__(self, iterations=50, move_time_ms=None, rollout_workers=1, rollout_depth=None,
+                 exploration=1.0, discount=0.95, greedy_rollout=0.5, tail_check=True, seed=0):
+        # budget per mossa: iterazioni (divise tra i processi) oppure millisecondi
+        self.iterations = iterations
+        self.move_time_ms = move_time_ms
+        self.workers = max(1, rollout_workers)
+        self.rollout_depth = rollout_depth
+        self.exploration = exploration
+        self.discount = discount
+        self.greedy_rollout = greedy_rollout
+        self.tail_check = tail_check
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.iterations_per_s = 0.0
+        self._root = None
+        self._root_game = None
+        self._tree_size = 0
+        self._pool = []
+
+    # --- Albero ---
+
+    # radice per lo stato della partita: la vecchia radice, uno dei suoi figli o un albero nuovo
+    def _reuse_root(self, game):
+        key = _state_key(game)
+        root, root_game = self._root, self._root_game
+        if root is not None:
+            if _state_key(root_game) == key:
+                return root
+            for move, child in root.children.items():
+                snapshot = root_game.snapshot()
+                root_game.apply(DIRECTIONS[move])
+                found = _state_key(root_game) == key
+                root_game.restore(snapshot)
+                if found:
+                    self._root, self._root_game = child, game.clone()
+                    return child
+        self._root, self._root_game = _MCTSNode(_safe_moves(game)), game.clone()
+        self._tree_size = 1
+        return self._root
+
+    def _select(self, node):
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        best, best_score = None, -math.inf
+        for move, child in node.children.items():
+            score = child.value / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = move, score
+        return best
+
+    # una iterazione dalla radice: la partita torna allo stato della radice alla fine
+    def _iterate(self, root, game, rollout_depth):
+        snapshot = game.snapshot()
+        discount, weight, total = self.discount, 1.0, 0.0
+        node, visited = root, [root]
+
+        # selezione
+        while not node.untried and node.children:
+            move = self._select(node)
+            node = node.children[move]
+            game.apply(DIRECTIONS[move])
+            weight *= discount
+            total += weight * node.reward
+            visited.append(node)
+
+        # espansione
+        if node.untried:
+            move = node.untried.pop(self.rng.randrange(len(node.untried)))
+            score = game.score
+            game.apply(DIRECTIONS[move])
+            reward = APPLE_REWARD if game.score > score else 0.0
+            child = _MCTSNode(_safe_moves(game) if game.food is not None else [], reward)
+            # griglia piena: non è una sconfitta
+            child.doomed = child.doomed and game.food is not None
+            node.children[move] = child
+            node = child
+            self._tree_size += 1
+            weight *= discount
+            total += weight * reward
+            visited.append(node)
+
+        # simulazione
+        if node.doomed:
+            total += weight * discount * DEATH_REWARD
+        elif game.food is not None:
+            total += self._rollout(game, rollout_depth, weight)
+        game.restore(snapshot)
+
+        for node in visited:
+            node.visits += 1
+            node.value += total
+
+    # politica di rollout: con probabilità greedy_rollout la mossa sicura più vicina al cibo
+    def _rollout(self, game, depth, weight):
+        rng, discount, greedy = self.rng, self.discount, self.greedy_rollout
+        total = 0.0
+        for _ in range(depth):
+            moves = _safe_moves(game)
+            weight *= discount
+            if not moves:
+                return total + weight * DEATH_REWARD
+            if rng.random() < greedy:
+                head_x, head_y = game.snake[0]
+                food_x, food_y = game.food
+                move = min(moves, key=lambda m: abs(head_x + DIRECTIONS[m][0] - food_x)
+                           + abs(head_y + DIRECTIONS[m][1] - food_y))
+            else:
+                move = moves[rng.randrange(len(moves))]
+            score = game.score
+            game.apply(DIRECTIONS[move])
+            if game.score > score:
+                total += weight * APPLE_REWARD
+                if game.food is None:
+                    return total
+        # fine del rollout: se la testa non raggiunge più la coda il serpente è probabilmente chiuso
+        if self.tail_check and not is_state_safe(game.snake, game.grid_size):
+            total += weight * DEATH_REWARD
+        return total
+
+    # ricerca dalla radice fino a esaurire il budget; restituisce le iterazioni fatte
+    def _search(self, game, iterations, move_time_ms):
+        root = self._reuse_root(game)
+        if root.doomed:
+            return 0
+        rollout_depth = self.rollout_depth or 2 * game.grid_size
+        deadline = time.perf_counter() + move_time_ms / 1000 if move_time_ms else None
+        probe = self.probe
+        done = 0
+        while True:
+            if deadline is None:
+                if done >= iterations:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+            self._iterate(root, game, rollout_depth)
+            done += 1
+            if probe:
+                probe.expanded(0, self._tree_size)
+        return done
+
+    def _root_stats(self):
+        return [(move, child.visits, child.value) for move, child in self._root.children.items()]
+
+    # --- Processi per la parallelizzazione alla radice ---
+
+    def _start_pool(self):
+        options = {"rollout_depth": self.rollout_depth, "exploration": self.exploration,
+                   "discount": self.discount, "greedy_rollout": self.greedy_rollout,
+                   "tail_check": self.tail_check}
+        for _ in range(self.workers - 1):
+            conn, child_conn = Pipe()
+            process = Process(target=_worker_main, args=(child_conn, options), daemon=True)
+            process.start()
+            self._pool.append((process, conn))
+
+    def close(self):
+        for process, conn in self._pool:
+            conn.send(None)
+            process.join()
+        self._pool = []
+
+    # --- Scelta della mossa ---
+
+    # visite e valore dei figli della radice, sommati su tutti i processi
+    def _choose(self, game):
+        if self.workers > 1 and not self._pool:
+            self._start_pool()
+        iterations = -(-self.iterations // self.workers)
+        for _, conn in self._pool:
+            conn.send((game, iterations, self.move_time_ms, self.rng.getrandbits(32)))
+        done = self._search(game, iterations, self.move_time_ms)
+        stats = {}
+        for move, visits, value in self._root_stats():
+            stats[move] = [visits, value]
+        for _, conn in self._pool:
+            worker_done, worker_stats = conn.recv()
+            done += worker_done
+            for move, visits, value in worker_stats:
+                entry = stats.setdefault(move, [0, 0.0])
+                entry[0] += visits
+                entry[1] += value
+        if not stats:
+            return None, done
+        # la mossa più visitata; a parità di visite quella con valore medio più alto
+        move = max(stats, key=lambda m: (stats[m][0], stats[m][1] / max(1, stats[m][0])))
+        return move, done
+
+    # gioca su una copia della partita una mossa alla volta finché non mangia la mela;
+    # il percorso restituito è quello delle mosse scelte (max_expansions limita le iterazioni totali).
+    # Se si ferma prima della mela (limite di mosse o di iterazioni) il piano è parziale
+    def find_path_with_exploration(self, game, on_expand=None, max_expansions=1000000):
+        start_time = time.perf_counter()
+        plan = game.clone()
+        start, score = plan.snake[0], plan.score
+        path = []
+        iterations = 0
+        max_moves = game.grid_size * game.grid_size
+        while (plan.score == score and plan.food is not None and len(path) < max_moves
+               and iterations < max_expansions):
+            move, done = self._choose(plan)
+            iterations += done
+            if move is None:
+                break
+            plan.step(DIRECTIONS[move])
+            path.append(plan.snake[0])
+            if on_expand:
+                on_expand([start] + path, set(path), iterations, len(self._root.children))
+
+        elapsed = time.perf_counter() - start_time
+        self.iterations_per_s = iterations / elapsed if elapsed > 0 else 0.0
+        result = SearchResult(path, iterations, len(path), len(path), bool(path),
+                              partial=plan.score == score)
+        result.iterations_per_s = self.iterations_per_s
+        return result
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
+
+
+# processo di ricerca: tiene il proprio albero tra una mossa e l'altra
+def _worker_main(conn, options):
+    agent = MCTSAgent(**options)
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        game, iterations, move_time_ms, seed = message
+        agent.rng.seed(seed)
+        done = agent._search(game, iterations, move_time_ms)
+        conn.send((done, agent._root_stats()))
+    conn.close()
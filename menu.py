@@ -1,6 +1,6 @@
 import pygame
 import random
-from main import run_game
+from main import run_game, INFORMED_AGENTS
 
 pygame.init()
 FONT = pygame.font.SysFont("Arial", 32)
@@ -15,7 +15,8 @@ OPTIONS = [
     "BFS",
     "DFS",
     "Greedy",
-    "A*"
+    "A*",
+    "Safe A*"
 ]
 
 MENU_TO_AGENT = {
@@ -28,9 +29,10 @@ MENU_TO_AGENT = {
     "DFS": "dfs",
     "Greedy": "greedy",
     "A*": "astar",
+    "Safe A*": "safe_astar",
 }
 
-HEURISTICS = ["manhattan", "euclidean", "diagonal"]
+HEURISTICS = ["manhattan", "euclidean", "diagonal", "tail_time", "body_field"]
 
 
 def draw_main_menu(screen, agent_selected, fullscreen_enabled):
@@ -92,10 +94,7 @@ def main_menu():
                     agent_label = OPTIONS[agent_selected]
                     agent_key = MENU_TO_AGENT[agent_label]
 
-                    needs_heuristic = agent_key in [
-                        "relaxed_greedy", "relaxed_astar",
-                        "greedy", "astar"
-                    ]
+                    needs_heuristic = agent_key in INFORMED_AGENTS
 
                     heuristic = "manhattan"
                     if needs_heuristic:
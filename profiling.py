@@ -0,0 +1,235 @@
+import json
+from time import perf_counter
+
+# Strumentazione della ricerca. Un SearchProbe si aggancia a un agente (agent.probe) e:
+#  - avvolge la generazione dei successori (_next_states / _neighbors) e l'euristica con un timer
+#  - riceve dagli agenti, a ogni espansione, la dimensione della frontiera e dei visitati
+#    (probe.expanded) e il numero di successori scartati perché già visti (probe.duplicates)
+# Senza probe gli agenti pagano solo un controllo "if probe" per espansione: niente timer né wrapper.
+# Gli agenti che non generano i successori da quei metodi (agent.probe_successors falso o assente:
+# LPA*, campo di distanze, hamiltoniano, MCTS) hanno le metriche dei successori a None, non a zero.
+# Uso: probe = SearchProbe(); find_plan(..., probe=probe) restituisce il risultato e probe.record
+# contiene le metriche dell'ultima pianificazione (vedi PROFILE_FIELDS).
+
+PROFILE_FIELDS = ["search_time_s", "expansions_per_s", "successors", "duplicates",
+                  "peak_frontier", "peak_visited", "heuristic_calls", "heuristic_time_s",
+                  "successor_calls", "successor_time_s"]
+
+# metriche Prometheus: (campo, nome, tipo, descrizione); i contatori si sommano tra le
+# pianificazioni, i gauge dei picchi tengono il massimo
+PROMETHEUS_METRICS = [
+    ("plans", "snake_search_plans_total", "counter", "Pianificazioni eseguite"),
+    ("nodes_expanded", "snake_search_nodes_expanded_total", "counter", "Nodi espansi"),
+    ("search_time_s", "snake_search_seconds_total", "counter", "Tempo di ricerca"),
+    ("successors", "snake_search_successors_total", "counter", "Successori generati"),
+    ("duplicates", "snake_search_duplicates_total", "counter", "Successori già visitati scartati"),
+    ("heuristic_calls", "snake_search_heuristic_calls_total", "counter", "Chiamate all'euristica"),
+    ("heuristic_time_s", "snake_search_heuristic_seconds_total", "counter", "Tempo nell'euristica"),
+    ("successor_calls", "snake_search_successor_calls_total", "counter", "Generazioni dei successori"),
+    ("successor_time_s", "snake_search_successor_seconds_total", "counter",
+     "Tempo nella generazione dei successori"),
+    ("peak_frontier", "snake_search_peak_frontier", "gauge", "Frontiera massima"),
+    ("peak_visited", "snake_search_peak_visited", "gauge", "Insieme dei visitati massimo"),
+]
+PROMETHEUS_LABELS = ["agent", "heuristic", "grid"]
+
+
+# costo di una coppia di perf_counter(), sottratto da ogni misura avvolta
+def _timer_overhead(samples=2000):
+    best = None
+    for _ in range(samples):
+        start = perf_counter()
+        elapsed = perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+TIMER_OVERHEAD = _timer_overhead()
+
+
+class SearchProbe:
+    def __init__(self):
+        self._heuristics = {}
+        self.record = None
+        self.counts_successors = True
+        self.reset()
+
+    def reset(self):
+        self.successors = 0
+        self.successor_calls = 0
+        self.successor_time = 0.0
+        self.duplicates = 0
+        self.heuristic_calls = 0
+        self.heuristic_time = 0.0
+        self.peak_frontier = 0
+        self.peak_visited = 0
+
+    # chiamata dagli agenti a ogni espansione
+    def expanded(self, frontier_size, visited_size):
+        if frontier_size > self.peak_frontier:
+            self.peak_frontier = frontier_size
+        if visited_size > self.peak_visited:
+            self.peak_visited = visited_size
+
+    # aggancia il probe all'agente: i metodi dei successori diventano attributi dell'istanza
+    # (come _next_states_zobrist) che restituiscono liste già misurate. Si avvolge sempre il metodo
+    # originale, conservato sull'agente, così un secondo aggancio non annida i timer
+    def attach(self, agent):
+        self.counts_successors = getattr(agent, "probe_successors", False)
+        originals = agent.__dict__.setdefault("_probe_originals", {})
+        agent.probe = self
+        for name in ("_next_states", "_neighbors"):
+            if name not in originals:
+                method = getattr(agent, name, None)
+                if method is None:
+                    continue
+                # (metodo, era un attributo dell'istanza): detach sa se rimetterlo o cancellarlo
+                originals[name] = method, name in agent.__dict__
+            setattr(agent, name, self._timed_successors(originals[name][0]))
+
+    # stacca il probe e rimette i metodi originali (find_plan lo chiama a fine ricerca)
+    def detach(self, agent):
+        for name, (method, own) in agent.__dict__.pop("_probe_originals", {}).items():
+            if own:
+                setattr(agent, name, method)
+            else:
+                delattr(agent, name)
+        agent.__dict__.pop("probe", None)
+
+    def _timed_successors(self, method):
+        def timed(*args):
+            start = perf_counter()
+            items = list(method(*args))
+            self.successor_time += perf_counter() - start - TIMER_OVERHEAD
+            self.successor_calls += 1
+            self.successors += len(items)
+            return items
+        return timed
+
+    # stessa euristica avvolta sempre dallo stesso oggetto (LPA* la confronta per identità)
+    def heuristic(self, heuristic):
+        timed = self._heuristics.get(heuristic)
+        if timed is None:
+            timed = self._heuristics[heuristic] = _TimedHeuristic(heuristic, self)
+        return timed
+
+    # metriche della pianificazione appena conclusa
+    def finish(self, result, elapsed):
+        expanded = result.nodes_expanded
+        counted = self.counts_successors
+        self.record = {
+            "search_time_s": elapsed,
+            "expansions_per_s": expanded / elapsed if elapsed > 0 else 0.0,
+            "successors": self.successors if counted else None,
+            "duplicates": self.duplicates if counted else None,
+            "peak_frontier": self.peak_frontier,
+            "peak_visited": self.peak_visited,
+            "heuristic_calls": self.heuristic_calls,
+            "heuristic_time_s": max(0.0, self.heuristic_time),
+            "successor_calls": self.successor_calls if counted else None,
+            "successor_time_s": max(0.0, self.successor_time) if counted else None,
+        }
+        return self.record
+
+
+# euristica misurata: come funzione h(a, b, g) e, per le euristiche consapevoli del corpo,
+# anche nella preparazione delle tabelle e nella stima restituita da prepare
+class _TimedHeuristic:
+    def __init__(self, heuristic, probe):
+        self.heuristic = heuristic
+        self.probe = probe
+        if hasattr(heuristic, "prepare"):
+            self.prepare = self._prepare
+
+    def __call__(self, a, b, g=0):
+        probe = self.probe
+        start = perf_counter()
+        value = self.heuristic(a, b, g)
+        probe.heuristic_time += perf_counter() - start - TIMER_OVERHEAD
+        probe.heuristic_calls += 1
+        return value
+
+    def _prepare(self, game):
+        probe = self.probe
+        start = perf_counter()
+        estimate = self.heuristic.prepare(game)
+        probe.heuristic_time += perf_counter() - start - TIMER_OVERHEAD
+
+        def timed(pos, goal, g):
+            start = perf_counter()
+            value = estimate(pos, goal, g)
+            probe.heuristic_time += perf_counter() - start - TIMER_OVERHEAD
+            probe.heuristic_calls += 1
+            return value
+        return timed
+
+
+# --- Esportazione ---
+
+def to_json(rows):
+    return json.dumps(rows, indent=1)
+
+
+# formato di esposizione testuale di Prometheus, aggregato per agente, euristica e griglia
+def to_prometheus(rows):
+    groups = {}
+    for row in rows:
+        key = tuple(row.get(label) for label in PROMETHEUS_LABELS)
+        total = groups.setdefault(key, {"plans": 0})
+        total["plans"] += 1
+        for field, _, kind, _ in PROMETHEUS_METRICS:
+            if field == "plans" or row.get(field) is None:
+                continue
+            if kind == "gauge":
+                total[field] = max(total.get(field, 0), row[field])
+            else:
+                total[field] = total.get(field, 0) + row[field]
+
+    lines = []
+    for field, name, kind, description in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        for key, total in groups.items():
+            if field not in total:
+                continue
+            labels = ",".join(f'{label}="{value}"' for label, value in zip(PROMETHEUS_LABELS, key))
+            lines.append(f"{name}{{{labels}}} {total[field]}")
+    return "\n".join(lines) + "\n"
+
+
+# il formato segue l'estensione: .prom / .txt -> Prometheus, altrimenti JSON
+def write_profile(path, rows):
+    text = to_prometheus(rows) if path.endswith((".prom", ".txt")) else to_json(rows)
+    with open(path, "w") as f:
+        f.write(text)
+    return path
+
+
+# dove va il tempo: per (agente, euristica, griglia) velocità e quota di euristica e successori
+def print_profile(rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["agent"], row["heuristic"], row["grid"]), []).append(row)
+
+    print(f"{'agent':<16} {'heuristic':<10} {'grid':<5} {'exp/s':<10} {'succ/exp':<9} "
+          f"{'dup %':<7} {'heur %':<7} {'succ %':<7} {'peak frontier':<14} {'peak visited':<12}")
+    for (agent_name, heuristic_name, grid_size), group in groups.items():
+        elapsed = sum(r["search_time_s"] for r in group) or 1e-12
+        expanded = sum(r["nodes_expanded"] for r in group)
+        # successori non misurati per questo agente: n/a invece di zeri
+        if any(r["successors"] is None for r in group):
+            succ_per_exp = dup = succ_time = "n/a"
+        else:
+            successors = sum(r["successors"] for r in group)
+            succ_per_exp = f"{successors / max(1, expanded):.2f}"
+            dup = f"{100 * sum(r['duplicates'] for r in group) / max(1, successors):.1f}"
+            succ_time = f"{100 * sum(r['successor_time_s'] for r in group) / elapsed:.1f}"
+        print(f"{agent_name:<16} {heuristic_name:<10} {grid_size:<5} "
+              f"{expanded / elapsed:<10.0f} "
+              f"{succ_per_exp:<9} "
+              f"{dup:<7} "
+              f"{100 * sum(r['heuristic_time_s'] for r in group) / elapsed:<7.1f} "
+              f"{succ_time:<7} "
+              f"{max(r['peak_frontier'] for r in group):<14} "
+              f"{max(r['peak_visited'] for r in group):<12}")
@@ -5,6 +5,20 @@ CELL_SIZE = 30
 MARGIN = 2
 THINK_DOT_RADIUS = 3
 
+BACKGROUND_COLOR = (30, 30, 30)
+CELL_COLOR = (50, 50, 50)
+HEAD_COLOR = (144, 238, 144)
+BODY_COLOR = (0, 180, 0)
+FOOD_COLOR = (200, 0, 0)
+DOT_COLOR = (180, 60, 60)
+TEXT_COLOR = (255, 255, 255)
+
+# intervallo minimo tra due letture della coda eventi durante il disegno
+EVENT_POLL_MS = 30
+# oltre questo numero di rettangoli sporchi conviene aggiornare tutto lo schermo
+MAX_DIRTY_RECTS = 400
+TEXT_CACHE_SIZE = 256
+
 
 class Renderer:
     def __init__(self, grid_size, agent_name, fps,
@@ -74,6 +88,30 @@ class Renderer:
 
         pygame.display.set_caption("Snake AI")
 
+        self.spacing = self.scaled_cell + self.scaled_margin
+        self._text_cache = {}
+        self._text_pos = {"header": self._header_pos, "footer": self._footer_pos}
+        self._last_poll = 0
+        self._bake_background()
+        self._reset_frame()
+
+    # sfondo con la griglia disegnato una sola volta: le celle si ripristinano con un blit
+    def _bake_background(self):
+        self.background = pygame.Surface(self.screen.get_size())
+        self.background.fill(BACKGROUND_COLOR)
+        for x in range(self.grid_size):
+            for y in range(self.grid_size):
+                pygame.draw.rect(self.background, CELL_COLOR, self._cell_rect(x, y))
+
+    # stato dell'ultimo frame disegnato, usato per calcolare le differenze
+    def _reset_frame(self):
+        self._full_redraw = True
+        self._colors = {}
+        self._dots = set()
+        self._path = []
+        # testo disegnato e rettangolo occupato per header e footer
+        self._overlays = {}
+
     # ESC quit
     def handle_escape(self):
         for event in pygame.event.get():
@@ -81,8 +119,21 @@ class Renderer:
                 return True
             if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 return True
+            # la finestra è stata ridimensionata o scoperta: serve un frame completo
+            if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE):
+                self._full_redraw = True
         return False
 
+    # come handle_escape, ma legge gli eventi al più ogni EVENT_POLL_MS
+    def _poll_escape(self):
+        now = pygame.time.get_ticks()
+        if now - self._last_poll < EVENT_POLL_MS:
+            return
+        self._last_poll = now
+        if self.handle_escape():
+            pygame.quit()
+            exit()
+
     # Rect cella con offset (solo fullscreen)
     def _cell_rect(self, x, y):
         return pygame.Rect(
@@ -92,100 +143,175 @@ class Renderer:
             self.scaled_cell,
         )
 
-    def draw(self, game, path=None, visited=None, overlay_info=None):
-        if self.handle_escape():
-            pygame.quit()
-            exit()
-
-        self.screen.fill((30, 30, 30))
-        screen_w = self.screen.get_width()
-
-        # ---------------- GRID ----------------
-        for x in range(self.grid_size):
-            for y in range(self.grid_size):
-                pygame.draw.rect(
-                    self.screen,
-                    (50, 50, 50),
-                    self._cell_rect(x, y)
-                )
-
-        # ---------------- VISITED (puntini rossi) ----------------
-        if visited:
-            for (vx, vy) in visited:
-                cx = self.offset_x + vy * (self.scaled_cell + self.scaled_margin) + self.scaled_cell // 2
-                cy = self.offset_y + vx * (self.scaled_cell + self.scaled_margin) + self.scaled_cell // 2
-                pygame.draw.circle(self.screen, (180, 60, 60), (cx, cy), THINK_DOT_RADIUS)
-
-        # ---------------- SNAKE ----------------
-        for i, (x, y) in enumerate(game.snake):
-            color = (144, 238, 144) if i == 0 else (0, 180, 0)
-            pygame.draw.rect(self.screen, color, self._cell_rect(x, y))
+    def _cell_center(self, x, y):
+        return (
+            self.offset_x + y * self.spacing + self.scaled_cell // 2,
+            self.offset_y + x * self.spacing + self.scaled_cell // 2,
+        )
 
-        # ---------------- FOOD ----------------
+    def _text(self, text):
+        surf = self._text_cache.get(text)
+        if surf is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.clear()
+            surf = self.font.render(text, True, TEXT_COLOR)
+            self._text_cache[text] = surf
+        return surf
+
+    # colore di ogni cella occupata (testa, corpo, cibo)
+    def _cell_colors(self, game):
+        colors = {}
+        for i, cell in enumerate(game.snake):
+            colors[cell] = HEAD_COLOR if i == 0 else BODY_COLOR
         if game.food:
-            fx, fy = game.food
-            pygame.draw.rect(self.screen, (200, 0, 0), self._cell_rect(fx, fy))
-
-        # ---------------- PATH ----------------
-        if path and len(path) >= 2:
-            for i in range(len(path) - 1):
-                x1, y1 = path[i]
-                x2, y2 = path[i + 1]
-
-                start_pos = (
-                    self.offset_x + y1 * (self.scaled_cell + self.scaled_margin) + self.scaled_cell // 2,
-                    self.offset_y + x1 * (self.scaled_cell + self.scaled_margin) + self.scaled_cell // 2,
-                )
-                end_pos = (
-                    self.offset_x + y2 * (self.scaled_cell + self.scaled_margin) + self.scaled_cell // 2,
-                    self.offset_y + x2 * (self.scaled_cell + self.scaled_margin) + self.scaled_cell // 2,
-                )
-
-                pygame.draw.line(self.screen, (255, 0, 0), start_pos, end_pos, 3)
-                pygame.draw.circle(self.screen, (255, 120, 120), end_pos, 4)
-
-        # ---------------- HEADER ----------------
-        header = f"Search Algorithm: {self.agent_name}"
-        header_text = self.font.render(header, True, (255, 255, 255))
-        header_x = (screen_w - header_text.get_width()) // 2
+            colors[game.food] = FOOD_COLOR
+        return colors
+
+    # ridisegna una cella da zero: sfondo, puntino visitato, serpente/cibo
+    def _paint_cell(self, cell):
+        rect = self._cell_rect(*cell)
+        self.screen.blit(self.background, rect, rect)
+        if cell in self._dots:
+            pygame.draw.circle(self.screen, DOT_COLOR, self._cell_center(*cell), THINK_DOT_RADIUS)
+        color = self._colors.get(cell)
+        if color:
+            pygame.draw.rect(self.screen, color, rect)
+        return rect
+
+    def _draw_path(self, path):
+        rects = []
+        for i in range(len(path) - 1):
+            start_pos = self._cell_center(*path[i])
+            end_pos = self._cell_center(*path[i + 1])
+            rects.append(pygame.draw.line(self.screen, (255, 0, 0), start_pos, end_pos, 3))
+            rects.append(pygame.draw.circle(self.screen, (255, 120, 120), end_pos, 4))
+        return rects
+
+    # posizione dei due testi: in modalità finestra in alto/in basso a sinistra, in fullscreen centrati
+    def _header_pos(self, surf):
+        if self.windowed:
+            return (10, 10)
+        return ((self.screen.get_width() - surf.get_width()) // 2, self.offset_y - 20)
 
+    def _footer_pos(self, surf):
         if self.windowed:
-            # modalità semplice → testo in alto a sinistra
-            self.screen.blit(header_text, (10, 10))
-        else:
-            # fullscreen → centrato
-            self.screen.blit(header_text, (header_x, self.offset_y - 20))
+            return (10, self.grid_size * (CELL_SIZE + MARGIN))
+        bottom_y = self.offset_y + self.grid_size * self.spacing - 25
+        return ((self.screen.get_width() - surf.get_width()) // 2, bottom_y)
+
+    # celle della griglia che intersecano un rettangolo dello schermo
+    def _cells_under(self, rect):
+        x_min = max(0, (rect.top - self.offset_y) // self.spacing)
+        x_max = min(self.grid_size - 1, (rect.bottom - 1 - self.offset_y) // self.spacing)
+        y_min = max(0, (rect.left - self.offset_x) // self.spacing)
+        y_max = min(self.grid_size - 1, (rect.right - 1 - self.offset_x) // self.spacing)
+        return [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
+
+    def _segment_rects(self, path):
+        return [self._cell_rect(*path[i]).union(self._cell_rect(*path[i + 1]))
+                for i in range(len(path) - 1)]
+
+    def _draw_full(self, colors, path, visited, texts):
+        self.screen.blit(self.background, (0, 0))
+        self._colors = colors
+        self._dots = set(visited) if visited else set()
+        for cell in self._dots | set(colors):
+            self._paint_cell(cell)
+        self._draw_path(path)
+        self._path = path
+        self._overlays = {}
+        for name, text in texts.items():
+            surf = self._text(text)
+            self._overlays[name] = (text, self.screen.blit(surf, self._text_pos[name](surf)))
+        self._full_redraw = False
+        pygame.display.flip()
+
+    def draw(self, game, path=None, visited=None, overlay_info=None):
+        self._poll_escape()
 
-        # ---------------- FOOTER ----------------
+        colors = self._cell_colors(game)
+        path = list(path) if path and len(path) >= 2 else []
+
+        # ---------------- HEADER / FOOTER ----------------
         footer = f"Score: {game.score}"
         if overlay_info:
             footer += "  |  " + overlay_info
+        texts = {"header": f"Search Algorithm: {self.agent_name}", "footer": footer}
 
-        footer_text = self.font.render(footer, True, (255, 255, 255))
-        footer_x = (screen_w - footer_text.get_width()) // 2
+        if self._full_redraw:
+            self._draw_full(colors, path, visited, texts)
+            return
 
-        if self.windowed:
-            # modalità semplice
-            self.screen.blit(
-                footer_text,
-                (10, self.grid_size * (CELL_SIZE + MARGIN))
-            )
+        # ---------------- SNAKE / FOOD (solo celle cambiate) ----------------
+        dirty_cells = {cell for cell in colors.keys() | self._colors.keys()
+                       if colors.get(cell) != self._colors.get(cell)}
+        self._colors = colors
+
+        # ---------------- VISITED (solo differenze) ----------------
+        if visited:
+            new_dots = [cell for cell in visited if cell not in self._dots]
+            if len(self._dots) + len(new_dots) > len(visited):
+                removed = self._dots.difference(visited)
+                dirty_cells.update(removed)
+                self._dots.difference_update(removed)
+            self._dots.update(new_dots)
+            dirty_cells.update(new_dots)
+        elif self._dots:
+            dirty_cells.update(self._dots)
+            self._dots = set()
+
+        # ---------------- PATH ----------------
+        # il vecchio percorso passa anche sui margini tra le celle: si ripristinano le coppie di celle
+        restore_rects = []
+        if path != self._path:
+            restore_rects = self._segment_rects(self._path)
+            for i in range(len(self._path)):
+                dirty_cells.add(self._path[i])
+            dirty_cells.update(path)
+            self._path = path
+
+        touched = [self._cell_rect(*cell) for cell in dirty_cells] + restore_rects
+        if path:
+            touched.extend(self._segment_rects(path))
+
+        # i testi stanno sopra la griglia: se cambiano o vengono coperti si ridisegnano
+        dirty_texts = []
+        for name, (text, rect) in self._overlays.items():
+            if text != texts[name] or rect.collidelist(touched) != -1:
+                dirty_texts.append(name)
+                restore_rects.append(rect)
+                dirty_cells.update(self._cells_under(rect))
+
+        if not dirty_cells and not restore_rects:
+            return
+
+        rects = []
+        for rect in restore_rects:
+            self.screen.blit(self.background, rect, rect)
+            rects.append(rect)
+        for cell in dirty_cells:
+            rects.append(self._paint_cell(cell))
+        if path:
+            rects.extend(self._draw_path(path))
+        for name in dirty_texts:
+            surf = self._text(texts[name])
+            rect = self.screen.blit(surf, self._text_pos[name](surf))
+            self._overlays[name] = (texts[name], rect)
+            rects.append(rect)
+
+        if len(rects) > MAX_DIRTY_RECTS:
+            pygame.display.flip()
         else:
-            # fullscreen centrato
-            bottom_y = self.offset_y + self.grid_size * (self.scaled_cell + self.scaled_margin) - 25
-            self.screen.blit(footer_text, (footer_x, bottom_y))
+            pygame.display.update(rects)
 
-        pygame.display.flip()
+    # forza il ridisegno completo al frame successivo (es. dopo un cambio di finestra)
+    def invalidate(self):
+        self._reset_frame()
 
     # ---------------- THINKING STEP ----------------
     def show_thought_step(self, game, path, visited, nodes_expanded, frontier_size):
-        if self.handle_escape():
-            pygame.quit()
-            exit()
-
         overlay = f"Thinking… expanded: {nodes_expanded}  frontier: {frontier_size}"
         self.draw(game, path=path, visited=visited, overlay_info=overlay)
-        pygame.event.pump()
         time.sleep(self.think_delay_s)
 
     # ---------------- EXECUTION TICK ----------------
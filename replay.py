@@ -0,0 +1,133 @@
+import argparse
+import json
+import time
+from game import SnakeGame
+
+# Formato del log (NDJSON, un oggetto JSON per riga):
+#   {"type": "header", "version": 1, "agent": ..., "heuristic": ..., "grid": ..., "seed": ...}
+#   {"type": "plan", "plan": k, "found": ..., "nodes_expanded": ..., "cost": ..., "depth": ...,
+#    "plan_time_s": ..., "path": [[x, y], ...], "actions": "RRDDL"}
+#   {"type": "actions", "actions": "UUL"}          (mosse senza piano, es. giocatore umano)
+#   {"type": "end", "score": ..., "moves": ..., "game_over": ...}
+# Con seed e azioni la partita si ricostruisce esattamente, senza rieseguire la ricerca.
+LOG_VERSION = 1
+
+ACTION_CODES = {
+    (-1, 0): "U",
+    (1, 0): "D",
+    (0, -1): "L",
+    (0, 1): "R",
+}
+CODE_ACTIONS = {code: action for action, code in ACTION_CODES.items()}
+
+
+class GameRecorder:
+    def __init__(self, path, agent_name, heuristic_name, grid_size, seed):
+        self.file = open(path, "w")
+        self.plans = 0
+        # piano in corso: viene scritto quando sono note le azioni eseguite
+        self._record = None
+        self._actions = []
+        self._write({"type": "header", "version": LOG_VERSION, "agent": agent_name,
+                     "heuristic": heuristic_name, "grid": grid_size, "seed": seed})
+
+    def _write(self, record):
+        self.file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def _flush(self):
+        if self._record is not None:
+            self._record["actions"] = "".join(self._actions)
+            self._write(self._record)
+        elif self._actions:
+            self._write({"type": "actions", "actions": "".join(self._actions)})
+        self._record = None
+        self._actions = []
+
+    def action(self, action):
+        self._actions.append(ACTION_CODES[action])
+
+    def plan(self, result, plan_time_s=None):
+        self._flush()
+        self.plans += 1
+        self._record = {"type": "plan", "plan": self.plans, "found": result.found,
+                        "nodes_expanded": result.nodes_expanded, "cost": result.cost,
+                        "depth": result.depth, "plan_time_s": plan_time_s,
+                        "path": [list(p) for p in result.path]}
+
+    def close(self, game):
+        self._flush()
+        self._write({"type": "end", "score": game.score, "moves": game.moves,
+                     "game_over": game.game_over})
+        self.file.close()
+
+
+def read_log(path):
+    with open(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records or records[0].get("type") != "header":
+        raise ValueError(f"{path}: manca l'intestazione del log")
+    if records[0]["version"] != LOG_VERSION:
+        raise ValueError(f"{path}: versione del log non supportata ({records[0]['version']})")
+    return records[0], records[1:]
+
+
+# ricostruisce la partita dal log; on_plan/on_step permettono di visualizzarla
+def replay_log(path, on_plan=None, on_step=None):
+    header, records = read_log(path)
+    game = SnakeGame(header["grid"], header["seed"])
+
+    for record in records:
+        if record["type"] == "plan" and on_plan:
+            on_plan(game, record)
+        if record["type"] in ("plan", "actions"):
+            for code in record.get("actions", ""):
+                game.step(CODE_ACTIONS[code])
+                if on_step:
+                    on_step(game)
+        elif record["type"] == "end":
+            if (game.score, game.moves) != (record["score"], record["moves"]):
+                raise ValueError(f"{path}: la partita ricostruita non coincide con il log")
+    return header, game
+
+
+def play_replay(path, fps=10, plan_pause_s=0.5, windowed=True):
+    import pygame
+    from renderer import Renderer
+
+    header, _ = read_log(path)
+    renderer = Renderer(header["grid"], agent_name=f"{header['agent']} (replay)",
+                        fps=fps, windowed=windowed)
+
+    def on_plan(game, record):
+        overlay = (f"Plan {record['plan']} — cost {record['cost']} | "
+                   f"expanded {record['nodes_expanded']}")
+        renderer.draw(game, path=[tuple(p) for p in record["path"]], overlay_info=overlay)
+        pygame.event.pump()
+        time.sleep(plan_pause_s)
+
+    def on_step(game):
+        renderer.draw(game)
+        renderer.tick_execution()
+
+    _, game = replay_log(path, on_plan, on_step)
+    print(f"Replay terminato. Score: {game.score}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rivedi una partita registrata")
+    parser.add_argument("log", type=str)
+    parser.add_argument("--fps", type=int, default=10, help="Velocità del replay (0 = massima)")
+    parser.add_argument("--plan-pause", type=float, default=0.5,
+                        help="Pausa in secondi su ogni piano mostrato")
+    parser.add_argument("--fullscreen", action="store_true")
+    parser.add_argument("--check", action="store_true",
+                        help="Verifica il log senza aprire la finestra")
+    args = parser.parse_args()
+
+    if args.check:
+        header, game = replay_log(args.log)
+        print(f"Log valido: {header['agent']} grid {header['grid']} seed {header['seed']} "
+              f"score {game.score} moves {game.moves}")
+    else:
+        play_replay(args.log, fps=args.fps, plan_pause_s=args.plan_pause,
+                    windowed=not args.fullscreen)
@@ -1,41 +1,40 @@
+import sys
 from collections import deque
 import heapq
-from heuristics import manhattan, diagonal_distance, euclidean_distance
-from collections import deque
-
-def is_state_safe(snake, grid_size):
-    
-    head = snake[0]
-    tail = snake[-1]
-    body_without_tail = set(snake[:-1])
-
-    def neighbors(pos):
-        for dx, dy in MOVES.values():
-            nx, ny = pos[0] + dx, pos[1] + dy
-            if not (0 <= nx < grid_size and 0 <= ny < grid_size):
-                continue
-            new_head = (nx, ny)
-            if new_head in body_without_tail:
-                continue
-            yield new_head
-
-    if not any(True for _ in neighbors(head)):
-        return False
-
-    q = deque([head])
-    visited = {head}
-    while q:
-        pos = q.popleft()
-        if pos == tail:
+from heuristics import manhattan, diagonal_distance, euclidean_distance, prepare_heuristic
+from search_nodes import SearchNodes, TieBreaker, ReadOnlySet, as_notifier, as_deadline
+from grid import cell_coords, cell_neighbors, neighbor_array, board_masks, zobrist_table
+from closed_set import make_closed_set
+
+# la coda è raggiungibile dalla testa passando solo per celle libere (la coda stessa si libera)?
+# Flood fill a bit paralleli sul bitboard: a ogni passo l'intera frontiera avanza di una cella
+# nelle quattro direzioni con poche operazioni su interi, senza costruire set né code.
+def tail_reachable(head, tail, occ, grid_size):
+    if head == tail:
+        return grid_size > 1
+    full, not_first_col, not_last_col = board_masks(grid_size)
+    target = 1 << tail
+    free = (full & ~occ) | target
+    reach = frontier = 1 << head
+    while frontier:
+        grown = (((frontier << 1) & not_first_col) | ((frontier >> 1) & not_last_col)
+                 | (frontier << grid_size) | (frontier >> grid_size))
+        frontier = grown & free & ~reach
+        if frontier & target:
             return True
-        for nb in neighbors(pos):
-            if nb not in visited:
-                visited.add(nb)
-                q.append(nb)
-
+        reach |= frontier
     return False
 
 
+def is_state_safe(snake, grid_size):
+    occ = 0
+    for x, y in snake:
+        occ |= 1 << (x * grid_size + y)
+    head, tail = snake[0], snake[-1]
+    return tail_reachable(head[0] * grid_size + head[1], tail[0] * grid_size + tail[1],
+                          occ, grid_size)
+
+
 MOVES = {
     "UP": (-1, 0),
     "DOWN": (1, 0),
@@ -45,176 +44,456 @@ MOVES = {
 
 
 class SearchResult:
-    def __init__(self, path, nodes_expanded, depth, cost, found):
+    def __init__(self, path, nodes_expanded, depth, cost, found, memory_peak=None, partial=False,
+                 saturated=False, evictions=0):
         self.path = path
         self.nodes_expanded = nodes_expanded
         self.depth = depth
         self.cost = cost
         self.found = found
+        # stima in byte del picco di memoria della ricerca (closed set, frontiera e nodi)
+        self.memory_peak = memory_peak
+        # budget del closed set raggiunto (vedi closed_set.py) e stati scartati dalla tabella lru
+        self.saturated = saturated
+        self.evictions = evictions
+        # tempo scaduto: path porta solo verso il nodo più vicino al cibo (vedi search_nodes.Deadline)
+        self.partial = partial
+
+
+# Stato compatto del serpente completo: (head, tail, occ, chain, length[, zobrist])
+#  - head, tail: id di cella (x * grid_size + y)
+#  - occ: bitboard intero delle celle occupate dal corpo
+#  - chain: 2 bit per segmento, il bit-pair i è l'indice in MOVES della direzione
+#    dal segmento i al segmento i+1; un bit sentinella chiude la catena
+#  - length: lunghezza del serpente
+#  - zobrist (solo se richiesto): hash a 64 bit della testa e delle coppie
+#    (segmento, direzione del legame), aggiornato in modo incrementale a ogni mossa
+DIRECTIONS = list(MOVES.values())
+OPPOSITE = (1, 0, 3, 2)
+
+
+def encode_snake(snake, grid_size, zobrist=False):
+    # state_key riserva 16 bit alla testa
+    if grid_size > 256:
+        raise ValueError(f"Griglia troppo grande per lo stato compatto (max 256x256): {grid_size}")
+    cells = [x * grid_size + y for x, y in snake]
+    deltas = [dx * grid_size + dy for dx, dy in DIRECTIONS]
+    occ = 0
+    for cell in cells:
+        occ |= 1 << cell
+    chain = 1
+    for i in range(len(cells) - 2, -1, -1):
+        chain = (chain << 2) | deltas.index(cells[i + 1] - cells[i])
+    state = (cells[0], cells[-1], occ, chain, len(cells))
+    if not zobrist:
+        return state
+
+    heads, links = zobrist_table(grid_size)
+    key = heads[cells[0]]
+    for i in range(len(cells) - 1):
+        key ^= links[4 * cells[i] + ((chain >> (2 * i)) & 3)]
+    return state + (key,)
+
+
+def decode_snake(state, grid_size):
+    head, chain, length = state[0], state[3], state[4]
+    coords = cell_coords(grid_size)
+    neighbors = neighbor_array(grid_size)
+    cell = head
+    snake = [coords[cell]]
+    for _ in range(length - 1):
+        cell = neighbors[4 * cell + (chain & 3)]
+        chain >>= 2
+        snake.append(coords[cell])
+    return snake
+
+
+# chiave per l'insieme dei visitati: catena (con sentinella) e testa identificano tutto il corpo
+# (la testa occupa 16 bit: griglie fino a 256x256)
+def state_key(state):
+    return (state[3] << 16) | state[0]
+
+
+# chiave di Zobrist: intero a 64 bit di dimensione fissa qualunque sia la lunghezza del serpente
+# (collisioni possibili ma con probabilità ~ stati visitati / 2^64)
+def zobrist_key(state):
+    return state[5]
 
 
 class _BaseAgent:
-    def _next_states(self, snake, food, grid_size):
-        head_x, head_y = snake[0]
-
-        for dx, dy in MOVES.values():
-            nx, ny = head_x + dx, head_y + dy
-
-            if not (0 <= nx < grid_size and 0 <= ny < grid_size):
+    # closed set ammessi dall'agente (il filtro di Bloom solo dove la completezza non è garantita)
+    CLOSED_SETS = ("exact", "lru")
+    # l'agente rispetta memory_budget_mb (gli agenti senza closed set hanno un proprio limite)
+    MEMORY_BUDGET = True
+    # strumentazione opzionale (profiling.SearchProbe), agganciata da find_plan; i successori
+    # passano tutti da _next_states, quindi il probe li può contare
+    probe = None
+    probe_successors = True
+
+    def __init__(self, closed_set="exact", memory_budget_mb=None, zobrist=False):
+        if closed_set not in self.CLOSED_SETS:
+            raise ValueError(f"Closed set non supportato da {type(self).__name__}: {closed_set}")
+        if closed_set == "lru" and not memory_budget_mb:
+            raise ValueError("Il closed set lru richiede un budget di memoria")
+        if memory_budget_mb and not self.MEMORY_BUDGET:
+            raise ValueError(f"Budget di memoria non supportato da {type(self).__name__}")
+        self.closed_set = closed_set
+        self.memory_budget = int(memory_budget_mb * 2 ** 20) if memory_budget_mb else None
+        self.zobrist = zobrist
+        if zobrist:
+            self._next_states = self._next_states_zobrist
+
+    # piano parziale a tempo scaduto: cammino fino al miglior nodo della ricerca (nodes.path)
+    @staticmethod
+    def _partial_result(nodes, deadline, nodes_expanded, memory):
+        if deadline.best is None:
+            return SearchResult([], nodes_expanded, 0, 0, False, **memory)
+        path = nodes.path(deadline.best)
+        return SearchResult(path, nodes_expanded, len(path), len(path), True, partial=True, **memory)
+
+    # budget di memoria dell'intera ricerca: closed set, frontiera attuale e archivio dei nodi.
+    # Se lo superano il closed set prova a liberare memoria (lru scarta gli stati meno recenti);
+    # se non basta la ricerca va fermata e l'agente restituisce un piano parziale
+    def _over_budget(self, visited, frontier_size, entry_bytes, nodes):
+        excess = visited.peak_bytes + frontier_size * entry_bytes + nodes.nbytes - self.memory_budget
+        if excess <= 0:
+            return False
+        visited.saturated = True
+        return visited.trim(excess) < excess
+
+    # memoria della ricerca per SearchResult: closed set, picco della frontiera e archivio dei nodi
+    @staticmethod
+    def _memory(visited, frontier_peak, entry_bytes, nodes):
+        return {"memory_peak": visited.peak_bytes + frontier_peak * entry_bytes + nodes.nbytes,
+                "saturated": visited.saturated, "evictions": visited.evictions}
+
+    # insieme dei visitati già contenente lo stato iniziale e funzione chiave da usare
+    def _closed_set(self, start_state):
+        key_of = zobrist_key if self.zobrist else state_key
+        start_key = key_of(start_state)
+        visited = make_closed_set(self.closed_set, self.memory_budget, start_key)
+        visited.add(start_key)
+        return visited, key_of
+
+    def _next_states(self, state, food, grid_size):
+        head, tail, occ, chain, length = state
+        coords = cell_coords(grid_size)
+        neighbors = neighbor_array(grid_size)
+        food_cell = food[0] * grid_size + food[1] if food is not None else -1
+
+        for move, new_cell in cell_neighbors(grid_size)[head]:
+            # come nella versione a liste, anche la coda conta come collisione
+            if (occ >> new_cell) & 1:
                 continue
 
-            new_head = (nx, ny)
+            new_chain = (chain << 2) | OPPOSITE[move]
+            new_occ = occ | (1 << new_cell)
 
-            if new_head in snake:
+            if new_cell == food_cell:
+                yield coords[new_cell], (new_cell, tail, new_occ, new_chain, length + 1), None
+            else:
+                # rimuove l'ultimo segmento: la nuova coda precede la vecchia lungo la catena
+                shift = 2 * (length - 1)
+                last = (new_chain >> shift) & 3
+                new_chain -= (3 + last) << shift
+                new_tail = neighbors[4 * tail + OPPOSITE[last]]
+                new_occ ^= 1 << tail
+                yield coords[new_cell], (new_cell, new_tail, new_occ, new_chain, length), food
+
+    # come _next_states, ma aggiorna anche l'hash di Zobrist (sesto campo dello stato):
+    # la testa cambia cella, si aggiunge il legame nuova testa -> vecchia testa e,
+    # se la coda avanza, sparisce il legame nuova coda -> vecchia coda
+    def _next_states_zobrist(self, state, food, grid_size):
+        head, tail, occ, chain, length, zobrist = state
+        coords = cell_coords(grid_size)
+        neighbors = neighbor_array(grid_size)
+        heads, links = zobrist_table(grid_size)
+        food_cell = food[0] * grid_size + food[1] if food is not None else -1
+
+        for move, new_cell in cell_neighbors(grid_size)[head]:
+            if (occ >> new_cell) & 1:
                 continue
 
-            new_snake = [new_head] + list(snake)
+            new_chain = (chain << 2) | OPPOSITE[move]
+            new_occ = occ | (1 << new_cell)
+            new_zobrist = zobrist ^ heads[head] ^ heads[new_cell] ^ links[4 * new_cell + OPPOSITE[move]]
 
-            if new_head == food:
-                new_food = None
+            if new_cell == food_cell:
+                yield coords[new_cell], (new_cell, tail, new_occ, new_chain, length + 1, new_zobrist), None
             else:
-                new_snake.pop()
-                new_food = food
-
-            yield new_head, new_snake, new_food
+                shift = 2 * (length - 1)
+                last = (new_chain >> shift) & 3
+                new_chain -= (3 + last) << shift
+                new_tail = neighbors[4 * tail + OPPOSITE[last]]
+                new_occ ^= 1 << tail
+                new_zobrist ^= links[4 * new_tail + last]
+                yield coords[new_cell], (new_cell, new_tail, new_occ, new_chain, length, new_zobrist), food
 
 
 class BFSAgent(_BaseAgent):
-    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000):
+    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000, time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        queue = deque([(game.snake, [], game.food)])
-        visited = {tuple(game.snake)}
+        start_state = encode_snake(game.snake, game.grid_size, self.zobrist)
+        coords = cell_coords(game.grid_size)
+        nodes = SearchNodes(game.grid_size, start)
+        queue = deque([(start_state, 0, game.food)])
+        visited, key_of = self._closed_set(start_state)
+        entry_bytes = _frontier_entry_bytes(queue[0], start_state)
+        frontier_peak = 1
+        # teste visitate, mantenute solo se qualcuno osserva la ricerca
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        budget = self.memory_budget
+        deadline = as_deadline(time_budget_ms, manhattan(start, goal), budget)
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
         nodes_expanded = 0
 
         while queue and max_expansions>0:
-            snake, path, food = queue.popleft()
-            head = snake[0]
+            state, node, food = queue.popleft()
+            head = coords[state[0]]
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(queue), len(visited))
 
-            if on_expand:
-                visited_heads = {state[0] for state in visited}
-                on_expand(path, visited_heads, nodes_expanded, len(queue))
+            if notify and notify.due():
+                notify(nodes.path(node), visited_view, nodes_expanded, len(queue))
 
             if head == goal:
-                return SearchResult(path, nodes_expanded, len(path), len(path), True)
-
-            for new_head, new_snake, new_food in self._next_states(snake, food, game.grid_size):
-                state_key = tuple(new_snake)
-                if state_key not in visited:
-                    visited.add(state_key)
-                    queue.append((new_snake, path + [new_head], new_food))
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path), len(path), True,
+                                    **self._memory(visited, frontier_peak, entry_bytes, nodes))
+            if deadline and deadline.visit(node or None, manhattan(head, goal)):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
+
+            for new_head, new_state, new_food in self._next_states(state, food, game.grid_size):
+                key = key_of(new_state)
+                if key not in visited:
+                    visited.add(key)
+                    if notify:
+                        visited_heads.add(new_head)
+                    queue.append((new_state, nodes.add(new_state[0], node), new_food))
+                elif probe:
+                    probe.duplicates += 1
+            if len(queue) > frontier_peak:
+                frontier_peak = len(queue)
+            if budget and self._over_budget(visited, len(queue), entry_bytes, nodes):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
             max_expansions-=1
 
-        return SearchResult([], nodes_expanded, 0, 0, False)
+        return SearchResult([], nodes_expanded, 0, 0, False,
+                            **self._memory(visited, frontier_peak, entry_bytes, nodes))
 
     def find_path(self, game):
         return self.find_path_with_exploration(game, on_expand=None)
 
 
 class DFSAgent(_BaseAgent):
-    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000):
+    CLOSED_SETS = ("exact", "lru", "bloom")
+
+    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000, time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        stack = [(game.snake, [], game.food)]
-        visited = {tuple(game.snake)}
+        start_state = encode_snake(game.snake, game.grid_size, self.zobrist)
+        coords = cell_coords(game.grid_size)
+        nodes = SearchNodes(game.grid_size, start)
+        stack = [(start_state, 0, game.food)]
+        visited, key_of = self._closed_set(start_state)
+        entry_bytes = _frontier_entry_bytes(stack[0], start_state)
+        frontier_peak = 1
+        # teste visitate, mantenute solo se qualcuno osserva la ricerca
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        budget = self.memory_budget
+        deadline = as_deadline(time_budget_ms, manhattan(start, goal), budget)
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
         nodes_expanded = 0
 
         while stack and max_expansions>0:
-            snake, path, food = stack.pop()
-            head = snake[0]
+            state, node, food = stack.pop()
+            head = coords[state[0]]
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(stack), len(visited))
 
-            if on_expand:
-                visited_heads = {state[0] for state in visited}
-                on_expand(path, visited_heads, nodes_expanded, len(stack))
+            if notify and notify.due():
+                notify(nodes.path(node), visited_view, nodes_expanded, len(stack))
 
             if head == goal:
-                return SearchResult(path, nodes_expanded, len(path), len(path), True)
-
-            for new_head, new_snake, new_food in self._next_states(snake, food, game.grid_size):
-                state_key = tuple(new_snake)
-                if state_key not in visited:
-                    visited.add(state_key)
-                    stack.append((new_snake, path + [new_head], new_food))
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path), len(path), True,
+                                    **self._memory(visited, frontier_peak, entry_bytes, nodes))
+            if deadline and deadline.visit(node or None, manhattan(head, goal)):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
+
+            for new_head, new_state, new_food in self._next_states(state, food, game.grid_size):
+                key = key_of(new_state)
+                if key not in visited:
+                    visited.add(key)
+                    if notify:
+                        visited_heads.add(new_head)
+                    stack.append((new_state, nodes.add(new_state[0], node), new_food))
+                elif probe:
+                    probe.duplicates += 1
+            if len(stack) > frontier_peak:
+                frontier_peak = len(stack)
+            if budget and self._over_budget(visited, len(stack), entry_bytes, nodes):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
             max_expansions-=1
 
-        return SearchResult([], nodes_expanded, 0, 0, False)
+        return SearchResult([], nodes_expanded, 0, 0, False,
+                            **self._memory(visited, frontier_peak, entry_bytes, nodes))
 
     def find_path(self, game):
         return self.find_path_with_exploration(game, on_expand=None)
 
 
 class GreedyAgent(_BaseAgent):
-    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000):
+    def __init__(self, tie_break="fifo", **closed_set_options):
+        super().__init__(**closed_set_options)
+        self.tie_break = tie_break
+
+    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000,
+                                   time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        open_list = [(heuristic(start, goal), game.snake, [], game.food)]
-        visited = {tuple(game.snake)}
+        start_state = encode_snake(game.snake, game.grid_size, self.zobrist)
+        coords = cell_coords(game.grid_size)
+        nodes = SearchNodes(game.grid_size, start)
+        tie = TieBreaker(self.tie_break, nodes, game.snake[1] if len(game.snake) > 1 else None)
+        # (h, rank, seq, state, node, food): h calcolata una sola volta all'inserimento
+        open_list = [(heuristic(start, goal), 0, 0, start_state, 0, game.food)]
+        visited, key_of = self._closed_set(start_state)
+        entry_bytes = _frontier_entry_bytes(open_list[0], start_state)
+        frontier_peak = 1
+        # teste visitate, mantenute solo se qualcuno osserva la ricerca
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        budget = self.memory_budget
+        deadline = as_deadline(time_budget_ms, open_list[0][0], budget)
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
         nodes_expanded = 0
 
         while open_list and max_expansions>0:
-            open_list.sort(key=lambda item: heuristic(item[1][0], goal))
-            _, snake, path, food = open_list.pop(0)
-            head = snake[0]
+            h, _, _, state, node, food = heapq.heappop(open_list)
+            head = coords[state[0]]
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(open_list), len(visited))
 
-            if on_expand:
-                visited_heads = {state[0] for state in visited}
-                on_expand(path, visited_heads, nodes_expanded, len(open_list))
+            if notify and notify.due():
+                notify(nodes.path(node), visited_view, nodes_expanded, len(open_list))
 
             if head == goal:
-                return SearchResult(path, nodes_expanded, len(path), len(path), True)
-
-            for new_head, new_snake, new_food in self._next_states(snake, food, game.grid_size):
-                state_key = tuple(new_snake)
-                if state_key not in visited:
-                    visited.add(state_key)
-                    open_list.append((heuristic(new_head, goal), new_snake, path + [new_head], new_food))
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path), len(path), True,
+                                    **self._memory(visited, frontier_peak, entry_bytes, nodes))
+            if deadline and deadline.visit(node or None, h):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
+
+            for new_head, new_state, new_food in self._next_states(state, food, game.grid_size):
+                key = key_of(new_state)
+                if key not in visited:
+                    visited.add(key)
+                    if notify:
+                        visited_heads.add(new_head)
+                    rank, seq = tie.key(node, new_state[0])
+                    heapq.heappush(open_list, (heuristic(new_head, goal), rank, seq, new_state,
+                                               nodes.add(new_state[0], node), new_food))
+                elif probe:
+                    probe.duplicates += 1
+            if len(open_list) > frontier_peak:
+                frontier_peak = len(open_list)
+            if budget and self._over_budget(visited, len(open_list), entry_bytes, nodes):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
             max_expansions-=1
-        return SearchResult([], nodes_expanded, 0, 0, False)
+        return SearchResult([], nodes_expanded, 0, 0, False,
+                            **self._memory(visited, frontier_peak, entry_bytes, nodes))
 
     def find_path(self, game):
         return self.find_path_with_exploration(game, on_expand=None)
 
 
 class AStarAgent(_BaseAgent):
-    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000):
+    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000,
+                                   time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        open_list = [(heuristic(start, goal), 0, game.snake, [], game.food)]
-        visited = {tuple(game.snake)}
+        start_state = encode_snake(game.snake, game.grid_size, self.zobrist)
+        coords = cell_coords(game.grid_size)
+        nodes = SearchNodes(game.grid_size, start)
+        estimate = prepare_heuristic(heuristic, game)
+        # (f, g, seq, state, node, food): a parità di f e g esce il nodo inserito prima (seq),
+        # senza confrontare gli stati
+        open_list = [(estimate(start, goal, 0), 0, 0, start_state, 0, game.food)]
+        seq = 0
+        visited, key_of = self._closed_set(start_state)
+        entry_bytes = _frontier_entry_bytes(open_list[0], start_state)
+        frontier_peak = 1
+        # teste visitate, mantenute solo se qualcuno osserva la ricerca
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        budget = self.memory_budget
+        deadline = as_deadline(time_budget_ms, open_list[0][0], budget)
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
         nodes_expanded = 0
 
         while open_list and max_expansions>0:
-            f, g, snake, path, food = heapq.heappop(open_list)
-            head = snake[0]
+            f, g, _, state, node, food = heapq.heappop(open_list)
+            head = coords[state[0]]
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(open_list), len(visited))
 
-            if on_expand:
-                visited_heads = {state[0] for state in visited}
-                on_expand(path, visited_heads, nodes_expanded, len(open_list))
+            if notify and notify.due():
+                notify(nodes.path(node), visited_view, nodes_expanded, len(open_list))
 
             if head == goal:
-                return SearchResult(path, nodes_expanded, len(path), g, True)
-
-            for new_head, new_snake, new_food in self._next_states(snake, food, game.grid_size):
-                state_key = tuple(new_snake)
-                if state_key not in visited:
-                    visited.add(state_key)
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path), g, True,
+                                    **self._memory(visited, frontier_peak, entry_bytes, nodes))
+            if deadline and deadline.visit(node or None, f - g):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
+
+            for new_head, new_state, new_food in self._next_states(state, food, game.grid_size):
+                key = key_of(new_state)
+                if key not in visited:
+                    visited.add(key)
+                    if notify:
+                        visited_heads.add(new_head)
                     new_g = g + 1
-                    f = new_g + heuristic(new_head, goal)
-                    heapq.heappush(open_list, (f, new_g, new_snake, path + [new_head], new_food))
+                    f = new_g + estimate(new_head, goal, new_g)
+                    seq += 1
+                    heapq.heappush(open_list, (f, new_g, seq, new_state, nodes.add(new_state[0], node), new_food))
+                elif probe:
+                    probe.duplicates += 1
+            if len(open_list) > frontier_peak:
+                frontier_peak = len(open_list)
+            if budget and self._over_budget(visited, len(open_list), entry_bytes, nodes):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
             max_expansions-=1
-        return SearchResult([], nodes_expanded, 0, 0, False)
+        return SearchResult([], nodes_expanded, 0, 0, False,
+                            **self._memory(visited, frontier_peak, entry_bytes, nodes))
 
     def find_path(self, game):
         return self.find_path_with_exploration(game, on_expand=None)
@@ -223,43 +502,359 @@ class AStarAgent(_BaseAgent):
 class SafeAStarAgent(_BaseAgent):
 
     def find_path_with_exploration(self, game, on_expand=None,
-                                   heuristic=manhattan, max_expansions=1000000):
+                                   heuristic=manhattan, max_expansions=1000000, time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        open_list = [(heuristic(start, goal), 0, game.snake, [], game.food)]
-        visited = {tuple(game.snake)}
+        start_state = encode_snake(game.snake, game.grid_size, self.zobrist)
+        coords = cell_coords(game.grid_size)
+        nodes = SearchNodes(game.grid_size, start)
+        estimate = prepare_heuristic(heuristic, game)
+        # (f, g, seq, state, node, food): a parità di f e g esce il nodo inserito prima (seq),
+        # senza confrontare gli stati
+        open_list = [(estimate(start, goal, 0), 0, 0, start_state, 0, game.food)]
+        seq = 0
+        visited, key_of = self._closed_set(start_state)
+        entry_bytes = _frontier_entry_bytes(open_list[0], start_state)
+        frontier_peak = 1
+        # teste visitate, mantenute solo se qualcuno osserva la ricerca
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        budget = self.memory_budget
+        deadline = as_deadline(time_budget_ms, open_list[0][0], budget)
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
         nodes_expanded = 0
 
         while open_list and max_expansions > 0:
-            f, g, snake, path, food = heapq.heappop(open_list)
-            head = snake[0]
+            f, g, _, state, node, food = heapq.heappop(open_list)
+            head = coords[state[0]]
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(open_list), len(visited))
 
-            if on_expand:
-                visited_heads = {state[0] for state in visited}
-                on_expand(path, visited_heads, nodes_expanded, len(open_list))
+            if notify and notify.due():
+                notify(nodes.path(node), visited_view, nodes_expanded, len(open_list))
 
             if head == goal:
-                if is_state_safe(snake, game.grid_size):
-                    return SearchResult(path, nodes_expanded, len(path), g, True)
+                if tail_reachable(state[0], state[1], state[2], game.grid_size):
+                    path = nodes.path(node)
+                    return SearchResult(path, nodes_expanded, len(path), g, True,
+                                    **self._memory(visited, frontier_peak, entry_bytes, nodes))
                 max_expansions -= 1
                 continue
-
-            for new_head, new_snake, new_food in self._next_states(snake, food, game.grid_size):
-                state_key = tuple(new_snake)
-                if state_key not in visited:
-                    visited.add(state_key)
+            if deadline and deadline.visit(node or None, f - g):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
+
+            for new_head, new_state, new_food in self._next_states(state, food, game.grid_size):
+                key = key_of(new_state)
+                if key not in visited:
+                    visited.add(key)
+                    if notify:
+                        visited_heads.add(new_head)
                     new_g = g + 1
-                    f = new_g + heuristic(new_head, goal)
-                    heapq.heappush(open_list, (f, new_g, new_snake, path + [new_head], new_food))
+                    f = new_g + estimate(new_head, goal, new_g)
+                    seq += 1
+                    heapq.heappush(open_list, (f, new_g, seq, new_state, nodes.add(new_state[0], node), new_food))
+                elif probe:
+                    probe.duplicates += 1
+            if len(open_list) > frontier_peak:
+                frontier_peak = len(open_list)
+            if budget and self._over_budget(visited, len(open_list), entry_bytes, nodes):
+                return self._partial_result(nodes, deadline, nodes_expanded,
+                                            self._memory(visited, frontier_peak, entry_bytes, nodes))
 
             max_expansions -= 1
 
-        return SearchResult([], nodes_expanded, 0, 0, False)
+        return SearchResult([], nodes_expanded, 0, 0, False,
+                            **self._memory(visited, frontier_peak, entry_bytes, nodes))
 
     def find_path(self, game):
         return self.find_path_with_exploration(game, on_expand=None)
     
 
+
+
+INF = float("inf")
+
+
+# IDA*: A* a soglia crescente su f = g + h con ricerca in profondità.
+# La memoria è proporzionale alla sola profondità del cammino corrente (nessun closed set:
+# si evitano solo gli stati già presenti sul cammino); il prezzo sono le ri-espansioni
+# delle iterazioni precedenti, tutte contate in nodes_expanded.
+class IDAStarAgent(_BaseAgent):
+    CLOSED_SETS = ("exact",)
+    MEMORY_BUDGET = False
+
+    # successori ordinati per f: dentro ogni soglia si prova prima il figlio più promettente
+    def _children(self, state, food, g, goal, grid_size, estimate):
+        children = [(g + 1 + estimate(new_head, goal, g + 1), new_head, new_state, new_food)
+                    for new_head, new_state, new_food in self._next_states(state, food, grid_size)]
+        children.sort(key=lambda child: child[0])
+        return iter(children)
+
+    def find_path_with_exploration(self, game, on_expand=None, heuristic=manhattan, max_expansions=1000000,
+                                   time_budget_ms=None):
+        start, goal = game.snake[0], game.food
+        if goal is None:
+            return SearchResult([], 0, 0, 0, False)
+
+        grid_size = game.grid_size
+        start_state = encode_snake(game.snake, grid_size, self.zobrist)
+        key_of = zobrist_key if self.zobrist else state_key
+        start_key = key_of(start_state)
+        entry_bytes = make_closed_set("exact", None, start_key).entry_bytes
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
+        nodes_expanded = 0
+        peak_depth = 1
+        estimate = prepare_heuristic(heuristic, game)
+        bound = estimate(start, goal, 0)
+        # il miglior nodo è il cammino corrente (copiato solo quando migliora)
+        deadline = as_deadline(time_budget_ms, bound)
+
+        while True:
+            # cammino corrente: celle, chiavi degli stati e iteratori sui figli ancora da provare
+            path = [start]
+            keys = [start_key]
+            on_path = {start_key}
+            frames = [self._children(start_state, game.food, 0, goal, grid_size, estimate)]
+            next_bound = INF
+            nodes_expanded += 1
+
+            while frames:
+                child = next(frames[-1], None)
+                if child is None:
+                    frames.pop()
+                    on_path.discard(keys.pop())
+                    path.pop()
+                    continue
+
+                f, new_head, new_state, new_food = child
+                if f > bound:
+                    next_bound = min(next_bound, f)
+                    continue
+                if new_head == goal:
+                    result = path[1:] + [new_head]
+                    return SearchResult(result, nodes_expanded, len(result), len(result), True,
+                                        peak_depth * entry_bytes)
+                key = key_of(new_state)
+                if key in on_path:
+                    if probe:
+                        probe.duplicates += 1
+                    continue
+                if nodes_expanded >= max_expansions:
+                    return SearchResult([], nodes_expanded, 0, 0, False, peak_depth * entry_bytes)
+
+                nodes_expanded += 1
+                if probe:
+                    probe.expanded(len(frames), len(on_path))
+                path.append(new_head)
+                keys.append(key)
+                on_path.add(key)
+                peak_depth = max(peak_depth, len(path))
+                frames.append(self._children(new_state, new_food, len(path) - 1, goal, grid_size, estimate))
+                if deadline:
+                    h = f - (len(path) - 1)
+                    if deadline.visit(path[1:] if h < deadline.best_h else None, h):
+                        result = deadline.best or []
+                        return SearchResult(result, nodes_expanded, len(result), len(result), bool(result),
+                                            peak_depth * entry_bytes, partial=bool(result))
+
+                if notify:
+                    visited_heads.add(new_head)
+                    if notify.due():
+                        notify(path[1:], visited_view, nodes_expanded, len(frames))
+
+            # nessun nodo oltre la soglia: il cibo non è raggiungibile
+            if next_bound == INF:
+                return SearchResult([], nodes_expanded, 0, 0, False, peak_depth * entry_bytes)
+            bound = next_bound
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
+
+
+# nodo dell'albero di SMA*: i figli in memoria sono indicizzati per mossa (la cella della nuova testa),
+# quelli dimenticati lasciano al padre solo il loro f (valore di backup)
+class _SMANode:
+    __slots__ = ("state", "food", "head", "g", "f", "depth", "parent", "move",
+                 "children", "forgotten", "expanded", "alive", "version")
+
+    def __init__(self, state, food, head, g, f, depth, parent, move):
+        self.state = state
+        self.food = food
+        self.head = head
+        self.g = g
+        self.f = f
+        self.depth = depth
+        self.parent = parent
+        self.move = move
+        self.children = {}
+        self.forgotten = {}
+        self.expanded = False
+        self.alive = True
+        self.version = 0
+
+    # f con cui il nodo sta nella frontiera: il proprio se non è mai stato espanso,
+    # altrimenti il migliore tra i figli dimenticati da rigenerare
+    def open_f(self):
+        if not self.expanded:
+            return self.f
+        return min(self.forgotten.values()) if self.forgotten else None
+
+
+# SMA* (Simplified Memory-bounded A*, Russell 1992): A* con al più max_nodes nodi in memoria.
+# Quando la memoria è piena si dimentica la foglia peggiore (f più alto, meno profonda) e il padre
+# ne conserva f per rigenerarla solo se torna a essere la scelta migliore.
+# Ottimo se il cammino ottimo (lungo al più max_nodes - 1 mosse) entra nel budget.
+class SMAStarAgent(_BaseAgent):
+    # la memoria è limitata da max_nodes, non da un closed set
+    CLOSED_SETS = ("exact",)
+    MEMORY_BUDGET = False
+
+    def __init__(self, max_nodes=100000, **closed_set_options):
+        super().__init__(**closed_set_options)
+        self.max_nodes = max_nodes
+
+    def find_path_with_exploration(self, game, on_expand=None, heuristic=manhattan, max_expansions=1000000,
+                                   time_budget_ms=None):
+        start, goal = game.snake[0], game.food
+        if goal is None:
+            return SearchResult([], 0, 0, 0, False)
+
+        grid_size = game.grid_size
+        max_nodes = max(2, self.max_nodes)
+        estimate = prepare_heuristic(heuristic, game)
+        root = _SMANode(encode_snake(game.snake, grid_size, self.zobrist), game.food, start,
+                        0, estimate(start, goal, 0), 0, None, None)
+        node_bytes = _sma_node_bytes(root)
+        # frontiera (f minimo, poi più profondo) e foglie candidate all'oblio (f massimo, poi meno
+        # profonda), entrambe con invalidazione pigra tramite version
+        open_heap, leaf_heap = [], []
+        counter = 0
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        deadline = as_deadline(time_budget_ms, root.f)
+        visited_heads = {start}
+        visited_view = ReadOnlySet(visited_heads)
+        nodes_expanded = 0
+        in_memory = peak = 1
+
+        def push(node):
+            nonlocal counter
+            node.version += 1
+            counter += 1
+            f = node.open_f()
+            if f is not None:
+                heapq.heappush(open_heap, (f, -node.depth, counter, node.version, node))
+            if not node.children and node.parent is not None:
+                heapq.heappush(leaf_heap, (-node.f, node.depth, counter, node.version, node))
+
+        # il valore di un nodo espanso è il minimo tra i figli in memoria e quelli dimenticati
+        def backup(node):
+            while node is not None and node.expanded:
+                values = [child.f for child in node.children.values()]
+                values.extend(node.forgotten.values())
+                best = min(values) if values else INF
+                if best == node.f:
+                    break
+                node.f = best
+                push(node)
+                node = node.parent
+
+        push(root)
+        while open_heap and nodes_expanded < max_expansions:
+            f, _, _, version, node = heapq.heappop(open_heap)
+            if not node.alive or version != node.version:
+                continue
+            if f == INF:
+                break
+
+            if node.head == goal:
+                path = _sma_path(node)
+                return SearchResult(path, nodes_expanded, len(path), len(path), True, peak * node_bytes)
+            # i nodi dimenticati restano raggiungibili dal miglior nodo tramite i padri
+            if deadline and deadline.visit(node if node.parent is not None else None, node.f - node.g):
+                path = _sma_path(deadline.best) if deadline.best is not None else []
+                return SearchResult(path, nodes_expanded, len(path), len(path), bool(path), peak * node_bytes,
+                                    partial=bool(path))
+
+            nodes_expanded += 1
+            if probe:
+                probe.expanded(len(open_heap), in_memory)
+            regenerate = node.forgotten if node.expanded else None
+            for new_head, new_state, new_food in self._next_states(node.state, node.food, grid_size):
+                move = new_state[0]
+                if move in node.children or (regenerate is not None and move not in regenerate):
+                    continue
+                g = node.g + 1
+                if new_head != goal and node.depth + 2 >= max_nodes:
+                    # il cammino non entra in memoria: il ramo non può portare al cibo
+                    child_f = INF
+                else:
+                    child_f = max(node.f, g + estimate(new_head, goal, g))
+                if regenerate is not None:
+                    child_f = max(child_f, regenerate.pop(move))
+                child = _SMANode(new_state, new_food, new_head, g, child_f, node.depth + 1, node, move)
+                node.children[move] = child
+                in_memory += 1
+                push(child)
+                if notify:
+                    visited_heads.add(new_head)
+
+            # i figli non rigenerati (es. perché ora bloccati) non tornano più
+            if regenerate:
+                regenerate.clear()
+            # senza figli (vicolo cieco) il backup porta f a infinito
+            node.expanded = True
+            push(node)
+            backup(node)
+            peak = max(peak, in_memory)
+
+            if notify and notify.due():
+                notify(_sma_path(node), visited_view, nodes_expanded, len(open_heap))
+
+            # memoria piena: si dimenticano le foglie peggiori
+            while in_memory > max_nodes and leaf_heap:
+                _, _, _, version, leaf = heapq.heappop(leaf_heap)
+                if not leaf.alive or version != leaf.version or leaf.children:
+                    continue
+                parent = leaf.parent
+                leaf.alive = False
+                in_memory -= 1
+                del parent.children[leaf.move]
+                parent.forgotten[leaf.move] = leaf.f
+                push(parent)
+
+        return SearchResult([], nodes_expanded, 0, 0, False, peak * node_bytes)
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
+
+
+# cammino dalla radice al nodo di SMA* (radice esclusa) risalendo i padri
+def _sma_path(node):
+    path = []
+    while node.parent is not None:
+        path.append(node.head)
+        node = node.parent
+    path.reverse()
+    return path
+
+
+# stima della memoria di una voce della frontiera: tupla, stato compatto e suoi interi
+# (il cibo è condiviso tra le voci)
+def _frontier_entry_bytes(entry, state):
+    return (sys.getsizeof(entry) + sum(sys.getsizeof(v) for v in entry if v is not state)
+            + sys.getsizeof(state) + sum(sys.getsizeof(v) for v in state))
+
+
+# stima della memoria di un nodo di SMA*: oggetto, stato compatto e dizionari dei figli
+def _sma_node_bytes(node):
+    return (sys.getsizeof(node) + sys.getsizeof(node.state) + sum(sys.getsizeof(v) for v in node.state)
+            + sys.getsizeof(node.children) + sys.getsizeof(node.forgotten))
@@ -2,6 +2,10 @@ from collections import deque
 import heapq
 from math import sqrt
 from heuristics import manhattan, euclidean_distance, diagonal_distance
+from search_nodes import SearchNodes, TieBreaker, ReadOnlySet, as_notifier, as_deadline
+from grid import pos_neighbors
+from distance_field import DistanceField
+from lpa_star import LPAStar
 # mosse
 MOVES = {
     "UP": (-1, 0),
@@ -14,59 +18,103 @@ MOVES = {
 
 # def della classe dell'oggetto che ha come attributi il risultato della ricerca
 class SearchResult:
-    def __init__(self, path, nodes_expanded, depth, cost, found):
+    def __init__(self, path, nodes_expanded, depth, cost, found, partial=False):
         self.path = path
         self.nodes_expanded = nodes_expanded
         self.depth = depth
         self.cost = cost
         self.found = found
+        # tempo scaduto: path porta solo verso la cella più vicina al cibo
+        self.partial = partial
 
 # Agente base: restituisce le celle adiacenti alla posizione attuale 
 class _BaseAgent:
+    # strumentazione opzionale (profiling.SearchProbe), agganciata da find_plan; probe_successors
+    # dice se i successori passano da _neighbors (non per campo di distanze e LPA*)
+    probe = None
+    probe_successors = True
+
     def __init__(self,is_relaxed=True):
         self.is_relaxed=is_relaxed
     
     def _neighbors(self, game, pos):
         # Caso rilassato in cui lo stato corrente contiene solo la testa del serpente
         if(self.is_relaxed):
-            for dx, dy in MOVES.values():
-                nx, ny = pos[0] + dx, pos[1] + dy
-                if 0 <= nx < game.grid_size and 0 <= ny < game.grid_size:
-                    if (nx, ny) not in game.snake:
-                        yield (nx, ny)
+            for nb in pos_neighbors(game.grid_size)[pos]:
+                if nb not in game.occupied:
+                    yield nb
         else:
             #applicazione caso completo
             pass
+
+    # piano parziale a tempo scaduto: cammino fino alla miglior cella della ricerca
+    @staticmethod
+    def _partial_result(nodes, deadline, nodes_expanded):
+        if deadline.best is None:
+            return SearchResult([], nodes_expanded, 0, 0, False)
+        path = nodes.path(deadline.best)
+        return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True, partial=True)
+
+    # ricerca tramite campo di distanze calcolato in un colpo solo dal cibo (numpy se disponibile);
+    # il campo resta in self.last_field per essere riusato (es. da un controllo di sicurezza)
+    def _field_search(self, game, on_expand=None):
+        start, goal = game.snake[0], game.food
+        field = DistanceField(game.grid_size, game.occupied, goal)
+        self.last_field = field
+        path = field.path_from(start)
+        if path is None:
+            return SearchResult([], field.reached, 0, 0, False)
+        if on_expand:
+            on_expand([start] + path, field.reached_cells(), field.reached, 0)
+        return SearchResult(path, field.reached, len(path) + 1, len(path), True)
+
 # Agente per BFS 
 class Relaxed_BFSAgent(_BaseAgent):
     
-    def __init__(self, is_relaxed=True):
+    def __init__(self, is_relaxed=True, distance_field=False):
         super().__init__(is_relaxed)
+        self.distance_field = distance_field
+        self.probe_successors = not distance_field
         
-    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000):
+    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000, time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        queue = deque([(start, [start])])
+        if self.distance_field:
+            return self._field_search(game, on_expand)
+
+        nodes = SearchNodes(game.grid_size, start)
+        queue = deque([(start, 0)])
         visited = {start}
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        deadline = as_deadline(time_budget_ms, manhattan(start, goal))
+        visited_view = ReadOnlySet(visited)
         nodes_expanded = 0
 
         while queue and max_expansions>0:
-            pos, path = queue.popleft()
+            pos, node = queue.popleft()
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(queue), len(visited))
 
             # far vedere la nuova frontiera espansa durante il reasoning
-            if on_expand:
-                on_expand(path, set(visited), nodes_expanded, len(queue))
+            if notify and notify.due():
+                notify(nodes.path(node, include_root=True), visited_view, nodes_expanded, len(queue))
 
             if pos == goal:
-                return SearchResult(path[1:], nodes_expanded, len(path), len(path) - 1, True)
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True)
+            if deadline and deadline.visit(node or None, manhattan(pos, goal)):
+                return self._partial_result(nodes, deadline, nodes_expanded)
 
             for nb in self._neighbors(game, pos):
                 if nb not in visited:
                     visited.add(nb)
-                    queue.append((nb, path + [nb]))
+                    queue.append((nb, nodes.add(nb[0] * game.grid_size + nb[1], node)))
+                elif probe:
+                    probe.duplicates += 1
             max_expansions-=1
 
         return SearchResult([], nodes_expanded, 0, 0, False)
@@ -80,29 +128,41 @@ class Relaxed_DFSAgent(_BaseAgent):
     def __init__(self, is_relaxed=True):
         super().__init__(is_relaxed)
         
-    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000):
+    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000, time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        stack = [(start, [start])]
+        nodes = SearchNodes(game.grid_size, start)
+        stack = [(start, 0)]
         visited = {start}
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        deadline = as_deadline(time_budget_ms, manhattan(start, goal))
+        visited_view = ReadOnlySet(visited)
         nodes_expanded = 0
 
         while stack and max_expansions>0:
-            pos, path = stack.pop()
+            pos, node = stack.pop()
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(stack), len(visited))
 
-            if on_expand:
-                on_expand(path, set(visited), nodes_expanded, len(stack))
+            if notify and notify.due():
+                notify(nodes.path(node, include_root=True), visited_view, nodes_expanded, len(stack))
 
             if pos == goal:
-                return SearchResult(path[1:], nodes_expanded, len(path), len(path) - 1, True)
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True)
+            if deadline and deadline.visit(node or None, manhattan(pos, goal)):
+                return self._partial_result(nodes, deadline, nodes_expanded)
 
             for nb in self._neighbors(game, pos):
                 if nb not in visited:
                     visited.add(nb)
-                    stack.append((nb, path + [nb]))
+                    stack.append((nb, nodes.add(nb[0] * game.grid_size + nb[1], node)))
+                elif probe:
+                    probe.duplicates += 1
             max_expansions-=1
 
         return SearchResult([], nodes_expanded, 0, 0, False)
@@ -113,35 +173,51 @@ class Relaxed_DFSAgent(_BaseAgent):
 # Agente per Greedy 
 class Relaxed_GreedyAgent(_BaseAgent):
     
-    def __init__(self, is_relaxed=True):
+    def __init__(self, is_relaxed=True, tie_break="fifo"):
         super().__init__(is_relaxed)
+        self.tie_break = tie_break
         
-    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000):
+    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000,
+                                   time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        open_list = [(heuristic(start, goal), [start])]
+        nodes = SearchNodes(game.grid_size, start)
+        tie = TieBreaker(self.tie_break, nodes, game.snake[1] if len(game.snake) > 1 else None)
+        # (h, rank, seq, pos, node): heap con h calcolata una sola volta per nodo
+        open_list = [(heuristic(start, goal), 0, 0, start, 0)]
         visited = {start}
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        deadline = as_deadline(time_budget_ms, open_list[0][0])
+        visited_view = ReadOnlySet(visited)
         nodes_expanded = 0
 
         while open_list and max_expansions>0:
             # scegli il path con h minore
-            open_list.sort(key=lambda item: heuristic(item[1][-1], goal))
-            _, path = open_list.pop(0)
-            pos = path[-1]
+            h, _, _, pos, node = heapq.heappop(open_list)
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(open_list), len(visited))
 
-            if on_expand:
-                on_expand(path, set(visited), nodes_expanded, len(open_list))
+            if notify and notify.due():
+                notify(nodes.path(node, include_root=True), visited_view, nodes_expanded, len(open_list))
 
             if pos == goal:
-                return SearchResult(path[1:], nodes_expanded, len(path), len(path) - 1, True)
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True)
+            if deadline and deadline.visit(node or None, h):
+                return self._partial_result(nodes, deadline, nodes_expanded)
 
             for nb in self._neighbors(game, pos):
                 if nb not in visited:
                     visited.add(nb)
-                    open_list.append((heuristic(nb, goal), path + [nb]))
+                    cell = nb[0] * game.grid_size + nb[1]
+                    rank, seq = tie.key(node, cell)
+                    heapq.heappush(open_list, (heuristic(nb, goal), rank, seq, nb, nodes.add(cell, node)))
+                elif probe:
+                    probe.duplicates += 1
             max_expansions-=1
 
         return SearchResult([], nodes_expanded, 0, 0, False)
@@ -152,36 +228,54 @@ class Relaxed_GreedyAgent(_BaseAgent):
 # Agente per A star 
 class Relaxed_AStarAgent(_BaseAgent):
     
-    def __init__(self, is_relaxed=True):
+    def __init__(self, is_relaxed=True, distance_field=False):
         super().__init__(is_relaxed)
+        self.distance_field = distance_field
+        self.probe_successors = not distance_field
         
-    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000):
+    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000,
+                                   time_budget_ms=None):
         start, goal = game.snake[0], game.food
         if goal is None:
             return SearchResult([], 0, 0, 0, False)
 
-        # (priority, g, path)
-        open_list = [(heuristic(start, goal), 0, [start])]
+        # il campo di distanze è esatto: l'euristica non serve
+        if self.distance_field:
+            return self._field_search(game, on_expand)
+
+        # (priority, g, node, pos): a parità di priorità e g si espande il nodo inserito prima
+        nodes = SearchNodes(game.grid_size, start)
+        open_list = [(heuristic(start, goal), 0, 0, start)]
         visited = {start}
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        deadline = as_deadline(time_budget_ms, open_list[0][0])
+        visited_view = ReadOnlySet(visited)
         nodes_expanded = 0
 
         while open_list and max_expansions>0:
-            priority, g, path = heapq.heappop(open_list)
-            pos = path[-1]
+            priority, g, node, pos = heapq.heappop(open_list)
             nodes_expanded += 1
+            if probe:
+                probe.expanded(len(open_list), len(visited))
 
-            if on_expand:
-                on_expand(path, set(visited), nodes_expanded, len(open_list))
+            if notify and notify.due():
+                notify(nodes.path(node, include_root=True), visited_view, nodes_expanded, len(open_list))
 
             if pos == goal:
-                return SearchResult(path[1:], nodes_expanded, len(path), g, True)
+                path = nodes.path(node)
+                return SearchResult(path, nodes_expanded, len(path) + 1, g, True)
+            if deadline and deadline.visit(node or None, priority - g):
+                return self._partial_result(nodes, deadline, nodes_expanded)
 
             for nb in self._neighbors(game, pos):
                 if nb not in visited:
                     visited.add(nb)
                     new_g = g + 1
                     f = new_g + heuristic(nb, goal)
-                    heapq.heappush(open_list, (f, new_g, path + [nb]))
+                    heapq.heappush(open_list, (f, new_g, nodes.add(nb[0] * game.grid_size + nb[1], node), nb))
+                elif probe:
+                    probe.duplicates += 1
             max_expansions-=1
 
         return SearchResult([], nodes_expanded, 0, 0, False)
@@ -189,4 +283,257 @@ class Relaxed_AStarAgent(_BaseAgent):
     def find_path(self, game):
         return self.find_path_with_exploration(game, on_expand=None)
 
+# Agente per A* incrementale (LPA*): riusa l'albero di ricerca tra un cibo e il successivo.
+# Ogni albero è radicato in un cibo: prima risponde all'indietro (dal cibo alla testa), poi,
+# quando la testa è arrivata su quel cibo, viene riparato e riusato in avanti verso il cibo nuovo.
+class Relaxed_LPAStarAgent(_BaseAgent):
+    # lpa_star.compute visita i vicini da sé
+    probe_successors = False
+
+    def __init__(self, is_relaxed=True):
+        super().__init__(is_relaxed)
+        self.planner = None
+        self.reused_plans = 0
+        
+    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000,
+                                   time_budget_ms=None):
+        start, goal = game.snake[0], game.food
+        if goal is None:
+            return SearchResult([], 0, 0, 0, False)
+
+        n = game.grid_size
+        head, food = start[0] * n + start[1], goal[0] * n + goal[1]
+        blocked = {x * n + y for x, y in game.occupied}
+        blocked.discard(head)
+
+        planner = self.planner
+        if (planner is not None and planner.grid_size == n and planner.root == head
+                and planner.heuristic is heuristic):
+            planner.update(blocked, food)
+            self.planner = None
+            self.reused_plans += 1
+        else:
+            planner = LPAStar(n, food, blocked, head, heuristic)
+            self.planner = planner
+
+        on_cell = None
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        if notify:
+            coords = planner.coords
+            visited = set()
+            visited_view = ReadOnlySet(visited)
+
+            def on_cell(cell, nodes_expanded, frontier_size):
+                visited.add(coords[cell])
+                if notify.due():
+                    cells = planner.path_to_root(cell) or [cell]
+                    notify([coords[c] for c in cells], visited_view, nodes_expanded, frontier_size)
+
+        # il probe riceve la frontiera; i visitati sono le celle espanse finora
+        if probe:
+            report = on_cell
+
+            def on_cell(cell, nodes_expanded, frontier_size):
+                probe.expanded(frontier_size, nodes_expanded)
+                if report:
+                    report(cell, nodes_expanded, frontier_size)
+
+        # la distanza tra radice e goal dell'albero è la stessa nei due versi
+        root_h = heuristic(start, goal)
+        deadline = as_deadline(time_budget_ms, root_h)
+        nodes_expanded, found = planner.compute(max_expansions, on_cell, deadline)
+        cells = planner.path_to_root(planner.goal) if found else None
+        if cells is None:
+            self.planner = None
+            if deadline and deadline.expired:
+                # in avanti: cammino fino alla cella raggiunta più vicina al cibo; all'indietro l'albero
+                # parte dal cibo e non dà un cammino dalla testa, si fa un solo passo verso il cibo
+                path = []
+                if planner.root != head:
+                    path = sorted((nb for nb in self._neighbors(game, start) if heuristic(nb, goal) < root_h),
+                                  key=lambda nb: heuristic(nb, goal))[:1]
+                elif deadline.best is not None:
+                    cells = planner.path_to_root(deadline.best)
+                    if cells is not None:
+                        cells.reverse()
+                        path = [planner.coords[c] for c in cells[1:]]
+                if path:
+                    return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True, partial=True)
+            return SearchResult([], nodes_expanded, 0, 0, False)
+
+        # il percorso va sempre dalla testa al cibo
+        if planner.root == head:
+            cells.reverse()
+        path = [planner.coords[c] for c in cells[1:]]
+        return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True)
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
+
+
+# Agente per BFS bidirezionale: due BFS, dalla testa e dal cibo, espanse a livelli alterni
+# (sempre il lato con la frontiera più piccola). Il livello in cui le due ricerche si incontrano
+# viene completato e si tiene l'incontro più corto, quindi il percorso resta minimo.
+class Relaxed_BidirectionalBFSAgent(_BaseAgent):
+    
+    def __init__(self, is_relaxed=True):
+        super().__init__(is_relaxed)
+        
+    def find_path_with_exploration(self, game, on_expand=None,max_expansions=1000000, time_budget_ms=None):
+        start, goal = game.snake[0], game.food
+        if goal is None:
+            return SearchResult([], 0, 0, 0, False)
+
+        n = game.grid_size
+        # per ogni lato: archivio dei nodi, posizione -> (nodo, distanza) e frontiera del livello corrente
+        sides = [
+            (SearchNodes(n, start), {start: (0, 0)}, [start]),
+            (SearchNodes(n, goal), {goal: (0, 0)}, [goal]),
+        ]
+        visited = {start, goal}
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        # il piano parziale viene solo dal lato della testa
+        deadline = as_deadline(time_budget_ms, manhattan(start, goal))
+        visited_view = ReadOnlySet(visited)
+        nodes_expanded = 0
+
+        while sides[0][2] and sides[1][2] and max_expansions > 0:
+            side = 0 if len(sides[0][2]) <= len(sides[1][2]) else 1
+            nodes, reached, frontier = sides[side]
+            other = sides[1 - side][1]
+            next_frontier = []
+            best = None
+            expired = False
+
+            for pos in frontier:
+                if max_expansions <= 0 or expired:
+                    break
+                node, dist = reached[pos]
+                nodes_expanded += 1
+                max_expansions -= 1
+                if probe:
+                    probe.expanded(len(frontier) + len(next_frontier), len(visited))
+
+                if notify and notify.due():
+                    notify(nodes.path(node, include_root=True), visited_view, nodes_expanded,
+                           len(frontier) + len(next_frontier))
+
+                for nb in self._neighbors(game, pos):
+                    if nb in other:
+                        total = dist + 1 + other[nb][1]
+                        if best is None or total < best[0]:
+                            best = (total, side, node, nb)
+                    if nb not in reached:
+                        reached[nb] = (nodes.add(nb[0] * n + nb[1], node), dist + 1)
+                        visited.add(nb)
+                        next_frontier.append(nb)
+                    elif probe:
+                        probe.duplicates += 1
+                if deadline:
+                    expired = deadline.visit(node if side == 0 and node else None, manhattan(pos, goal))
+
+            if best is not None:
+                path = self._join(sides, best)
+                return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True)
+            if expired:
+                return self._partial_result(sides[0][0], deadline, nodes_expanded)
+            sides[side] = (nodes, reached, next_frontier)
+
+        return SearchResult([], nodes_expanded, 0, 0, False)
+
+    # unisce i due mezzi cammini nel punto d'incontro: testa -> nodo -> nb -> cibo (testa esclusa).
+    # sides: per ogni lato (archivio dei nodi, posizione -> (nodo, distanza), ...)
+    @staticmethod
+    def _join(sides, best):
+        _, side, node, nb = best
+        near = sides[side][0].path(node, include_root=True)
+        far_nodes, far_reached = sides[1 - side][0], sides[1 - side][1]
+        far = far_nodes.path(far_reached[nb][0], include_root=True)
+        cells = near + far[::-1]
+        if side == 1:
+            cells.reverse()
+        return cells[1:]
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
+
+# Agente per A* bidirezionale: due A* (verso il cibo e verso la testa) espansi alternando il lato
+# con la frontiera più piccola. mu è il percorso più corto visto passando per un incontro;
+# ci si ferma quando mu <= max(f minimo in avanti, f minimo all'indietro) (criterio di Pohl),
+# che con euristiche consistenti garantisce l'ottimalità.
+class Relaxed_BidirectionalAStarAgent(_BaseAgent):
+    
+    def __init__(self, is_relaxed=True):
+        super().__init__(is_relaxed)
+        
+    def find_path_with_exploration(self, game, on_expand=None,heuristic=manhattan,max_expansions=1000000,
+                                   time_budget_ms=None):
+        start, goal = game.snake[0], game.food
+        if goal is None:
+            return SearchResult([], 0, 0, 0, False)
+
+        n = game.grid_size
+        # per ogni lato: archivio dei nodi, posizione -> (nodo, g), heap (f, g, nodo, pos),
+        # posizioni chiuse e bersaglio dell'euristica
+        sides = []
+        for root, target in ((start, goal), (goal, start)):
+            sides.append((SearchNodes(n, root), {root: (0, 0)},
+                          [(heuristic(root, target), 0, 0, root)], set(), target))
+        visited = {start, goal}
+        notify = as_notifier(on_expand)
+        probe = self.probe
+        # il piano parziale viene solo dal lato della testa
+        deadline = as_deadline(time_budget_ms, sides[0][2][0][0])
+        visited_view = ReadOnlySet(visited)
+        nodes_expanded = 0
+        best = None
+
+        while sides[0][2] and sides[1][2] and max_expansions > 0:
+            if best is not None and best[0] <= max(sides[0][2][0][0], sides[1][2][0][0]):
+                break
+
+            side = 0 if len(sides[0][2]) <= len(sides[1][2]) else 1
+            nodes, reached, open_list, closed, target = sides[side]
+            other = sides[1 - side][1]
+            f, g, node, pos = heapq.heappop(open_list)
+            # voce superata da un g migliore o posizione già chiusa
+            if pos in closed or reached[pos][0] != node:
+                continue
+            closed.add(pos)
+            nodes_expanded += 1
+            max_expansions -= 1
+            if probe:
+                probe.expanded(len(sides[0][2]) + len(sides[1][2]), len(visited))
+
+            if notify and notify.due():
+                notify(nodes.path(node, include_root=True), visited_view, nodes_expanded,
+                       len(sides[0][2]) + len(sides[1][2]))
 
+            for nb in self._neighbors(game, pos):
+                new_g = g + 1
+                if nb not in reached or new_g < reached[nb][1]:
+                    new_node = nodes.add(nb[0] * n + nb[1], node)
+                    reached[nb] = (new_node, new_g)
+                    visited.add(nb)
+                    heapq.heappush(open_list, (new_g + heuristic(nb, target), new_g, new_node, nb))
+                elif probe:
+                    probe.duplicates += 1
+                if nb in other:
+                    total = new_g + other[nb][1]
+                    if best is None or total < best[0]:
+                        best = (total, side, node, nb)
+            # a tempo scaduto basta un incontro, anche se non ancora dimostrato minimo
+            if deadline and deadline.visit(node if side == 0 and node else None, f - g):
+                if best is None:
+                    return self._partial_result(sides[0][0], deadline, nodes_expanded)
+                break
+
+        if best is None:
+            return SearchResult([], nodes_expanded, 0, 0, False)
+        path = Relaxed_BidirectionalBFSAgent._join(sides, best)
+        return SearchResult(path, nodes_expanded, len(path) + 1, len(path), True)
+
+    def find_path(self, game):
+        return self.find_path_with_exploration(game, on_expand=None)
@@ -0,0 +1,155 @@
+import time
+from array import array
+from collections.abc import Set
+from grid import cell_coords
+
+
+# Archivio condiviso dei nodi di ricerca: per ogni nodo solo la cella raggiunta e l'indice del padre.
+# Il cammino viene ricostruito risalendo i padri, solo quando serve (soluzione o visualizzazione).
+class SearchNodes:
+    def __init__(self, grid_size, root):
+        self.grid_size = grid_size
+        self.cells = array("i", [root[0] * grid_size + root[1]])
+        self.parents = array("i", [-1])
+
+    def __len__(self):
+        return len(self.cells)
+
+    # memoria occupata: due interi a 32 bit per nodo
+    @property
+    def nbytes(self):
+        return len(self.cells) * (self.cells.itemsize + self.parents.itemsize)
+
+    # aggiunge un nodo figlio di parent nella cella (id x * grid_size + y) e ne restituisce l'indice
+    def add(self, cell, parent):
+        self.cells.append(cell)
+        self.parents.append(parent)
+        return len(self.cells) - 1
+
+    def position(self, node):
+        return cell_coords(self.grid_size)[self.cells[node]]
+
+    # cammino dalla radice al nodo (la radice è inclusa solo se richiesto)
+    def path(self, node, include_root=False):
+        cells, parents = self.cells, self.parents
+        coords = cell_coords(self.grid_size)
+        stop = -1 if include_root else 0
+        path = []
+        while node > stop:
+            path.append(coords[cells[node]])
+            node = parents[node]
+        path.reverse()
+        return path
+
+
+# politiche di spareggio tra nodi con la stessa priorità
+TIE_BREAKS = ("fifo", "lifo", "straight")
+
+
+# produce la chiave di spareggio (rank, seq) da mettere nello heap subito dopo la priorità:
+#  - fifo: a parità di priorità esce il nodo inserito prima
+#  - lifo: esce il nodo inserito per ultimo
+#  - straight: prima i nodi che proseguono nella stessa direzione del padre, poi fifo
+class TieBreaker:
+    def __init__(self, policy, nodes, neck=None):
+        if policy not in TIE_BREAKS:
+            raise ValueError(f"Politica di spareggio sconosciuta: {policy}")
+        self.policy = policy
+        self.nodes = nodes
+        # cella del collo del serpente: dà la direzione di partenza della radice
+        self.neck = neck[0] * nodes.grid_size + neck[1] if neck is not None else -1
+        self.counter = 0
+
+    def key(self, parent, cell):
+        self.counter += 1
+        if self.policy == "fifo":
+            return 0, self.counter
+        if self.policy == "lifo":
+            return 0, -self.counter
+
+        cells = self.nodes.cells
+        parent_cell = cells[parent]
+        prev_cell = cells[self.nodes.parents[parent]] if parent > 0 else self.neck
+        straight = prev_cell >= 0 and cell - parent_cell == parent_cell - prev_cell
+        return (0 if straight else 1), self.counter
+
+
+# vista in sola lettura su un insieme mantenuto dall'agente: nessuna copia a ogni espansione
+class ReadOnlySet(Set):
+    def __init__(self, items):
+        self._items = items
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+
+# callback on_expand con limitazione della frequenza: notifica ogni `every` espansioni
+# e comunque non più spesso di `interval_ms` millisecondi
+class ExpandNotifier:
+    def __init__(self, callback, every=1, interval_ms=0):
+        self.callback = callback
+        self.every = max(1, every)
+        self.interval_s = interval_ms / 1000
+        self.count = 0
+        self.last_time = 0.0
+
+    def due(self):
+        self.count += 1
+        if self.count < self.every:
+            return False
+        if self.interval_s:
+            now = time.perf_counter()
+            if now - self.last_time < self.interval_s:
+                return False
+            self.last_time = now
+        self.count = 0
+        return True
+
+    def __call__(self, path, visited, nodes_expanded, frontier_size):
+        return self.callback(path, visited, nodes_expanded, frontier_size)
+
+
+def as_notifier(on_expand):
+    if on_expand is None or isinstance(on_expand, ExpandNotifier):
+        return on_expand
+    return ExpandNotifier(on_expand)
+
+
+# il clock delle ricerche anytime si legge una volta ogni CLOCK_EVERY espansioni
+CLOCK_EVERY = 64
+
+
+# Limite di tempo di una ricerca anytime. Intanto tiene il nodo espanso con h minore (il più vicino
+# al cibo secondo l'euristica), radice esclusa: a tempo scaduto l'agente restituisce il cammino
+# fino a quel nodo come piano parziale (SearchResult.partial) invece di fallire.
+# Conta solo un nodo con h minore di root_h (quella della radice): un piano parziale che non
+# avvicina al cibo non viene proposto, e best resta None.
+# Senza limite di tempo (time_budget_ms None) non scade mai e serve solo a tenere il miglior nodo,
+# per il piano parziale degli agenti fermati dal budget di memoria.
+class Deadline:
+    def __init__(self, time_budget_ms, root_h=float("inf")):
+        self.end = time.perf_counter() + time_budget_ms / 1000 if time_budget_ms else float("inf")
+        self.count = 0
+        self.best = None
+        self.best_h = root_h
+        self.expired = False
+
+    # registra il nodo espanso (None se non va considerato) e dice se il tempo è scaduto
+    def visit(self, node, h):
+        if node is not None and h < self.best_h:
+            self.best, self.best_h = node, h
+        self.count += 1
+        if not self.count % CLOCK_EVERY and time.perf_counter() > self.end:
+            self.expired = True
+        return self.expired
+
+
+# track: serve il miglior nodo anche senza limite di tempo
+def as_deadline(time_budget_ms, root_h=float("inf"), track=False):
+    return Deadline(time_budget_ms, root_h) if time_budget_ms or track else None
@@ -0,0 +1,73 @@
+import random
+import pytest
+from closed_set import BloomClosedSet, ExactClosedSet, LRUClosedSet, make_closed_set
+
+# Semantica dei closed set di closed_set.py: cosa ricordano, cosa scartano e quanta memoria
+# dichiarano (il budget dell'intera ricerca lo fa rispettare l'agente, vedi test_search.py).
+# Uso: pytest tests
+
+
+def test_exact_never_forgets():
+    visited = make_closed_set("exact", 1000, sample_key=0)
+    assert isinstance(visited, ExactClosedSet)
+    for key in range(500):
+        visited.add(key)
+    assert visited.trim(10 ** 6) == 0
+    assert all(key in visited for key in range(500))
+    assert visited.peak_bytes == 500 * visited.entry_bytes
+    assert not visited.saturated and visited.evictions == 0
+
+
+def test_lru_evicts_least_recently_used():
+    visited = LRUClosedSet(budget_bytes=0, sample_key=0)
+    visited.capacity = 3
+    for key in (1, 2, 3):
+        visited.add(key)
+    # la ricerca di 1 lo rende il più recente: esce 2
+    assert 1 in visited
+    visited.add(4)
+    assert 2 not in visited
+    assert all(key in visited for key in (1, 3, 4))
+    assert visited.evictions == 1 and visited.saturated
+
+
+def test_lru_trim():
+    visited = make_closed_set("lru", 10 ** 6, sample_key=0)
+    for key in range(100):
+        visited.add(key)
+    size = visited.entry_bytes
+    # libera almeno i byte richiesti, a voci intere, partendo dalle meno recenti
+    assert visited.trim(3 * size - 1) == 3 * size
+    assert len(visited) == 97
+    assert 2 not in visited and 3 in visited
+    assert visited.evictions == 3 and visited.saturated
+    # il picco resta quello raggiunto prima di trim
+    assert visited.peak_bytes == 100 * size
+    assert visited.trim(10 ** 9) == 97 * size
+    assert len(visited) == 0
+
+
+def test_bloom_has_no_false_negatives():
+    visited = make_closed_set("bloom", 2 * 4096)
+    assert isinstance(visited, BloomClosedSet)
+    # metà del budget al filtro, il resto a frontiera e nodi
+    assert visited.peak_bytes == 4096
+    rng = random.Random(0)
+    keys = [rng.getrandbits(64) for _ in range(3000)]
+    for key in keys:
+        visited.add(key)
+    assert all(key in visited for key in keys)
+    assert not visited.saturated
+    assert visited.trim(10 ** 6) == 0
+
+    for key in range(4000):
+        visited.add(rng.getrandbits(64))
+    # oltre circa una voce ogni 10 bit i falsi positivi superano l'1%
+    assert visited.saturated
+
+
+def test_make_closed_set_errors():
+    with pytest.raises(ValueError):
+        make_closed_set("lru")
+    with pytest.raises(ValueError):
+        make_closed_set("unknown")
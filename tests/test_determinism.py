@@ -0,0 +1,214 @@
+import copy
+import pickle
+import random
+import pytest
+from game import SnakeGame
+from grid import DIRECTIONS
+
+# Controlli di equivalenza su cui si appoggiano il riuso dell'albero di MCTS, i replay e il batch:
+#  - il cibo di SnakeGame è quello del vecchio random.seed(seed) globale con random.choice
+#    sulle celle vuote in ordine per righe, non dipende da altre partite e sopravvive a copia e pickle
+#  - apply / undo / restore riportano la partita esattamente allo stato di partenza
+#  - BatchSnakeGame coincide con SnakeGame partita per partita con le stesse azioni
+# Le azioni sono casuali (seed fissi): per lo più la mossa sicura verso il cibo, a volte una
+# qualunque, così le partite crescono ma finiscono anche contro i muri o il corpo.
+# Uso: pytest tests (senza NumPy si salta solo il confronto col batch)
+GRIDS = (4, 7, 10)
+SEEDS = range(6)
+STEPS = 400
+
+
+def _action(game, rng):
+    head_x, head_y = game.snake[0]
+    n = game.grid_size
+    safe = [(dx, dy) for dx, dy in DIRECTIONS
+            if 0 <= head_x + dx < n and 0 <= head_y + dy < n and (head_x + dx, head_y + dy) not in game.occupied]
+    if not safe or rng.random() < 0.05:
+        return rng.choice(DIRECTIONS)
+    if game.food is not None and rng.random() < 0.8:
+        food_x, food_y = game.food
+        return min(safe, key=lambda d: abs(head_x + d[0] - food_x) + abs(head_y + d[1] - food_y))
+    return rng.choice(safe)
+
+
+# stato osservabile completo della partita, indice delle celle libere compreso
+def _state(game):
+    free = game.free_cells
+    return (list(game.snake), game.food, game.score, game.moves, game.game_over,
+            sorted(game.occupied), [free.select(k) for k in range(free.count)])
+
+
+def _finished(game):
+    return game.game_over or game.food is None
+
+
+# cibo come nel vecchio game.py: random.seed(seed) e poi random.choice sulle celle vuote
+def _old_food(rng, game):
+    n = game.grid_size
+    empty = [(x, y) for x in range(n) for y in range(n) if (x, y) not in game.occupied]
+    return rng.choice(empty) if empty else None
+
+
+@pytest.mark.parametrize("grid_size", GRIDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_food_matches_global_seed(grid_size, seed):
+    game = SnakeGame(grid_size, seed)
+    old_rng = random.Random(seed)
+    rng = random.Random(1000 + seed)
+    state = random.getstate()
+    assert game.food == _old_food(old_rng, game)
+    for _ in range(STEPS):
+        if _finished(game):
+            break
+        score = game.score
+        game.step(_action(game, rng))
+        if game.score > score:
+            assert game.food == _old_food(old_rng, game)
+    # il generatore globale non viene toccato
+    assert random.getstate() == state
+
+
+# due partite giocate alternando le mosse hanno lo stesso cibo che giocate da sole
+@pytest.mark.parametrize("seed", SEEDS)
+def test_food_independent_of_other_games(seed):
+    actions, alone = [], SnakeGame(7, seed)
+    rng = random.Random(seed)
+    while not _finished(alone) and len(actions) < STEPS:
+        actions.append(_action(alone, rng))
+        alone.step(actions[-1])
+
+    game, other = SnakeGame(7, seed), SnakeGame(7, seed + 1)
+    other_rng = random.Random(seed + 1)
+    for action in actions:
+        game.step(action)
+        if not _finished(other):
+            other.step(_action(other, other_rng))
+    assert _state(game) == _state(alone)
+
+
+# una partita copiata o serializzata (tournament, replay) continua con lo stesso cibo:
+# la FoodSchedule ricrea le estrazioni mancanti dallo stato del generatore
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("copy_game", [copy.deepcopy, lambda game: pickle.loads(pickle.dumps(game))],
+                         ids=["deepcopy", "pickle"])
+def test_food_survives_copy(seed, copy_game):
+    game = SnakeGame(7, seed)
+    rng = random.Random(seed)
+    for _ in range(20):
+        if _finished(game):
+            break
+        game.step(_action(game, rng))
+    copied = copy_game(game)
+    assert _state(copied) == _state(game)
+    while not _finished(game):
+        action = _action(game, rng)
+        game.step(action)
+        copied.step(action)
+    assert _state(copied) == _state(game)
+
+
+# apply coincide con step, e restore a un punto qualunque riporta allo stato salvato
+@pytest.mark.parametrize("grid_size", GRIDS)
+@pytest.mark.parametrize("seed", SEEDS)
+def test_apply_restore_exact(grid_size, seed):
+    game, stepped = SnakeGame(grid_size, seed), SnakeGame(grid_size, seed)
+    rng = random.Random(seed)
+    saved = []
+    for _ in range(STEPS):
+        if _finished(game):
+            break
+        if rng.random() < 0.1:
+            saved.append((game.snapshot(), _state(game)))
+        action = _action(game, rng)
+        game.apply(action)
+        stepped.step(action)
+        assert _state(game) == _state(stepped)
+
+    for snapshot, state in reversed(saved):
+        game.restore(snapshot)
+        assert _state(game) == state
+    game.restore(0)
+    assert _state(game) == _state(SnakeGame(grid_size, seed))
+
+
+# undo un passo alla volta, e le mosse rigiocate dopo l'annullamento danno lo stesso cibo
+@pytest.mark.parametrize("seed", SEEDS)
+def test_undo_replay(seed):
+    game = SnakeGame(7, seed)
+    rng = random.Random(seed)
+    states, actions = [], []
+    while not _finished(game) and len(actions) < STEPS:
+        states.append(_state(game))
+        actions.append(_action(game, rng))
+        game.apply(actions[-1])
+    final = _state(game)
+
+    for state in reversed(states):
+        game.undo()
+        assert _state(game) == state
+    for action in actions:
+        game.apply(action)
+    assert _state(game) == final
+
+
+# la copia evolve come l'originale (stesso cibo) senza modificarlo
+@pytest.mark.parametrize("seed", SEEDS)
+def test_clone_independent(seed):
+    game = SnakeGame(7, seed)
+    rng = random.Random(seed)
+    for _ in range(30):
+        if _finished(game):
+            break
+        game.step(_action(game, rng))
+    before = _state(game)
+    clone = game.clone()
+    actions = []
+    while not _finished(clone) and len(actions) < STEPS:
+        actions.append(_action(clone, rng))
+        clone.step(actions[-1])
+    assert _state(game) == before
+
+    for action in actions:
+        game.step(action)
+    assert _state(game) == _state(clone)
+
+
+@pytest.mark.parametrize("grid_size", GRIDS)
+def test_batch_matches_snake_game(grid_size):
+    np = pytest.importorskip("numpy")
+    from batch_game import BatchSnakeGame
+
+    seeds = list(SEEDS)
+    batch = BatchSnakeGame(seeds, grid_size)
+    games = [SnakeGame(grid_size, seed) for seed in seeds]
+    rngs = [random.Random(seed) for seed in seeds]
+    for _ in range(STEPS):
+        # a griglia piena il batch non ferma la partita: da lì in poi non si confronta più
+        playing = [not _finished(game) for game in games]
+        if not any(playing):
+            break
+        actions = [DIRECTIONS.index(_action(game, rng)) if live else 0
+                   for game, rng, live in zip(games, rngs, playing)]
+        batch.step(np.array(actions))
+        for i, (game, action) in enumerate(zip(games, actions)):
+            if not playing[i]:
+                continue
+            game.step(DIRECTIONS[action])
+            assert batch.snake(i) == list(game.snake)
+            food = int(batch.food[i])
+            assert (divmod(food, grid_size) if food >= 0 else None) == game.food
+            assert (int(batch.score[i]), int(batch.moves[i]), bool(batch.game_over[i])) == \
+                (game.score, game.moves, game.game_over)
+
+    # to_game restituisce la stessa partita, e le mosse successive danno lo stesso cibo
+    for i, game in enumerate(games):
+        if game.food is None:
+            continue
+        copy = batch.to_game(i)
+        assert _state(copy) == _state(game)
+        rng = random.Random(i)
+        while not _finished(game):
+            action = _action(game, rng)
+            game.step(action)
+            copy.step(action)
+        assert _state(copy) == _state(game)
@@ -0,0 +1,249 @@
+import copy
+from collections import deque
+import pytest
+from game import SnakeGame, _FreeCells
+from heuristics import manhattan, prepare_heuristic, TailTimeHeuristic, BodyFieldHeuristic
+from main import make_agent
+from search_agents import (AStarAgent, BFSAgent, DFSAgent, GreedyAgent, IDAStarAgent, SMAStarAgent,
+                           SafeAStarAgent, decode_snake, encode_snake)
+from search_agents_relaxed import (Relaxed_AStarAgent, Relaxed_BFSAgent, Relaxed_BidirectionalAStarAgent,
+                                   Relaxed_BidirectionalBFSAgent, Relaxed_DFSAgent, Relaxed_GreedyAgent,
+                                   Relaxed_LPAStarAgent)
+from search_nodes import CLOCK_EVERY, Deadline
+
+# Correttezza degli agenti di ricerca sulle posizioni di partite vere:
+#  - costo ottimo: A*, IDA*, SMA* come BFS sullo stato completo; A*, bidirezionali, LPA* e campo di
+#    distanze come BFS nella versione rilassata
+#  - ammissibilità delle euristiche consapevoli del corpo lungo il cammino ottimo
+#  - piani parziali a tempo scaduto o a budget di memoria esaurito
+#  - ordine di spareggio dei nodi con lo stesso f (e g) nelle code di priorità
+# Le posizioni sono quelle incontrate giocando con A* + Manhattan (una per mela), su griglie
+# piccole perché BFS sullo stato completo resti veloce.
+# Uso: pytest tests
+GRIDS = (6, 7)
+SEEDS = range(4)
+APPLES = 14
+MAX_EXPANSIONS = 200000
+
+
+def _collect_positions():
+    positions = []
+    agent = AStarAgent()
+    for grid_size in GRIDS:
+        for seed in SEEDS:
+            game = SnakeGame(grid_size, seed)
+            while not game.game_over and game.food is not None and game.score < APPLES:
+                result = agent.find_path(game)
+                if not result.found:
+                    break
+                positions.append(copy.deepcopy(game))
+                for next_pos in result.path:
+                    head = game.snake[0]
+                    game.step((next_pos[0] - head[0], next_pos[1] - head[1]))
+    return positions
+
+
+POSITIONS = _collect_positions()
+
+
+# serpente piegato a muro doppio sulle righe 10 e 9 (colonne 1-19), con la testa sotto e il cibo
+# sopra: il muro si libera tardi e ogni agente espande ben più di CLOCK_EVERY nodi prima del cibo
+def _wall_game():
+    game = SnakeGame(20, 0)
+    game.snake = deque([(11, 1)] + [(10, y) for y in range(1, 20)] + [(9, y) for y in range(19, 0, -1)])
+    game.occupied = set(game.snake)
+    game.free_cells = _FreeCells(20)
+    for cell in game.snake:
+        game.free_cells.occupy(cell)
+    game.food = (0, 10)
+    return game
+
+
+# il cammino parte accanto alla testa, procede per celle adiacenti e il serpente lo percorre
+# senza collisioni; restituisce la partita alla fine del cammino
+def _play(game, path):
+    game = game.clone()
+    for next_pos in path:
+        head = game.snake[0]
+        action = (next_pos[0] - head[0], next_pos[1] - head[1])
+        assert abs(action[0]) + abs(action[1]) == 1
+        game.step(action)
+        assert not game.game_over
+    return game
+
+
+# come _play, ma per la versione rilassata (solo la testa si muove, il corpo resta fermo)
+def _check_relaxed_path(game, path):
+    cell = game.snake[0]
+    for next_pos in path:
+        assert abs(next_pos[0] - cell[0]) + abs(next_pos[1] - cell[1]) == 1
+        assert next_pos not in game.occupied
+        cell = next_pos
+
+
+@pytest.fixture(scope="module")
+def bfs_results():
+    return [BFSAgent().find_path_with_exploration(game, max_expansions=MAX_EXPANSIONS) for game in POSITIONS]
+
+
+@pytest.mark.parametrize("make", [AStarAgent, IDAStarAgent, lambda: SMAStarAgent(max_nodes=100000),
+                                  lambda: AStarAgent(zobrist=True), lambda: IDAStarAgent(zobrist=True)],
+                         ids=["astar", "idastar", "smastar", "astar-zobrist", "idastar-zobrist"])
+@pytest.mark.parametrize("heuristic", [manhattan, TailTimeHeuristic(), BodyFieldHeuristic()],
+                         ids=["manhattan", "tail_time", "body_field"])
+def test_complete_agents_optimal(make, heuristic, bfs_results):
+    agent = make()
+    for game, expected in zip(POSITIONS, bfs_results):
+        result = agent.find_path_with_exploration(game, heuristic=heuristic, max_expansions=MAX_EXPANSIONS)
+        assert result.found == expected.found
+        if result.found:
+            assert len(result.path) == len(expected.path)
+            assert _play(game, result.path).score == game.score + 1
+
+
+# le euristiche ammissibili non superano mai il costo rimasto lungo il cammino ottimo:
+# dopo g mosse la testa è in path[g - 1] e al cibo mancano len(path) - g mosse
+@pytest.mark.parametrize("heuristic", [TailTimeHeuristic(), BodyFieldHeuristic()],
+                         ids=["tail_time", "body_field"])
+def test_body_heuristics_admissible(heuristic, bfs_results):
+    for game, expected in zip(POSITIONS, bfs_results):
+        if not expected.found:
+            continue
+        estimate = prepare_heuristic(heuristic, game)
+        cost = len(expected.path)
+        goal = game.food
+        assert estimate(game.snake[0], goal, 0) <= cost
+        for g, cell in enumerate(expected.path, 1):
+            assert estimate(cell, goal, g) <= cost - g
+            assert estimate(cell, goal, g) >= manhattan(cell, goal)
+
+
+@pytest.mark.parametrize("make", [BFSAgent, DFSAgent, GreedyAgent, SafeAStarAgent])
+def test_complete_agents_valid(make, bfs_results):
+    agent = make()
+    for game, expected in zip(POSITIONS, bfs_results):
+        result = agent.find_path_with_exploration(game, max_expansions=MAX_EXPANSIONS)
+        if make is not SafeAStarAgent:
+            assert result.found == expected.found
+        if result.found:
+            end = _play(game, result.path)
+            assert end.score == game.score + 1
+
+
+def test_encode_decode_roundtrip():
+    for game in POSITIONS:
+        for zobrist in (False, True):
+            state = encode_snake(game.snake, game.grid_size, zobrist)
+            assert decode_snake(state, game.grid_size) == list(game.snake)
+    with pytest.raises(ValueError):
+        encode_snake([(0, 0)], 257)
+
+
+@pytest.mark.parametrize("make", [Relaxed_AStarAgent, Relaxed_BidirectionalBFSAgent,
+                                  Relaxed_BidirectionalAStarAgent, Relaxed_LPAStarAgent,
+                                  lambda: Relaxed_BFSAgent(distance_field=True),
+                                  lambda: Relaxed_AStarAgent(distance_field=True)],
+                         ids=["relaxed_astar", "relaxed_bibfs", "relaxed_biastar", "relaxed_lpastar",
+                              "relaxed_bfs-field", "relaxed_astar-field"])
+def test_relaxed_agents_optimal(make):
+    # un solo agente per tutte le posizioni: LPA* ripara e riusa i suoi alberi da una all'altra
+    agent, bfs = make(), Relaxed_BFSAgent()
+    for game in POSITIONS:
+        expected = bfs.find_path(game)
+        result = agent.find_path(game)
+        assert result.found == expected.found
+        if result.found:
+            assert len(result.path) == len(expected.path)
+            assert result.path[-1] == game.food
+            _check_relaxed_path(game, result.path)
+
+
+@pytest.mark.parametrize("make", [Relaxed_DFSAgent, Relaxed_GreedyAgent])
+def test_relaxed_agents_valid(make):
+    agent, bfs = make(), Relaxed_BFSAgent()
+    for game in POSITIONS:
+        result = agent.find_path(game)
+        assert result.found == bfs.find_path(game).found
+        if result.found:
+            assert result.path[-1] == game.food
+            _check_relaxed_path(game, result.path)
+
+
+# spareggio FIFO: su una griglia vuota tutti i cammini minimi hanno lo stesso f, e a parità di f
+# e g esce il nodo inserito prima, nell'ordine delle mosse UP, DOWN, LEFT, RIGHT
+@pytest.mark.parametrize("make", [AStarAgent, Relaxed_AStarAgent, lambda: AStarAgent(zobrist=True)],
+                         ids=["astar", "relaxed_astar", "astar-zobrist"])
+def test_astar_tie_order(make):
+    game = SnakeGame(8, 0)
+    game.food = (1, 6)
+    result = make().find_path(game)
+    assert game.snake[0] == (4, 4)
+    assert result.path == [(3, 4), (2, 4), (1, 4), (1, 5), (1, 6)]
+
+
+def test_deadline_tracks_best_below_root():
+    deadline = Deadline(10000, root_h=5)
+    assert not deadline.visit(None, 0)
+    deadline.visit(1, 5)
+    assert deadline.best is None
+    deadline.visit(2, 3)
+    deadline.visit(3, 4)
+    assert (deadline.best, deadline.best_h) == (2, 3)
+
+    expired = Deadline(0.000001, root_h=5)
+    assert not any(expired.visit(None, 9) for _ in range(CLOCK_EVERY - 1))
+    assert expired.visit(None, 9) and expired.expired
+    # senza limite di tempo tiene solo il miglior nodo
+    untimed = Deadline(None, root_h=5)
+    assert not any(untimed.visit(None, 9) for _ in range(3 * CLOCK_EVERY))
+
+
+# a tempo scaduto il piano parziale porta a una cella più vicina al cibo, senza collisioni
+@pytest.mark.parametrize("agent_name", ["bfs", "dfs", "greedy", "astar", "safe_astar", "idastar", "smastar",
+                                        "relaxed_bfs", "relaxed_dfs", "relaxed_greedy", "relaxed_astar",
+                                        "relaxed_lpastar", "relaxed_bibfs", "relaxed_biastar"])
+def test_time_budget_partial_plan(agent_name):
+    game = _wall_game()
+    head = game.snake[0]
+    agent = make_agent(agent_name)
+    result = agent.find_path_with_exploration(game, max_expansions=MAX_EXPANSIONS, time_budget_ms=0.000001)
+    assert result.found and result.partial
+    assert 0 < len(result.path) and result.path[-1] != game.food
+    assert manhattan(result.path[-1], game.food) < manhattan(head, game.food)
+    if agent_name.startswith("relaxed"):
+        _check_relaxed_path(game, result.path)
+    else:
+        _play(game, result.path)
+
+
+# budget di memoria esaurito: exact si ferma con un piano parziale, lru scarta stati e continua
+@pytest.mark.parametrize("closed_set", ["exact", "lru"])
+@pytest.mark.parametrize("make", [BFSAgent, AStarAgent])
+def test_memory_budget_partial_plan(make, closed_set):
+    game = _wall_game()
+    budget_mb = 0.05
+    result = make(closed_set=closed_set, memory_budget_mb=budget_mb).find_path_with_exploration(
+        game, max_expansions=MAX_EXPANSIONS)
+    assert result.saturated
+    assert result.found
+    if result.partial:
+        assert manhattan(result.path[-1], game.food) < manhattan(game.snake[0], game.food)
+    else:
+        assert result.path[-1] == game.food
+    _play(game, result.path)
+    if closed_set == "lru":
+        assert result.evictions > 0
+    # si sfora al più di un'espansione (quattro successori)
+    assert result.memory_peak < budget_mb * 2 ** 20 * 1.1
+
+
+def test_unsupported_options_raise():
+    for name in ("idastar", "smastar"):
+        with pytest.raises(ValueError):
+            make_agent(name, closed_set="lru", memory_budget_mb=1)
+        with pytest.raises(ValueError):
+            make_agent(name, memory_budget_mb=1)
+    with pytest.raises(ValueError):
+        BFSAgent(closed_set="bloom")
+    with pytest.raises(ValueError):
+        BFSAgent(closed_set="lru")
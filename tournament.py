@@ -0,0 +1,113 @@
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from main import AGENTS, HEURISTICS
+from batch import play_game, iter_jobs, write_results, print_summary, game_options
+from profiling import write_profile, print_profile
+
+
+class JobTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise JobTimeout()
+
+
+# esegue una singola partita con un limite di tempo (solo dove esiste SIGALRM)
+def _run_job(job, options, timeout_s):
+    agent_name, heuristic_name, grid_size, seed = job
+    use_alarm = timeout_s and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout_s)
+
+    start_time = time.perf_counter()
+    try:
+        return play_game(agent_name, heuristic_name, grid_size, seed, **options)
+    except JobTimeout:
+        summary = {"agent": agent_name, "heuristic": heuristic_name,
+                   "grid": grid_size, "seed": seed, "score": None, "moves": None,
+                   "nodes_expanded": None,
+                   "wall_time_s": time.perf_counter() - start_time,
+                   "status": "timeout"}
+        return summary, []
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+# worker: un blocco di job viene eseguito in sequenza nello stesso processo
+def _run_chunk(chunk, options, timeout_s):
+    return [(index, _run_job(job, options, timeout_s)) for index, job in chunk]
+
+
+# options: parametri di play_game comuni a tutte le partite, come in batch.run_batch
+def run_tournament(agents, heuristics, grids, seeds, workers=None, chunk_size=None,
+                   timeout_s=None, verbose=False, **options):
+    for agent_name in agents:
+        if agent_name not in AGENTS or agent_name == "human":
+            raise ValueError(f"Agente non valido per il torneo: {agent_name}")
+    for heuristic_name in heuristics:
+        if heuristic_name not in HEURISTICS:
+            raise ValueError(f"Euristica sconosciuta: {heuristic_name}")
+
+    if options.get("record_dir"):
+        os.makedirs(options["record_dir"], exist_ok=True)
+
+    jobs = list(enumerate(iter_jobs(agents, heuristics, grids, seeds)))
+    workers = workers or os.cpu_count() or 1
+    if chunk_size is None:
+        # qualche blocco per worker: bilancia il carico senza troppo overhead di IPC
+        chunk_size = max(1, len(jobs) // (workers * 4))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    results = [None] * len(jobs)
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, chunk, options, timeout_s)
+                   for chunk in chunks]
+        for future in as_completed(futures):
+            for index, result in future.result():
+                results[index] = result
+            done += 1
+            if verbose:
+                print(f"Blocchi completati: {done}/{len(chunks)}")
+
+    # l'ordine dei risultati segue l'ordine dei job, non quello di completamento
+    games, apples = [], []
+    for summary, apple_rows in results:
+        games.append(summary)
+        apples.extend(apple_rows)
+    return games, apples
+
+
+if __name__ == "__main__":
+    from batch import build_parser
+
+    parser = build_parser()
+    parser.description = "Torneo parallelo su più processi"
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Numero di processi (default: tutti i core)")
+    parser.add_argument("--chunk-size", type=int, default=None,
+                        help="Job per blocco inviato a un worker")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Tempo massimo in secondi per singola partita")
+    args = parser.parse_args()
+    seeds = range(args.seed_start, args.seed_start + args.seeds)
+
+    start_time = time.perf_counter()
+    games, apples = run_tournament(args.agents, args.heuristics, args.grids, seeds,
+                                   workers=args.workers, chunk_size=args.chunk_size,
+                                   timeout_s=args.timeout, verbose=args.verbose,
+                                   **game_options(args))
+    print(f"{len(games)} partite in {time.perf_counter() - start_time:.2f}s")
+
+    for path in write_results(args.out, games, apples, args.format):
+        print(f"Risultati salvati in {path}")
+    print_summary([g for g in games if g["status"] != "timeout"])
+    if args.profile:
+        print(f"Profilo salvato in {write_profile(args.profile, apples)}")
+        print_profile(apples)